@@ -8,14 +8,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.api.routers.v1 import router as v1_router
+from app.services.bot import BotService
+from app.services.database import DatabaseService
+from app.services.hub import GameHub
+from app.services.profiler import ProfilingMiddleware
+from app.utils.logs import AccessLogMiddleware, LogPipeline
+from app.utils.metrics import RequestMetricsMiddleware
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(name)s - %(message)s",
-)
-logging.getLogger("httpx").setLevel(logging.WARNING)
+# Started before anything logs, and again by the lifespan if a previous one stopped it
+LogPipeline().start()
 log = logging.getLogger(__name__)
-log.addHandler(logging.StreamHandler())
 
 
 raw_origins = os.getenv("ALLOWED_ORIGINS", "")
@@ -28,13 +30,19 @@ allowed_origins = [
 async def lifespan(app: FastAPI):
     """Entry point lifecycle event. Runs before the server starts"""
     try:
+        LogPipeline().start()
         log.info("Starting up server...")
+        await DatabaseService().start()
         yield
     except Exception as e:
         log.exception("Failed to initialize Raise and Rage server: %s", e)
         raise e
     finally:
         log.info("Shutting down server...")
+        GameHub().close()
+        BotService().shutdown()
+        await DatabaseService().close()
+        LogPipeline().stop()
 
 
 def create_app() -> FastAPI:
@@ -51,6 +59,10 @@ def create_app() -> FastAPI:
             allow_methods=["*"],
             allow_headers=["*"],
         )
+        app.add_middleware(ProfilingMiddleware)
+        app.add_middleware(AccessLogMiddleware)
+        # Added last so it is outermost, and times everything else
+        app.add_middleware(RequestMetricsMiddleware)
         app.include_router(v1_router)
         # Add other versioned routers in the future here
 
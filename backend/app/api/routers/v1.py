@@ -1,11 +1,23 @@
 import logging
 
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 
+from app.controllers.bots import BotsController
 from app.controllers.games import GamesController
+from app.controllers.profiles import ProfilesController
 from app.controllers.rooms import RoomsController
+from app.services.bot import BotService
+from app.services.cache import GameCache
+from app.services.database import DatabaseService
 from app.services.games import GamesService
+from app.services.hub import GameHub
+from app.services.idempotency import IdempotencyStore
+from app.services.profiler import Profiler
 from app.services.rooms import RoomsService
+from app.utils.logs import LogPipeline
+from app.utils.metrics import CONTENT_TYPE, Metrics
+from app.utils.single_flight import SingleFlight
 
 log = logging.getLogger(__name__)
 
@@ -14,10 +26,28 @@ router = APIRouter(prefix="/api/v1")
 ### Health check
 
 
+def get_stats() -> dict:
+    return {
+        "database": DatabaseService().stats(),
+        "game_cache": GameCache().stats(),
+        "game_hub": GameHub().stats(),
+        "single_flight": SingleFlight().stats(),
+        "idempotency": IdempotencyStore().stats(),
+        "logging": LogPipeline().stats(),
+    }
+
+
 @router.get("/status")
 async def status():
     log.info("Status endpoint called")
-    return {"status": "ok"}
+    return {"status": "ok", **get_stats()}
+
+
+@router.get("/metrics")
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        content=Metrics().render(stats=get_stats()), media_type=CONTENT_TYPE
+    )
 
 
 ### Games
@@ -25,7 +55,12 @@ async def status():
 
 def get_games_controller_router():
     service = GamesService()
-    return GamesController(service=service).router
+    return GamesController(
+        service=service,
+        hub=GameHub(),
+        idempotency_store=IdempotencyStore(),
+        bot_service=BotService(),
+    ).router
 
 
 router.include_router(
@@ -47,3 +82,31 @@ router.include_router(
     tags=["rooms"],
     prefix="/rooms",
 )
+
+### Bots
+
+
+def get_bots_controller_router():
+    service = BotService()
+    return BotsController(service=service).router
+
+
+router.include_router(
+    get_bots_controller_router(),
+    tags=["bots"],
+    prefix="/bots",
+)
+
+### Admin
+
+
+def get_profiles_controller_router():
+    service = Profiler()
+    return ProfilesController(service=service).router
+
+
+router.include_router(
+    get_profiles_controller_router(),
+    tags=["admin"],
+    prefix="/admin/profiles",
+)
@@ -0,0 +1,49 @@
+import logging
+
+import httpx
+from fastapi import APIRouter, HTTPException
+from starlette.responses import JSONResponse
+
+from app.models.api.bots.join import JoinBotRequest
+from app.services.bot import BotService
+from app.utils.logs import bind_log_fields
+
+log = logging.getLogger(__name__)
+
+
+class BotsController:
+    def __init__(self, service: BotService):
+        self.router = APIRouter()
+        self.service = service
+        self.setup_routes()
+
+    def setup_routes(self):
+        router = self.router
+
+        @router.post(
+            "/join",
+        )
+        async def join(input: JoinBotRequest) -> JSONResponse:
+            bind_log_fields(game_id=input.game_id)
+            try:
+                log.info("Adding %s bot to game %s", input.level, input.game_id)
+                await self.service.join_room(game_id=input.game_id, level=input.level)
+                return JSONResponse(
+                    content={
+                        "message": "Bot joined successfully",
+                        "game_id": input.game_id,
+                    },
+                    status_code=httpx.codes.OK,
+                )
+            except HTTPException as e:
+                log.exception(e.detail)
+                return JSONResponse(
+                    content={"message": e.detail},
+                    status_code=e.status_code,
+                )
+            except Exception as e:
+                log.exception("Error adding bot to game %s: %s", input.game_id, e)
+                return JSONResponse(
+                    content={"message": "Error adding bot"},
+                    status_code=httpx.codes.INTERNAL_SERVER_ERROR,
+                )
@@ -1,25 +1,42 @@
 import logging
+from typing import Optional
 
 import httpx
-from fastapi import APIRouter
-from starlette.responses import JSONResponse
+from fastapi import APIRouter, Header, WebSocket
+from starlette.responses import JSONResponse, Response
 
-from app.models.api.games.get_game_state import GetGameStateResponse
+from app.models.api.games.get_game_state import (GameStateFormat,
+                                                 GetGameStateResponse)
 from app.models.api.games.initialize import (InitializeCaptureRequest,
                                              InitializeCaptureResponse,
                                              InitializeRequest)
 from app.models.api.games.move_piece import MovePieceRequest, MovePieceResponse
 from app.models.api.games.toggle_marking import ToggleMarkingRequest
+from app.services.bot import BotService
 from app.services.games import GamesService
-from app.utils.errors import RoomNotFoundError
+from app.services.hub import GAME_NOT_FOUND, GameHub
+from app.services.idempotency import IdempotencyStore
+from app.utils.errors import (GameConflictError, IdempotencyKeyReusedError,
+                              RoomNotFoundError)
+from app.utils.logs import bind_log_fields
+from app.utils.serialization import ModelResponse
 
 log = logging.getLogger(__name__)
 
 
 class GamesController:
-    def __init__(self, service: GamesService):
+    def __init__(
+        self,
+        service: GamesService,
+        hub: GameHub,
+        idempotency_store: IdempotencyStore,
+        bot_service: Optional[BotService] = None,
+    ):
         self.router = APIRouter()
         self.service = service
+        self.hub = hub
+        self.idempotency_store = idempotency_store
+        self.bot_service = bot_service
         self.setup_routes()
 
     def setup_routes(self):
@@ -29,6 +46,7 @@ class GamesController:
             "/initialize",
         )
         async def initialize(input: InitializeRequest) -> JSONResponse:
+            bind_log_fields(game_id=input.game_id)
             try:
                 log.info(
                     "Initializing pieces for player %s in game %s",
@@ -46,6 +64,12 @@ class GamesController:
                     },
                     status_code=httpx.codes.OK,
                 )
+            except GameConflictError as e:
+                log.info("Conflict initializing game %s: %s", input.game_id, e.detail)
+                return JSONResponse(
+                    content={"message": e.detail},
+                    status_code=e.status_code,
+                )
             except Exception as e:
                 log.info(
                     "Error initializing pieces for %s in game %s: %s",
@@ -62,6 +86,7 @@ class GamesController:
         async def initialize_capture(
             input: InitializeCaptureRequest,
         ) -> InitializeCaptureResponse:
+            bind_log_fields(game_id=input.game_id)
             try:
                 log.info("Initializing capture for game %s", input.game_id)
                 return await self.service.initialize_capture(
@@ -86,13 +111,34 @@ class GamesController:
 
         @router.get(
             "/pieces",
+            response_model=GetGameStateResponse,
         )
-        async def get_pieces(game_id: str) -> GetGameStateResponse:
+        async def get_pieces(
+            game_id: str,
+            format: GameStateFormat = GameStateFormat.JSON,
+            include_piece_ids: bool = True,
+            since_turn: Optional[int] = None,
+            if_none_match: Optional[str] = Header(default=None),
+        ) -> GetGameStateResponse | Response:
+            bind_log_fields(game_id=game_id)
             try:
                 log.info("Getting pieces for game %s", game_id)
-                response = await self.service.get_game_state(game_id=game_id)
+                if format == GameStateFormat.BINARY:
+                    return Response(
+                        content=await self.service.get_game_state_binary(
+                            game_id=game_id, include_piece_ids=include_piece_ids
+                        ),
+                        media_type="application/octet-stream",
+                    )
+                game_state, etag = await self.service.get_game_state_if_changed(
+                    game_id=game_id, etag=if_none_match, since_turn=since_turn
+                )
+                if game_state is None:
+                    return Response(
+                        status_code=httpx.codes.NOT_MODIFIED, headers={"ETag": etag}
+                    )
                 log.info("Pieces retrieved successfully for game %s", game_id)
-                return response
+                return ModelResponse(content=game_state, headers={"ETag": etag})
             except RoomNotFoundError as e:
                 log.exception("Room not found for game %s", game_id)
                 return GetGameStateResponse(
@@ -114,17 +160,48 @@ class GamesController:
                     turn=-1,
                 )
 
+        # Every move and marking change of a game, for players and spectators alike.
+        # The first message is the whole board.
+        @router.websocket("/ws")
+        async def watch(websocket: WebSocket, game_id: str) -> None:
+            await websocket.accept()
+            try:
+                first = await self.service.get_game_update(game_id=game_id)
+            except RoomNotFoundError:
+                log.info("Room not found for game %s", game_id)
+                await websocket.close(code=GAME_NOT_FOUND)
+                return
+            log.info("Watching game %s", game_id)
+            await self.hub.serve(game_id=game_id, websocket=websocket, first=first)
+
         @router.post(
             "/pieces/move",
+            response_model=MovePieceResponse,
         )
-        async def move_piece(input: MovePieceRequest) -> MovePieceResponse:
+        async def move_piece(
+            input: MovePieceRequest,
+            idempotency_key: Optional[str] = Header(default=None),
+        ) -> MovePieceResponse | Response:
+            bind_log_fields(game_id=input.game_id)
             try:
                 log.info("Moving piece for game %s", input.game_id)
-                return await self.service.move_piece(
+                response, replayed = await self.idempotency_store.run(
+                    operation="move_piece",
                     game_id=input.game_id,
-                    piece=input.piece,
-                    new_position=input.new_position,
+                    key=idempotency_key,
+                    request=input,
+                    function=lambda: self.service.move_piece(
+                        game_id=input.game_id,
+                        piece=input.piece,
+                        new_position=input.new_position,
+                        delta=input.delta,
+                    ),
                 )
+                if replayed:
+                    log.info("Replayed move for game %s", input.game_id)
+                elif self.bot_service is not None and response.victory_state is None:
+                    self.bot_service.schedule_response(game_id=input.game_id)
+                return ModelResponse(content=response)
             except RoomNotFoundError as e:
                 log.exception("Room not found for game %s", input.game_id)
                 return MovePieceResponse(
@@ -135,6 +212,16 @@ class GamesController:
                     movement=None,
                     turn=-1,
                 )
+            except (GameConflictError, IdempotencyKeyReusedError) as e:
+                log.info("Rejected move in game %s: %s", input.game_id, e.detail)
+                return MovePieceResponse(
+                    status_code=e.status_code,
+                    captured_pieces=[],
+                    victory_state=None,
+                    pieces=[],
+                    movement=None,
+                    turn=-1,
+                )
             except Exception as e:
                 log.exception("Error moving piece for game %s: %s", input.game_id, e)
                 return MovePieceResponse(
@@ -149,13 +236,23 @@ class GamesController:
         @router.post(
             "/pieces/marking",
         )
-        async def toggle_marking(input: ToggleMarkingRequest) -> JSONResponse:
+        async def toggle_marking(
+            input: ToggleMarkingRequest,
+            idempotency_key: Optional[str] = Header(default=None),
+        ) -> JSONResponse:
+            bind_log_fields(game_id=input.game_id)
             try:
                 log.info("Toggling marking for game %s", input.game_id)
-                await self.service.toggle_marking(
+                await self.idempotency_store.run(
+                    operation="toggle_marking",
                     game_id=input.game_id,
-                    piece_id=input.piece_id,
-                    marking=input.marking,
+                    key=idempotency_key,
+                    request=input,
+                    function=lambda: self.service.toggle_marking(
+                        game_id=input.game_id,
+                        piece_id=input.piece_id,
+                        marking=input.marking,
+                    ),
                 )
                 return JSONResponse(
                     content={"message": "Marking toggled successfully"},
@@ -167,6 +264,14 @@ class GamesController:
                     content={"message": "Room not found"},
                     status_code=httpx.codes.NOT_FOUND,
                 )
+            except (GameConflictError, IdempotencyKeyReusedError) as e:
+                log.info(
+                    "Rejected marking change in game %s: %s", input.game_id, e.detail
+                )
+                return JSONResponse(
+                    content={"message": e.detail},
+                    status_code=e.status_code,
+                )
             except Exception as e:
                 log.exception(
                     "Error toggling marking for game %s: %s", input.game_id, e
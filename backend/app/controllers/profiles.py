@@ -0,0 +1,73 @@
+import logging
+from typing import Optional
+
+import httpx
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.responses import FileResponse
+from starlette.responses import JSONResponse
+
+from app.models.api.profiles.list_profiles import ListProfilesResponse
+from app.services.profiler import Profiler
+
+log = logging.getLogger(__name__)
+
+
+class ProfilesController:
+    def __init__(self, service: Profiler):
+        self.router = APIRouter()
+        self.service = service
+        self.setup_routes()
+
+    def setup_routes(self):
+        router = self.router
+
+        @router.get(
+            "",
+            response_model=ListProfilesResponse,
+        )
+        async def list_profiles(
+            authorization: Optional[str] = Header(default=None),
+        ) -> ListProfilesResponse:
+            try:
+                self.service.check_authorized(authorization=authorization)
+                return ListProfilesResponse(
+                    status_code=httpx.codes.OK,
+                    profiles=self.service.list_profiles(),
+                )
+            except HTTPException as e:
+                log.warning(e.detail)
+                return ListProfilesResponse(status_code=e.status_code, profiles=[])
+            except Exception as e:
+                log.exception("Unexpected error while listing profiles: %s", e)
+                return ListProfilesResponse(
+                    status_code=httpx.codes.INTERNAL_SERVER_ERROR, profiles=[]
+                )
+
+        @router.get(
+            "/{name}",
+        )
+        async def download_profile(
+            name: str,
+            authorization: Optional[str] = Header(default=None),
+        ) -> Response:
+            try:
+                self.service.check_authorized(authorization=authorization)
+                return FileResponse(
+                    path=self.service.get_path(name=name),
+                    media_type="application/octet-stream",
+                    filename=f"{name}.prof",
+                )
+            except HTTPException as e:
+                log.warning(e.detail)
+                return JSONResponse(
+                    content={"message": e.detail},
+                    status_code=e.status_code,
+                )
+            except Exception as e:
+                log.exception(
+                    "Unexpected error while downloading profile %s: %s", name, e
+                )
+                return JSONResponse(
+                    content={"message": "Error downloading profile"},
+                    status_code=httpx.codes.INTERNAL_SERVER_ERROR,
+                )
@@ -8,6 +8,7 @@ from app.models.api.rooms.create import CreateRoomRequest
 from app.models.api.rooms.get_player_number import GetPlayerNumberResponse
 from app.models.api.rooms.join import JoinRoomRequest, JoinRoomResponse
 from app.services.rooms import RoomsService
+from app.utils.logs import bind_log_fields
 
 log = logging.getLogger(__name__)
 
@@ -25,6 +26,7 @@ class RoomsController:
             "/create",
         )
         async def create(input: CreateRoomRequest) -> JSONResponse:
+            bind_log_fields(game_id=input.game_id)
             try:
                 log.info(
                     "Creating room for game: %s, player one id: %s, player two id: %s",
@@ -57,6 +59,7 @@ class RoomsController:
             response_model=JoinRoomResponse,
         )
         async def join(input: JoinRoomRequest) -> JoinRoomResponse:
+            bind_log_fields(game_id=input.game_id)
             try:
                 log.info("Joining room for game %s", input.game_id)
                 response = await self.service.join_room(
@@ -68,7 +71,7 @@ class RoomsController:
             except HTTPException as e:
                 log.exception(e.detail)
                 return JoinRoomResponse(
-                    status_code=httpx.codes.NOT_FOUND,
+                    status_code=e.status_code,
                     message=e.detail,
                     is_player_one=False,
                 )
@@ -91,6 +94,7 @@ class RoomsController:
         async def get_player_number(
             game_id: str, user_id: str
         ) -> GetPlayerNumberResponse:
+            bind_log_fields(game_id=game_id)
             try:
                 log.info("Getting player number for game %s", game_id)
                 response = await self.service.get_player_number(
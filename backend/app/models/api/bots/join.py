@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+from app.models.game.ismcts import BotLevel
+
+
+class JoinBotRequest(BaseModel):
+    game_id: str
+    level: BotLevel = BotLevel.MEDIUM
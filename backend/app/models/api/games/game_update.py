@@ -0,0 +1,35 @@
+from enum import StrEnum
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.models.game.engine import Movement, VictoryState
+
+
+class GameUpdateType(StrEnum):
+    # The whole board, sent once when a client subscribes
+    STATE = "state"
+    # A move, with any pieces it captured and the victory it produced
+    MOVE = "move"
+    MARKING = "marking"
+
+
+class GameUpdate(BaseModel):
+    """A message on a game's WebSocket channel.
+
+    Applied like a delta from `GET /games/pieces`: drop `removed_piece_ids` and replace
+    `pieces` on the board the client held at `since_turn`. A gap in `seq` means an
+    update was missed, and the client should resync over REST.
+    """
+
+    type: GameUpdateType
+    game_id: str
+    seq: int
+    turn: int
+    etag: str
+    pieces: list
+    captured_pieces: list
+    victory_state: Optional[VictoryState]
+    movement: Optional[Movement]
+    since_turn: Optional[int] = None
+    removed_piece_ids: list[str] = []
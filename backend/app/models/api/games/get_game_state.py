@@ -1,3 +1,4 @@
+from enum import StrEnum
 from typing import Optional
 
 from pydantic import BaseModel
@@ -6,6 +7,12 @@ from app.models.game.base import Player
 from app.models.game.engine import Movement, VictoryState, VictoryType
 
 
+class GameStateFormat(StrEnum):
+    JSON = "json"
+    # `encode_game_state` bytes, served as application/octet-stream
+    BINARY = "binary"
+
+
 class GameState(BaseModel):
     pieces: list
     captured_pieces: list
@@ -17,8 +24,13 @@ class GameState(BaseModel):
 
 class GetGameStateResponse(BaseModel):
     status_code: int
+    # With `since_turn` set, only the pieces moved or re-marked since that turn
     pieces: list
     captured_pieces: list
     victory_state: Optional[VictoryState]
     movement: Optional[Movement]
     turn: int
+    # Set when the response is a delta against the client's board at this turn
+    since_turn: Optional[int] = None
+    # Pieces captured since `since_turn`
+    removed_piece_ids: list[str] = []
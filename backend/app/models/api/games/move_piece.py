@@ -13,6 +13,8 @@ class MovePieceRequest(BaseModel):
     game_id: str
     piece: Piece
     new_position: Position
+    # Respond with only the pieces the move changed
+    delta: bool = False
 
 
 class MovePieceResponse(BaseModel):
@@ -22,3 +24,6 @@ class MovePieceResponse(BaseModel):
     pieces: list[Piece]
     movement: Optional[Movement]
     turn: int
+    # Set when `pieces` is a delta against the client's board at this turn
+    since_turn: Optional[int] = None
+    removed_piece_ids: list[str] = []
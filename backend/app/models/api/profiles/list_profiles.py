@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ProfileInfo(BaseModel):
+    name: str
+    created_at: datetime
+    method: str
+    path: str
+    status: int
+    # Why the request was profiled: "header" or "sampled"
+    reason: str
+    duration_ms: float
+    # Profiled time by phase (engine, serialization, database, framework,
+    # io_wait, other)
+    phases_ms: dict[str, float]
+
+
+class ListProfilesResponse(BaseModel):
+    status_code: int
+    profiles: list[ProfileInfo]
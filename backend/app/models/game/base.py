@@ -11,6 +11,20 @@ class Position(BaseModel, frozen=True):
     col: int = Field(ge=0, le=COLS - 1)
 
 
+SQUARE_COUNT = ROWS * COLS
+
+
+def square_of(row: int, col: int) -> int:
+    return row * COLS + col
+
+
+# Flyweight table of every board position, indexed by square. Positions are frozen,
+# so engine code can hand these out instead of building and validating new ones.
+POSITIONS: tuple[Position, ...] = tuple(
+    Position(row=square // COLS, col=square % COLS) for square in range(SQUARE_COUNT)
+)
+
+
 class Player(StrEnum):
     PLAYER_ONE = "player_one"
     PLAYER_TWO = "player_two"
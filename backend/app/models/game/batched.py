@@ -0,0 +1,299 @@
+"""Batched board engine for self-play and simulation.
+
+Needs NumPy, which is in the optional `benchmark` group rather than the server
+dependencies: `poetry install --with benchmark`.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from app.models.game.base import COLS, ROWS, SQUARE_COUNT, Player
+from app.models.game.bitboard import (AROUND_MASKS, DIAGONAL_SQUARES,
+                                      ORTHOGONAL_SQUARES)
+from app.models.game.compact import CompactPiece
+from app.models.game.engine import PieceType, VictoryType
+
+EMPTY = 0
+DANCER = 1
+SPY = 2
+MASTER = 3
+# Player one's pieces are positive, player two's are the same codes negated
+PLAYER_SIGNS: dict[Player, int] = {Player.PLAYER_ONE: 1, Player.PLAYER_TWO: -1}
+
+NO_WINNER = 0
+# `winners` holds the winning player's sign; `victory_types` indexes this tuple
+VICTORY_TYPES: tuple[Optional[VictoryType], ...] = (
+    None,
+    VictoryType.ENEMY_SPY_CAPTURED,
+    VictoryType.ALLY_SPY_INFILTRATED,
+)
+
+# Neighbour tables padded with an off-board sentinel square, so lookups can gather
+# from a `(N, SQUARE_COUNT + 1)` array whose last column says what the edge counts as
+SENTINEL = SQUARE_COUNT
+
+
+def _padded(neighbours: list[tuple[int, ...]], width: int) -> np.ndarray:
+    table = np.full((SQUARE_COUNT, width), SENTINEL, dtype=np.intp)
+    for square, squares in enumerate(neighbours):
+        table[square, : len(squares)] = squares
+    return table
+
+
+def _rays() -> np.ndarray:
+    """`(square, direction, distance)` -> square along each orthogonal ray."""
+    rays = np.full((SQUARE_COUNT, 4, max(ROWS, COLS) - 1), SENTINEL, dtype=np.intp)
+    for square in range(SQUARE_COUNT):
+        row, col = divmod(square, COLS)
+        for direction, (d_row, d_col) in enumerate(((1, 0), (-1, 0), (0, 1), (0, -1))):
+            distance = 1
+            while 0 <= row + d_row * distance < ROWS and (
+                0 <= col + d_col * distance < COLS
+            ):
+                rays[square, direction, distance - 1] = (
+                    row + d_row * distance
+                ) * COLS + (col + d_col * distance)
+                distance += 1
+    return rays
+
+
+ORTHOGONAL_INDEX = _padded(ORTHOGONAL_SQUARES, 4)
+DIAGONAL_INDEX = _padded(DIAGONAL_SQUARES, 4)
+RAY_INDEX = _rays()
+AROUND = np.array(
+    [
+        [bool(AROUND_MASKS[square] >> other & 1) for other in range(SQUARE_COUNT)]
+        for square in range(SQUARE_COUNT)
+    ]
+)
+TOP_ROW = np.arange(COLS)
+BOTTOM_ROW = np.arange((ROWS - 1) * COLS, SQUARE_COUNT)
+
+
+def _pad(values: np.ndarray, edge: bool) -> np.ndarray:
+    """Append the sentinel column to a `(N, SQUARE_COUNT)` boolean array."""
+    return np.concatenate(
+        (values, np.full((values.shape[0], 1), edge, dtype=bool)), axis=1
+    )
+
+
+class BatchedGameEngine:
+    """N boards stored as one `(N, ROWS, COLS)` int8 array and advanced together.
+
+    Uses the same rules as `GameEngine`, but move generation, surround and capture
+    detection and victory checks each run over the whole batch in one call.
+    """
+
+    boards: np.ndarray
+    turns: np.ndarray
+    winners: np.ndarray
+    victory_types: np.ndarray
+
+    def __init__(self, boards: np.ndarray, turns: Optional[np.ndarray] = None):
+        self.boards = np.ascontiguousarray(boards, dtype=np.int8)
+        count = self.boards.shape[0]
+        self.turns = (
+            np.zeros(count, dtype=np.int64) if turns is None else turns.astype(np.int64)
+        )
+        self.winners = np.zeros(count, dtype=np.int8)
+        self.victory_types = np.zeros(count, dtype=np.int8)
+
+    @classmethod
+    def from_pieces(
+        cls, games: list[list[CompactPiece]], turns: Optional[list[int]] = None
+    ) -> "BatchedGameEngine":
+        boards = np.zeros((len(games), ROWS, COLS), dtype=np.int8)
+        flat = boards.reshape(len(games), SQUARE_COUNT)
+        for index, pieces in enumerate(games):
+            for piece in pieces:
+                if piece.piece_type == PieceType.MASTER:
+                    code = MASTER
+                else:
+                    code = SPY if piece.is_spy else DANCER
+                flat[index, piece.square] = code * PLAYER_SIGNS[piece.player]
+        return cls(boards=boards, turns=None if turns is None else np.array(turns))
+
+    def __len__(self) -> int:
+        return self.boards.shape[0]
+
+    @property
+    def flat(self) -> np.ndarray:
+        return self.boards.reshape(len(self), SQUARE_COUNT)
+
+    @property
+    def active(self) -> np.ndarray:
+        return self.winners == NO_WINNER
+
+    def mover_signs(self) -> np.ndarray:
+        return np.where(self.turns % 2 == 0, 1, -1).astype(np.int8)
+
+    def surrounded(self) -> np.ndarray:
+        """`(N, SQUARE_COUNT)`: Dancers with 4 blocked sides and Masters with 8.
+        A side is blocked if it's at the board edge or has any piece.
+        """
+        flat = self.flat
+        kinds = np.abs(flat)
+        occupied = _pad(flat != EMPTY, edge=True)
+        blocked_orthogonal = occupied[:, ORTHOGONAL_INDEX].sum(axis=-1)
+        blocked_diagonal = occupied[:, DIAGONAL_INDEX].sum(axis=-1)
+        return (((kinds == DANCER) | (kinds == SPY)) & (blocked_orthogonal == 4)) | (
+            (kinds == MASTER) & (blocked_orthogonal + blocked_diagonal == 8)
+        )
+
+    def _mover_targets(self, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Targets of every piece belonging to the side to move, on the given boards.
+
+        Returns `sources` `(M, K)` and `targets` `(M, K, SQUARE_COUNT)`, where K is the
+        largest number of pieces the mover has on any of the boards. Padding sources
+        have no targets.
+        """
+        flat = self.flat[rows]
+        count = len(rows)
+        board_index = np.arange(count)
+        empty = _pad(flat == EMPTY, edge=False)
+        owned = (flat * self.mover_signs()[rows, None]) > 0
+        width = max(int(owned.sum(axis=1).max(initial=0)), 1)
+        sources = np.argsort(~owned, axis=1, kind="stable")[:, :width]
+        valid = np.take_along_axis(owned, sources, axis=1)
+        is_master = valid & (
+            np.abs(np.take_along_axis(flat, sources, axis=1)) == MASTER
+        )
+        is_dancer = valid & ~is_master
+        boards = board_index[:, None, None]
+        pieces = np.arange(width)[None, :, None]
+        targets = np.zeros((count, width, SQUARE_COUNT + 1), dtype=bool)
+
+        # Dancers: a ray square is reachable while every square up to it is empty
+        rays = RAY_INDEX[sources]
+        slides = np.cumprod(empty[boards[..., None], rays], axis=-1).astype(bool)
+        targets[boards[..., None], pieces[..., None], rays] = (
+            slides & is_dancer[:, :, None, None]
+        )
+
+        # Masters: one orthogonal step onto an empty square
+        orthogonal = ORTHOGONAL_INDEX[sources]
+        targets[boards, pieces, orthogonal] |= (
+            empty[boards, orthogonal] & is_master[:, :, None]
+        )
+
+        # Masters: flood fill diagonally over empty squares, one row per Master
+        master_boards, master_pieces = np.nonzero(is_master)
+        master_squares = sources[master_boards, master_pieces]
+        master_count = len(master_boards)
+        reach = np.zeros((master_count, SQUARE_COUNT + 1), dtype=bool)
+        reach[np.arange(master_count), master_squares] = True
+        master_empty = empty[master_boards, :SQUARE_COUNT]
+        while True:
+            grown = reach[:, :SQUARE_COUNT] | (
+                reach[:, DIAGONAL_INDEX].any(axis=-1) & master_empty
+            )
+            if np.array_equal(grown, reach[:, :SQUARE_COUNT]):
+                break
+            reach[:, :SQUARE_COUNT] = grown
+        reach[np.arange(master_count), master_squares] = False
+        targets[master_boards, master_pieces] |= reach
+
+        return sources, targets[:, :, :SQUARE_COUNT]
+
+    def legal_move_masks(self) -> np.ndarray:
+        """`(N, from_square, to_square)` mask of legal moves for each side to move.
+
+        Finished games have no legal moves.
+        """
+        masks = np.zeros((len(self), SQUARE_COUNT, SQUARE_COUNT), dtype=bool)
+        rows = np.nonzero(self.active)[0]
+        sources, targets = self._mover_targets(rows=rows)
+        masks[rows[:, None], sources] |= targets
+        return masks
+
+    def random_moves(self, rng: np.random.Generator) -> np.ndarray:
+        """`(N, 2)` uniformly random legal `(square, new_square)`, or -1 if none."""
+        moves = np.full((len(self), 2), -1, dtype=np.intp)
+        rows = np.nonzero(self.active)[0]
+        sources, targets = self._mover_targets(rows=rows)
+        flat_targets = targets.reshape(len(rows), -1)
+        choices = (rng.random(flat_targets.shape) * flat_targets).argmax(axis=1)
+        pieces, new_squares = np.divmod(choices, SQUARE_COUNT)
+        has_move = flat_targets.any(axis=1)
+        moves[rows[has_move], 0] = sources[np.arange(len(rows)), pieces][has_move]
+        moves[rows[has_move], 1] = new_squares[has_move]
+        return moves
+
+    def step(self, moves: np.ndarray) -> np.ndarray:
+        """Play one `(square, new_square)` per board, -1 to skip a board.
+
+        Applies captures around each destination and victory checks, and returns the
+        number of pieces captured on each board. Moves are assumed to be legal.
+        """
+        flat = self.flat
+        playing = (moves[:, 0] >= 0) & self.active
+        rows = np.nonzero(playing)[0]
+        squares, new_squares = moves[rows, 0], moves[rows, 1]
+        flat[rows, new_squares] = flat[rows, squares]
+        flat[rows, squares] = EMPTY
+
+        captured = np.zeros((len(self), SQUARE_COUNT), dtype=bool)
+        captured[rows] = self.surrounded()[rows] & AROUND[new_squares]
+        flat[captured] = EMPTY
+
+        self.process_potential_win(rows=rows)
+        self.turns[rows] += 1
+        return captured.sum(axis=1)
+
+    def process_initialization_capture(self) -> np.ndarray:
+        captured = self.surrounded()
+        self.flat[captured] = EMPTY
+        return captured.sum(axis=1)
+
+    def process_potential_win(self, rows: Optional[np.ndarray] = None) -> None:
+        """Update `winners` and `victory_types` for the given boards, or all of them.
+        Same order of checks as `GameEngine.process_potential_win`.
+        """
+        if rows is None:
+            rows = np.arange(len(self))
+        flat = self.flat[rows]
+        player_one_spy = (flat == SPY).any(axis=1)
+        player_two_spy = (flat == -SPY).any(axis=1)
+        player_two_infiltrated = (flat[:, TOP_ROW] == -SPY).any(axis=1)
+        player_one_infiltrated = (flat[:, BOTTOM_ROW] == SPY).any(axis=1)
+
+        captured_type = VICTORY_TYPES.index(VictoryType.ENEMY_SPY_CAPTURED)
+        infiltrated_type = VICTORY_TYPES.index(VictoryType.ALLY_SPY_INFILTRATED)
+        winners = np.select(
+            [
+                ~player_one_spy,
+                ~player_two_spy,
+                player_two_infiltrated,
+                player_one_infiltrated,
+            ],
+            [-1, 1, -1, 1],
+            default=NO_WINNER,
+        )
+        victory_types = np.select(
+            [
+                ~player_one_spy | ~player_two_spy,
+                player_two_infiltrated | player_one_infiltrated,
+            ],
+            [captured_type, infiltrated_type],
+            default=0,
+        )
+        self.winners[rows] = winners
+        self.victory_types[rows] = victory_types
+
+    def play_random(self, max_turns: int, rng: np.random.Generator) -> None:
+        """Play random legal moves until every game is decided or `max_turns` is hit."""
+        for _ in range(max_turns):
+            if not self.active.any():
+                return
+            self.step(moves=self.random_moves(rng=rng))
+
+    def get_pieces(self, index: int) -> list[tuple[int, PieceType, Player, bool]]:
+        """`(square, piece_type, player, is_spy)` for every piece on one board."""
+        pieces = []
+        for square in np.nonzero(self.flat[index])[0]:
+            code = int(self.flat[index, square])
+            player = Player.PLAYER_ONE if code > 0 else Player.PLAYER_TWO
+            piece_type = PieceType.MASTER if abs(code) == MASTER else PieceType.DANCER
+            pieces.append((int(square), piece_type, player, abs(code) == SPY))
+        return pieces
@@ -0,0 +1,408 @@
+from typing import Iterator, NamedTuple, Optional
+
+from app.models.game.base import (COLS, POSITIONS, ROWS, SQUARE_COUNT, Marking,
+                                  PieceLimits, Player, Position,
+                                  get_player_side_rows, square_of)
+from app.models.game.compact import CompactPiece
+from app.models.game.engine import PieceType, VictoryState, VictoryType
+from app.models.game.zobrist import piece_key, side_to_move_key
+
+FULL_BOARD = (1 << SQUARE_COUNT) - 1
+
+
+def _row_mask(row: int) -> int:
+    return sum(1 << square_of(row, col) for col in range(COLS))
+
+
+def _col_mask(col: int) -> int:
+    return sum(1 << square_of(row, col) for row in range(ROWS))
+
+
+FIRST_COL = _col_mask(0)
+LAST_COL = _col_mask(COLS - 1)
+TOP_ROW = _row_mask(0)
+BOTTOM_ROW = _row_mask(ROWS - 1)
+PLAYER_SIDE_MASKS: dict[Player, int] = {
+    player: sum(_row_mask(row) for row in get_player_side_rows(player=player))
+    for player in Player
+}
+
+
+def shift_up(bitboard: int) -> int:
+    return bitboard >> COLS
+
+
+def shift_down(bitboard: int) -> int:
+    return (bitboard << COLS) & FULL_BOARD
+
+
+def shift_right(bitboard: int) -> int:
+    return (bitboard & ~LAST_COL) << 1
+
+
+def shift_left(bitboard: int) -> int:
+    return (bitboard & ~FIRST_COL) >> 1
+
+
+def orthogonal_neighbours(bitboard: int) -> int:
+    return (
+        shift_up(bitboard)
+        | shift_down(bitboard)
+        | shift_right(bitboard)
+        | shift_left(bitboard)
+    )
+
+
+def diagonal_neighbours(bitboard: int) -> int:
+    horizontal = shift_right(bitboard) | shift_left(bitboard)
+    return shift_up(horizontal) | shift_down(horizontal)
+
+
+def iter_squares(bitboard: int) -> Iterator[int]:
+    """Yield the square index of every set bit, lowest square first."""
+    while bitboard:
+        lowest = bitboard & -bitboard
+        yield lowest.bit_length() - 1
+        bitboard ^= lowest
+
+
+ORTHOGONAL_MASKS: list[int] = [
+    orthogonal_neighbours(1 << square) for square in range(SQUARE_COUNT)
+]
+KING_MASKS: list[int] = [
+    ORTHOGONAL_MASKS[square] | diagonal_neighbours(1 << square)
+    for square in range(SQUARE_COUNT)
+]
+AROUND_MASKS: list[int] = [
+    KING_MASKS[square] | (1 << square) for square in range(SQUARE_COUNT)
+]
+ORTHOGONAL_SQUARES: list[tuple[int, ...]] = [
+    tuple(iter_squares(ORTHOGONAL_MASKS[square])) for square in range(SQUARE_COUNT)
+]
+DIAGONAL_SQUARES: list[tuple[int, ...]] = [
+    tuple(iter_squares(KING_MASKS[square] & ~ORTHOGONAL_MASKS[square]))
+    for square in range(SQUARE_COUNT)
+]
+# Sides past the board edge count as blocked from the start
+EDGE_BLOCKED_ORTHOGONAL: list[int] = [
+    4 - len(ORTHOGONAL_SQUARES[square]) for square in range(SQUARE_COUNT)
+]
+EDGE_BLOCKED_DIAGONAL: list[int] = [
+    4 - len(DIAGONAL_SQUARES[square]) for square in range(SQUARE_COUNT)
+]
+
+_SLIDE_DIRECTIONS = (shift_down, shift_up, shift_right, shift_left)
+
+
+def dancer_targets(square: int, empty: int) -> int:
+    """Every square a Dancer can slide to: any distance along a clear orthogonal line."""
+    targets = 0
+    for shift in _SLIDE_DIRECTIONS:
+        ray = shift(1 << square) & empty
+        while ray:
+            targets |= ray
+            ray = shift(ray) & empty
+    return targets
+
+
+def master_targets(square: int, empty: int) -> int:
+    """Every square a Master can reach:
+    - Orthogonally: one step onto an empty square
+    - Diagonally: flood fill over empty squares of the same checkerboard color
+    """
+    origin = 1 << square
+    reach = origin
+    while True:
+        grown = reach | (diagonal_neighbours(reach) & empty)
+        if grown == reach:
+            break
+        reach = grown
+    return (ORTHOGONAL_MASKS[square] & empty) | (reach & ~origin)
+
+
+class BitboardGameBoard:
+    """Drop-in replacement for `GameBoard` that tracks occupancy as bitboards.
+
+    Square `row * COLS + col` maps to bit `1 << square`. Pieces are still kept per
+    square so that `get_pieces` returns the same objects in the same order.
+    Holds `CompactPiece`s; convert from and to `Piece` at the service boundary.
+
+    Every square also keeps a count of its blocked orthogonal and diagonal sides,
+    updated on each place and clear, so a surround check is a single comparison.
+    `zobrist_hash` covers the pieces on the board and is updated the same way.
+    """
+
+    squares: list[Optional[CompactPiece]]
+    occupied: int
+    players: dict[Player, int]
+    dancers: int
+    masters: int
+    spies: int
+    blocked_orthogonal: list[int]
+    blocked_diagonal: list[int]
+    zobrist_hash: int
+
+    def __init__(self, pieces: list[CompactPiece]):
+        self.squares = [None] * SQUARE_COUNT
+        self.zobrist_hash = 0
+        self.blocked_orthogonal = EDGE_BLOCKED_ORTHOGONAL.copy()
+        self.blocked_diagonal = EDGE_BLOCKED_DIAGONAL.copy()
+        self.occupied = 0
+        self.players = {player: 0 for player in Player}
+        self.dancers = 0
+        self.masters = 0
+        self.spies = 0
+        for piece in pieces:
+            if self.squares[piece.square] is not None:
+                self.clear(square=piece.square)
+            self.place(piece=piece, square=piece.square)
+
+    @property
+    def board(self) -> list[list[Optional[CompactPiece]]]:
+        return [self.squares[row * COLS : (row + 1) * COLS] for row in range(ROWS)]
+
+    def place(self, piece: CompactPiece, square: int) -> None:
+        bit = 1 << square
+        piece.square = square
+        self.squares[square] = piece
+        self.zobrist_hash ^= piece_key(piece=piece, square=square)
+        self.occupied |= bit
+        blocked_orthogonal = self.blocked_orthogonal
+        for neighbour in ORTHOGONAL_SQUARES[square]:
+            blocked_orthogonal[neighbour] += 1
+        blocked_diagonal = self.blocked_diagonal
+        for neighbour in DIAGONAL_SQUARES[square]:
+            blocked_diagonal[neighbour] += 1
+        self.players[piece.player] |= bit
+        if piece.piece_type == PieceType.DANCER:
+            self.dancers |= bit
+            if piece.is_spy:
+                self.spies |= bit
+        elif piece.piece_type == PieceType.MASTER:
+            self.masters |= bit
+        else:
+            raise TypeError(f"Invalid piece type: {piece.piece_type}")
+
+    def clear(self, square: int) -> Optional[CompactPiece]:
+        piece = self.squares[square]
+        if piece is None:
+            return None
+        keep = ~(1 << square)
+        self.squares[square] = None
+        self.zobrist_hash ^= piece_key(piece=piece, square=square)
+        self.occupied &= keep
+        self.players[piece.player] &= keep
+        self.dancers &= keep
+        self.masters &= keep
+        self.spies &= keep
+        blocked_orthogonal = self.blocked_orthogonal
+        for neighbour in ORTHOGONAL_SQUARES[square]:
+            blocked_orthogonal[neighbour] -= 1
+        blocked_diagonal = self.blocked_diagonal
+        for neighbour in DIAGONAL_SQUARES[square]:
+            blocked_diagonal[neighbour] -= 1
+        return piece
+
+    def targets(self, square: int) -> int:
+        if self.dancers >> square & 1:
+            return dancer_targets(square=square, empty=~self.occupied & FULL_BOARD)
+        if self.masters >> square & 1:
+            return master_targets(square=square, empty=~self.occupied & FULL_BOARD)
+        return 0
+
+    def is_square_surrounded(self, square: int) -> bool:
+        """Dancers need all 4 orthogonal sides blocked, Masters all 8 sides."""
+        piece = self.squares[square]
+        if piece is None:
+            return False
+        if piece.piece_type == PieceType.DANCER:
+            return self.blocked_orthogonal[square] == 4
+        return self.blocked_orthogonal[square] + self.blocked_diagonal[square] == 8
+
+    def is_surrounded(self, piece: CompactPiece) -> bool:
+        return self.is_square_surrounded(square=piece.square)
+
+    def are_pieces_valid_during_setup(self, pieces: list[CompactPiece]) -> bool:
+        dancer_count: int = 0
+        master_count: int = 0
+        spy_count: int = 0
+        players_seen = set()
+        for piece in pieces:
+            players_seen.add(piece.player)
+            if len(players_seen) > 1:
+                return False
+            if self.is_square_surrounded(square=piece.square):
+                return False
+            if not PLAYER_SIDE_MASKS[piece.player] >> piece.square & 1:
+                return False
+            if piece.piece_type == PieceType.DANCER:
+                if piece.is_spy:
+                    spy_count += 1
+                else:
+                    dancer_count += 1
+            elif piece.piece_type == PieceType.MASTER:
+                master_count += 1
+            else:
+                raise TypeError(f"Invalid piece type: {piece.piece_type}")
+
+        return (
+            dancer_count == PieceLimits.DANCER.value
+            and master_count == PieceLimits.MASTER.value
+            and spy_count == PieceLimits.SPY.value
+        )
+
+    def remove_piece(self, piece: CompactPiece) -> None:
+        self.clear(square=piece.square)
+
+    def toggle_marking(self, piece: CompactPiece, marking: Marking) -> None:
+        if self.squares[piece.square] is piece:
+            self.zobrist_hash ^= piece_key(piece=piece, square=piece.square)
+            piece.marking = marking
+            self.zobrist_hash ^= piece_key(piece=piece, square=piece.square)
+            return
+        piece.marking = marking
+        self.clear(square=piece.square)
+        self.place(piece=piece, square=piece.square)
+
+    def get_pieces(self) -> list[CompactPiece]:
+        return [self.squares[square] for square in iter_squares(self.occupied)]
+
+
+class UndoRecord(NamedTuple):
+    """Everything `unmake_move` needs to put the board back exactly as it was."""
+
+    square: int
+    new_square: int
+    captured: tuple[CompactPiece, ...]
+    victory: Optional[tuple[Player, VictoryType]]
+
+
+class BitboardGameEngine:
+    """Bitboard implementation of the `GameEngine` API.
+
+    Move generation uses shifts and masks instead of walking the board cell by cell,
+    and a move is legal if its destination bit survives a single AND with the targets.
+    The `Position` methods mirror `GameEngine`; the `*_square` methods are the
+    allocation-free equivalents on square indices.
+
+    `make_move`/`unmake_move` play a full turn (move, captures, victory check) and
+    take it back again without copying the board, for search and analysis.
+    """
+
+    game_board: BitboardGameBoard
+    turn: int
+    victory: Optional[tuple[Player, VictoryType]]
+
+    def __init__(self, pieces: list[CompactPiece], turn: int = 0):
+        self.game_board = BitboardGameBoard(pieces=pieces)
+        self.turn = turn
+        self.victory = None
+
+    @property
+    def zobrist_hash(self) -> int:
+        """64-bit position hash: the pieces on the board plus the side to move."""
+        return self.game_board.zobrist_hash ^ side_to_move_key(turn=self.turn)
+
+    def generate_moves(self, player: Player) -> list[tuple[int, int]]:
+        """Every legal `(square, new_square)` pair for the player's pieces."""
+        game_board = self.game_board
+        return [
+            (square, new_square)
+            for square in iter_squares(game_board.players[player])
+            for new_square in iter_squares(game_board.targets(square=square))
+        ]
+
+    def make_move(self, square: int, new_square: int) -> UndoRecord:
+        game_board = self.game_board
+        if not game_board.targets(square=square) & (1 << new_square):
+            raise ValueError(f"Invalid new position: {POSITIONS[new_square]}")
+        game_board.place(piece=game_board.clear(square=square), square=new_square)
+        captured = tuple(self.capture_around_square(square=new_square))
+        record = UndoRecord(
+            square=square,
+            new_square=new_square,
+            captured=captured,
+            victory=self.victory,
+        )
+        self.victory = self.find_victory()
+        self.turn += 1
+        return record
+
+    def unmake_move(self, record: UndoRecord) -> None:
+        """Undo moves in reverse order of `make_move`."""
+        game_board = self.game_board
+        for piece in record.captured:
+            game_board.place(piece=piece, square=piece.square)
+        game_board.place(
+            piece=game_board.clear(square=record.new_square), square=record.square
+        )
+        self.victory = record.victory
+        self.turn -= 1
+
+    def get_possible_new_positions(self, piece: CompactPiece) -> list[Position]:
+        return [
+            POSITIONS[square]
+            for square in iter_squares(self.game_board.targets(square=piece.square))
+        ]
+
+    def move_piece(self, piece: CompactPiece, new_position: Position) -> None:
+        self.move_square(
+            square=piece.square,
+            new_square=square_of(new_position.row, new_position.col),
+        )
+
+    def move_square(self, square: int, new_square: int) -> None:
+        game_board = self.game_board
+        if not game_board.targets(square=square) & (1 << new_square):
+            raise ValueError(f"Invalid new position: {POSITIONS[new_square]}")
+        piece = game_board.clear(square=square)
+        game_board.place(piece=piece, square=new_square)
+
+    def toggle_marking(self, piece: CompactPiece, marking: Marking) -> None:
+        self.game_board.toggle_marking(piece=piece, marking=marking)
+
+    def process_potential_capture(self, new_position: Position) -> list[CompactPiece]:
+        return self.capture_around_square(
+            square=square_of(new_position.row, new_position.col)
+        )
+
+    def capture_around_square(self, square: int) -> list[CompactPiece]:
+        game_board = self.game_board
+        captured_squares = [
+            neighbour
+            for neighbour in iter_squares(AROUND_MASKS[square] & game_board.occupied)
+            if game_board.is_square_surrounded(square=neighbour)
+        ]
+        return [game_board.clear(square=neighbour) for neighbour in captured_squares]
+
+    def process_initialization_capture(self) -> list[CompactPiece]:
+        game_board = self.game_board
+        captured_squares = [
+            square
+            for square in iter_squares(game_board.occupied)
+            if game_board.is_square_surrounded(square=square)
+        ]
+        return [game_board.clear(square=square) for square in captured_squares]
+
+    def find_victory(self) -> Optional[tuple[Player, VictoryType]]:
+        """Same rules as `GameEngine.process_potential_win`, answered with masks."""
+        game_board = self.game_board
+        player_one_spies = game_board.spies & game_board.players[Player.PLAYER_ONE]
+        player_two_spies = game_board.spies & game_board.players[Player.PLAYER_TWO]
+
+        if not player_one_spies:
+            return (Player.PLAYER_TWO, VictoryType.ENEMY_SPY_CAPTURED)
+        if not player_two_spies:
+            return (Player.PLAYER_ONE, VictoryType.ENEMY_SPY_CAPTURED)
+        if player_two_spies & TOP_ROW:
+            return (Player.PLAYER_TWO, VictoryType.ALLY_SPY_INFILTRATED)
+        if player_one_spies & BOTTOM_ROW:
+            return (Player.PLAYER_ONE, VictoryType.ALLY_SPY_INFILTRATED)
+        return None
+
+    def process_potential_win(self) -> Optional[VictoryState]:
+        victory = self.find_victory()
+        if victory is None:
+            return None
+        player, victory_type = victory
+        return VictoryState(player=player, victory_type=victory_type)
@@ -0,0 +1,279 @@
+import base64
+import uuid
+from typing import NamedTuple, Optional, Sequence
+
+from app.models.game.base import (POSITIONS, SQUARE_COUNT, Marking, Player,
+                                  square_of)
+from app.models.game.compact import CompactPiece
+from app.models.game.engine import Movement, PieceType, VictoryType
+
+CODEC_VERSION = 1
+
+# A piece is three bytes: its index in the game's id table, its square, and flags
+# packing type (bit 0), owner (bit 1), spy (bit 2) and marking (bits 3-4)
+PIECE_BYTES = 3
+_TYPE_BIT = 0b00001
+_PLAYER_BIT = 0b00010
+_SPY_BIT = 0b00100
+_MARKING_SHIFT = 3
+
+_PIECE_TYPES = (PieceType.DANCER, PieceType.MASTER)
+_PLAYERS = (Player.PLAYER_ONE, Player.PLAYER_TWO)
+_MARKINGS = tuple(Marking)
+_VICTORY_TYPES = tuple(VictoryType)
+_MARKING_INDEX = {marking: index for index, marking in enumerate(_MARKINGS)}
+_VICTORY_TYPE_INDEX = {
+    victory_type: index for index, victory_type in enumerate(_VICTORY_TYPES)
+}
+
+# Every flags byte a valid piece can have, and the fields it stands for
+_FLAGS = {
+    (
+        (piece_type == PieceType.MASTER) * _TYPE_BIT
+        | (player == Player.PLAYER_TWO) * _PLAYER_BIT
+        | is_spy * _SPY_BIT
+        | _MARKING_INDEX[marking] << _MARKING_SHIFT
+    ): (piece_type, player, is_spy, marking)
+    for piece_type in _PIECE_TYPES
+    for player in _PLAYERS
+    for is_spy in (False, True)
+    for marking in _MARKINGS
+}
+_FLAGS_OF = {fields: flags for flags, fields in _FLAGS.items()}
+
+# Game state header flags
+_HAS_VICTORY = 0b001
+_HAS_MOVEMENT = 0b010
+_HAS_PIECE_IDS = 0b100
+_UUID_PIECE_IDS = 0b1000
+# The turn is written in two bytes
+MAX_TURN = 0xFFFF
+_VICTORY_TYPE_MASK = 0x7F
+
+
+class PieceIds:
+    """A game's piece ids in a fixed order, so pieces can be stored as small indices.
+
+    Ids never change after setup, so the order of the setup board in the `games` row
+    is used and the table itself never has to be stored again.
+    """
+
+    __slots__ = ("ids", "_index")
+
+    def __init__(self, ids: Sequence[str]):
+        if len(ids) > 255:
+            raise ValueError(f"Too many pieces for one game: {len(ids)}")
+        self.ids: tuple[str, ...] = tuple(ids)
+        self._index = {piece_id: index for index, piece_id in enumerate(self.ids)}
+        if len(self._index) != len(self.ids):
+            raise ValueError("Duplicate piece ids")
+
+    def index(self, piece_id: str) -> int:
+        index = self._index.get(piece_id)
+        if index is None:
+            raise ValueError(f"Unknown piece id: {piece_id}")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def encode(self) -> bytes:
+        """16 bytes per id when every id is a UUID, else length-prefixed UTF-8.
+
+        Ids are decoded as canonical UUID strings, so an id only counts as a UUID if
+        it is written that way, or it would not come back as it was.
+        """
+        try:
+            uuids = [uuid.UUID(piece_id) for piece_id in self.ids]
+        except ValueError:
+            uuids = None
+        if uuids is not None and all(
+            str(value) == piece_id for value, piece_id in zip(uuids, self.ids)
+        ):
+            return bytes([_UUID_PIECE_IDS, len(self.ids)]) + b"".join(
+                value.bytes for value in uuids
+            )
+        encoded = bytearray([0, len(self.ids)])
+        for piece_id in self.ids:
+            raw = piece_id.encode()
+            encoded.append(len(raw))
+            encoded += raw
+        return bytes(encoded)
+
+    @classmethod
+    def decode(cls, data: bytes, offset: int = 0) -> tuple["PieceIds", int]:
+        """Decode ids starting at `offset`. Also returns the offset just past them."""
+        kind, count = data[offset], data[offset + 1]
+        offset += 2
+        ids: list[str] = []
+        for _ in range(count):
+            if kind & _UUID_PIECE_IDS:
+                ids.append(str(uuid.UUID(bytes=bytes(data[offset : offset + 16]))))
+                offset += 16
+            else:
+                length = data[offset]
+                ids.append(bytes(data[offset + 1 : offset + 1 + length]).decode())
+                offset += 1 + length
+        return cls(ids=ids), offset
+
+
+def encode_pieces(pieces: Sequence[CompactPiece], piece_ids: PieceIds) -> bytes:
+    """Version byte, piece count, then three bytes per piece."""
+    encoded = bytearray([CODEC_VERSION, len(pieces)])
+    for piece in pieces:
+        encoded += bytes(
+            (
+                piece_ids.index(piece.id),
+                piece.square,
+                _FLAGS_OF[
+                    (piece.piece_type, piece.player, piece.is_spy, piece.marking)
+                ],
+            )
+        )
+    return bytes(encoded)
+
+
+def decode_pieces(
+    data: bytes, piece_ids: PieceIds, offset: int = 0
+) -> list[CompactPiece]:
+    pieces, _ = _decode_pieces(data=data, piece_ids=piece_ids, offset=offset)
+    return pieces
+
+
+def _decode_pieces(
+    data: bytes, piece_ids: PieceIds, offset: int
+) -> tuple[list[CompactPiece], int]:
+    if len(data) < offset + 2:
+        raise ValueError("Truncated board")
+    version, count = data[offset], data[offset + 1]
+    if version != CODEC_VERSION:
+        raise ValueError(f"Unsupported board codec version: {version}")
+    end = offset + 2 + count * PIECE_BYTES
+    if len(data) < end:
+        raise ValueError("Truncated board")
+    ids = piece_ids.ids
+    pieces: list[CompactPiece] = []
+    for start in range(offset + 2, end, PIECE_BYTES):
+        index, square, flags = data[start], data[start + 1], data[start + 2]
+        fields = _FLAGS.get(flags)
+        if index >= len(ids) or square >= SQUARE_COUNT or fields is None:
+            raise ValueError(f"Invalid piece at byte {start}")
+        piece_type, player, is_spy, marking = fields
+        pieces.append(
+            CompactPiece(
+                id=ids[index],
+                piece_type=piece_type,
+                player=player,
+                square=square,
+                marking=marking,
+                is_spy=is_spy,
+            )
+        )
+    return pieces, end
+
+
+def encode_pieces_text(pieces: Sequence[CompactPiece], piece_ids: PieceIds) -> str:
+    """`encode_pieces` as base64, for text columns and JSON payloads."""
+    return base64.b64encode(encode_pieces(pieces=pieces, piece_ids=piece_ids)).decode()
+
+
+def decode_pieces_text(text: str, piece_ids: PieceIds) -> list[CompactPiece]:
+    return decode_pieces(data=base64.b64decode(text), piece_ids=piece_ids)
+
+
+class DecodedGameState(NamedTuple):
+    turn: int
+    victory: Optional[tuple[Player, VictoryType]]
+    movement: Optional[Movement]
+    piece_ids: Optional[PieceIds]
+    pieces: list[CompactPiece]
+    captured_pieces: list[CompactPiece]
+
+
+def encode_game_state(
+    turn: int,
+    victory: Optional[tuple[Player, VictoryType]],
+    movement: Optional[Movement],
+    pieces: Sequence[CompactPiece],
+    captured_pieces: Sequence[CompactPiece],
+    piece_ids: PieceIds,
+    include_piece_ids: bool = True,
+) -> bytes:
+    """Binary form of `GetGameStateResponse`.
+
+    Layout: version, header flags, turn (2 bytes, big-endian), then the victory
+    (winner and victory type, 1 byte), the last movement (2 squares) and the id table
+    when present, then the board and the captured pieces as in `encode_pieces`.
+    Clients that already hold the id table can leave it out.
+    """
+    if not 0 <= turn <= MAX_TURN:
+        raise ValueError(f"Turn {turn} does not fit in the game state header")
+    flags = (
+        (victory is not None) * _HAS_VICTORY
+        | (movement is not None) * _HAS_MOVEMENT
+        | include_piece_ids * _HAS_PIECE_IDS
+    )
+    encoded = bytearray([CODEC_VERSION, flags, turn >> 8 & 0xFF, turn & 0xFF])
+    if victory is not None:
+        player, victory_type = victory
+        encoded.append(
+            (player == Player.PLAYER_TWO) << 7 | _VICTORY_TYPE_INDEX[victory_type]
+        )
+    if movement is not None:
+        previous, new = movement.previous_position, movement.new_position
+        encoded += bytes(
+            (square_of(previous.row, previous.col), square_of(new.row, new.col))
+        )
+    if include_piece_ids:
+        encoded += piece_ids.encode()
+    encoded += encode_pieces(pieces=pieces, piece_ids=piece_ids)
+    encoded += encode_pieces(pieces=captured_pieces, piece_ids=piece_ids)
+    return bytes(encoded)
+
+
+def decode_game_state(
+    data: bytes, piece_ids: Optional[PieceIds] = None
+) -> DecodedGameState:
+    """Inverse of `encode_game_state`. `piece_ids` is required if the data omits them."""
+    if len(data) < 4:
+        raise ValueError("Truncated game state")
+    if data[0] != CODEC_VERSION:
+        raise ValueError(f"Unsupported board codec version: {data[0]}")
+    flags = data[1]
+    turn = data[2] << 8 | data[3]
+    offset = 4
+    victory: Optional[tuple[Player, VictoryType]] = None
+    if flags & _HAS_VICTORY:
+        if len(data) < offset + 1:
+            raise ValueError("Truncated game state")
+        packed = data[offset]
+        victory_index = packed & _VICTORY_TYPE_MASK
+        if victory_index >= len(_VICTORY_TYPES):
+            raise ValueError(f"Unknown victory type: {victory_index}")
+        victory = (_PLAYERS[packed >> 7], _VICTORY_TYPES[victory_index])
+        offset += 1
+    movement: Optional[Movement] = None
+    if flags & _HAS_MOVEMENT:
+        if len(data) < offset + 2:
+            raise ValueError("Truncated game state")
+        previous, new = data[offset], data[offset + 1]
+        if previous >= SQUARE_COUNT or new >= SQUARE_COUNT:
+            raise ValueError(f"Invalid movement at byte {offset}")
+        movement = Movement(
+            previous_position=POSITIONS[previous], new_position=POSITIONS[new]
+        )
+        offset += 2
+    if flags & _HAS_PIECE_IDS:
+        piece_ids, offset = PieceIds.decode(data=data, offset=offset)
+    if piece_ids is None:
+        raise ValueError("Piece ids are neither encoded nor given")
+    pieces, offset = _decode_pieces(data=data, piece_ids=piece_ids, offset=offset)
+    captured_pieces, _ = _decode_pieces(data=data, piece_ids=piece_ids, offset=offset)
+    return DecodedGameState(
+        turn=turn,
+        victory=victory,
+        movement=movement,
+        piece_ids=piece_ids,
+        pieces=pieces,
+        captured_pieces=captured_pieces,
+    )
@@ -0,0 +1,184 @@
+from typing import Any
+
+from app.models.game.base import (COLS, POSITIONS, ROWS, Marking, Player,
+                                  Position, square_of)
+from app.models.game.engine import Dancer, Master, Piece, PieceType
+
+_PIECE_TYPES = {piece_type.value: piece_type for piece_type in PieceType}
+_PLAYERS = {player.value: player for player in Player}
+_MARKINGS = {marking.value: marking for marking in Marking}
+_SQUARES = {
+    (row, col): square_of(row, col) for row in range(ROWS) for col in range(COLS)
+}
+# Version of the stored piece dicts, which have the shape of `Piece.model_dump()`.
+# Rows are tagged with it when written, so bump it when that shape changes
+PIECES_SCHEMA = 1
+
+
+class CompactPiece:
+    """Engine-internal piece.
+
+    Stores the board square as a small integer and skips Pydantic validation, so the
+    engine can build, move and capture pieces without allocating new models. Convert
+    to and from `Piece` only at the service boundary.
+    """
+
+    __slots__ = ("id", "piece_type", "player", "square", "marking", "is_spy")
+
+    id: str
+    piece_type: PieceType
+    player: Player
+    square: int
+    marking: Marking
+    is_spy: bool
+
+    def __init__(
+        self,
+        id: str,
+        piece_type: PieceType,
+        player: Player,
+        square: int,
+        marking: Marking,
+        is_spy: bool,
+    ):
+        self.id = id
+        self.piece_type = piece_type
+        self.player = player
+        self.square = square
+        self.marking = marking
+        self.is_spy = is_spy
+
+    @property
+    def position(self) -> Position:
+        return POSITIONS[self.square]
+
+    def move(self, new_position: Position) -> None:
+        self.square = square_of(new_position.row, new_position.col)
+
+    def __repr__(self) -> str:
+        return (
+            f"CompactPiece(id={self.id!r}, piece_type={self.piece_type.value}, "
+            f"player={self.player.value}, square={self.square}, "
+            f"marking={self.marking.value}, is_spy={self.is_spy})"
+        )
+
+    @classmethod
+    def from_piece(cls, piece: Piece) -> "CompactPiece":
+        return cls(
+            id=piece.id,
+            piece_type=piece.piece_type,
+            player=piece.player,
+            square=square_of(piece.position.row, piece.position.col),
+            marking=piece.marking,
+            is_spy=piece.is_spy,
+        )
+
+    @classmethod
+    def from_dict(cls, piece_data: dict[str, Any]) -> "CompactPiece":
+        """Build a piece from a stored `Piece.model_dump()` dict.
+
+        Checks the same things `parse_piece` does (known enums, on-board position)
+        with plain lookups instead of a Pydantic model.
+        """
+        if not isinstance(piece_data, dict):
+            raise ValueError(f"Expected dict, got {type(piece_data)}")
+        piece_type = _PIECE_TYPES.get(piece_data.get("piece_type"))
+        if piece_type is None:
+            raise ValueError(f"Unknown piece type: {piece_data.get('piece_type')}")
+        player = _PLAYERS.get(piece_data.get("player"))
+        if player is None:
+            raise ValueError(f"Invalid player: {piece_data.get('player')}")
+        marking = _MARKINGS.get(piece_data.get("marking"))
+        if marking is None:
+            raise ValueError(f"Invalid marking: {piece_data.get('marking')}")
+        position = piece_data.get("position")
+        if not isinstance(position, dict):
+            raise ValueError(f"Invalid position: {position}")
+        row, col = position.get("row"), position.get("col")
+        if (
+            type(row) is not int
+            or type(col) is not int
+            or not 0 <= row < ROWS
+            or not 0 <= col < COLS
+        ):
+            raise ValueError(f"Invalid position: {position}")
+        is_spy = piece_data.get("is_spy")
+        if type(is_spy) is not bool:
+            raise ValueError(f"Invalid is_spy flag: {is_spy}")
+        piece_id = piece_data.get("id")
+        if not isinstance(piece_id, str):
+            raise ValueError(f"Invalid piece id: {piece_id}")
+        return cls(
+            id=piece_id,
+            piece_type=piece_type,
+            player=player,
+            square=square_of(row, col),
+            marking=marking,
+            is_spy=is_spy,
+        )
+
+    @classmethod
+    def from_dicts(
+        cls, pieces_data: list[dict[str, Any]], trusted: bool
+    ) -> list["CompactPiece"]:
+        """Build the pieces of a stored list in one pass.
+
+        A trusted list, from a row tagged with the current `PIECES_SCHEMA`, is read
+        with plain lookups, which still reject unknown values and off-board squares.
+        Untrusted lists, and trusted ones that fail to read, go through `from_dict`.
+        """
+        if trusted:
+            try:
+                return [
+                    cls(
+                        piece_data["id"],
+                        _PIECE_TYPES[piece_data["piece_type"]],
+                        _PLAYERS[piece_data["player"]],
+                        _SQUARES[
+                            piece_data["position"]["row"],
+                            piece_data["position"]["col"],
+                        ],
+                        _MARKINGS[piece_data["marking"]],
+                        piece_data["is_spy"],
+                    )
+                    for piece_data in pieces_data
+                ]
+            except (KeyError, TypeError):
+                pass
+        if not isinstance(pieces_data, list):
+            raise ValueError(f"Expected list, got {type(pieces_data)}")
+        return [cls.from_dict(piece_data) for piece_data in pieces_data]
+
+    def copy(self) -> "CompactPiece":
+        return CompactPiece(
+            id=self.id,
+            piece_type=self.piece_type,
+            player=self.player,
+            square=self.square,
+            marking=self.marking,
+            is_spy=self.is_spy,
+        )
+
+    def to_piece(self) -> Piece:
+        """Fields are already checked, so the model is constructed without validation."""
+        model = Dancer if self.piece_type == PieceType.DANCER else Master
+        return model.model_construct(
+            id=self.id,
+            piece_type=self.piece_type,
+            player=self.player,
+            position=POSITIONS[self.square],
+            marking=self.marking,
+            is_spy=self.is_spy,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Same shape as `Piece.model_dump()`."""
+        position = POSITIONS[self.square]
+        return {
+            "id": self.id,
+            "piece_type": self.piece_type,
+            "player": self.player,
+            "position": {"row": position.row, "col": position.col},
+            "marking": self.marking,
+            "is_spy": self.is_spy,
+        }
@@ -0,0 +1,194 @@
+from enum import StrEnum
+from typing import Any, NamedTuple, Optional
+
+from app.models.game.base import POSITIONS
+from app.models.game.bitboard import BitboardGameEngine
+from app.models.game.compact import CompactPiece
+from app.models.game.engine import Marking, Movement
+
+# Turns a game's history reaches back. Clients further behind get the full board.
+HISTORY_TURNS = 64
+
+
+class EventType(StrEnum):
+    MOVE = "move"
+    MARKING = "marking"
+
+
+class GameEvent(NamedTuple):
+    """One entry of a game's append-only log, numbered by `seq` from 1.
+
+    Pieces are identified by square. A move stores the turn it produced; captures and
+    victories are not stored, because replaying the move reproduces them.
+    """
+
+    seq: int
+    turn: int
+    event_type: EventType
+    square: int
+    new_square: Optional[int] = None
+    marking: Optional[Marking] = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return self._asdict()
+
+    @classmethod
+    def from_dict(cls, event_data: dict[str, Any]) -> "GameEvent":
+        marking = event_data.get("marking")
+        return cls(
+            seq=event_data["seq"],
+            turn=event_data["turn"],
+            event_type=EventType(event_data["event_type"]),
+            square=event_data["square"],
+            new_square=event_data.get("new_square"),
+            marking=Marking(marking) if marking is not None else None,
+        )
+
+
+class GameHistory:
+    """When each piece last changed, by event `seq`, so clients can be sent deltas.
+
+    Only changes after `base_seq` are known: the pieces of a game loaded from a
+    snapshot all start at the snapshot's seq, and at most `HISTORY_TURNS` turns are
+    kept. Treat as immutable, like the cached game
+    it belongs to; `record` returns an updated copy.
+    """
+
+    __slots__ = ("base_seq", "piece_seqs", "removed_seqs", "turn_seqs")
+
+    def __init__(
+        self,
+        base_seq: int,
+        piece_seqs: dict[str, int],
+        removed_seqs: dict[str, int],
+        turn_seqs: dict[int, int],
+    ):
+        self.base_seq = base_seq
+        # Seq of the last move or marking change of every piece on the board
+        self.piece_seqs = piece_seqs
+        # Seq of the move that captured each piece
+        self.removed_seqs = removed_seqs
+        # Seq of the move that produced each turn
+        self.turn_seqs = turn_seqs
+
+    @classmethod
+    def start(cls, pieces: list[CompactPiece], seq: int, turn: int) -> "GameHistory":
+        return cls(
+            base_seq=seq,
+            piece_seqs={piece.id: seq for piece in pieces},
+            removed_seqs={},
+            turn_seqs={turn: seq},
+        )
+
+    def record(
+        self,
+        seq: int,
+        piece_id: str,
+        turn: Optional[int] = None,
+        removed_ids: tuple[str, ...] = (),
+    ) -> "GameHistory":
+        history = GameHistory(
+            base_seq=self.base_seq,
+            piece_seqs=dict(self.piece_seqs),
+            removed_seqs=dict(self.removed_seqs),
+            turn_seqs=dict(self.turn_seqs),
+        )
+        history.apply(seq=seq, piece_id=piece_id, turn=turn, removed_ids=removed_ids)
+        return history
+
+    def apply(
+        self,
+        seq: int,
+        piece_id: str,
+        turn: Optional[int] = None,
+        removed_ids: tuple[str, ...] = (),
+    ) -> None:
+        """Update in place. Only for histories that are not shared yet."""
+        self.piece_seqs[piece_id] = seq
+        for removed_id in removed_ids:
+            self.piece_seqs.pop(removed_id, None)
+            self.removed_seqs[removed_id] = seq
+        if turn is not None:
+            self.turn_seqs[turn] = seq
+            if len(self.turn_seqs) > HISTORY_TURNS:
+                del self.turn_seqs[next(iter(self.turn_seqs))]
+                self.base_seq = next(iter(self.turn_seqs.values()))
+                self.removed_seqs = {
+                    piece_id: removed
+                    for piece_id, removed in self.removed_seqs.items()
+                    if removed > self.base_seq
+                }
+
+    def changes_since_turn(self, turn: int) -> Optional[tuple[list[str], list[str]]]:
+        """Ids of pieces changed and removed after the move that produced `turn`.
+
+        Returns None when that turn is older than the known history, or unknown.
+        """
+        seq = self.turn_seqs.get(turn)
+        if seq is None:
+            return None
+        return (
+            [
+                piece_id
+                for piece_id, changed in self.piece_seqs.items()
+                if changed > seq
+            ],
+            [
+                piece_id
+                for piece_id, removed in self.removed_seqs.items()
+                if removed > seq
+            ],
+        )
+
+
+class Replay(NamedTuple):
+    game_engine: BitboardGameEngine
+    # Pieces captured by the last replayed move, if any move was replayed
+    captured_pieces: Optional[list[CompactPiece]]
+    movement: Optional[Movement]
+    seq: int
+    history: GameHistory
+
+
+def replay_events(
+    pieces: list[CompactPiece], turn: int, seq: int, events: list[GameEvent]
+) -> Replay:
+    """Rebuild a game by applying logged events, in order, to a snapshot of the board."""
+    game_engine = BitboardGameEngine(pieces=pieces, turn=turn)
+    game_board = game_engine.game_board
+    history = GameHistory.start(pieces=pieces, seq=seq, turn=turn)
+    captured_pieces: Optional[list[CompactPiece]] = None
+    movement: Optional[Movement] = None
+    for event in events:
+        if event.seq != seq + 1:
+            raise ValueError(f"Expected event {seq + 1}, got {event.seq}")
+        seq = event.seq
+        if event.event_type == EventType.MARKING:
+            piece = game_board.squares[event.square]
+            if piece is None or event.marking is None:
+                raise ValueError(f"Invalid marking event: {event}")
+            game_engine.toggle_marking(piece=piece, marking=event.marking)
+            history.apply(seq=seq, piece_id=piece.id)
+            continue
+        if event.new_square is None:
+            raise ValueError(f"Invalid move event: {event}")
+        record = game_engine.make_move(square=event.square, new_square=event.new_square)
+        game_engine.turn = event.turn
+        captured_pieces = list(record.captured)
+        history.apply(
+            seq=seq,
+            piece_id=game_board.squares[event.new_square].id,
+            turn=event.turn,
+            removed_ids=tuple(piece.id for piece in captured_pieces),
+        )
+        movement = Movement(
+            previous_position=POSITIONS[event.square],
+            new_position=POSITIONS[event.new_square],
+        )
+    return Replay(
+        game_engine=game_engine,
+        captured_pieces=captured_pieces,
+        movement=movement,
+        seq=seq,
+        history=history,
+    )
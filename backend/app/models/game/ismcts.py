@@ -0,0 +1,222 @@
+import math
+import random
+import time
+from enum import StrEnum
+from typing import NamedTuple, Optional
+
+from app.models.game.base import Player
+from app.models.game.bitboard import BitboardGameEngine
+from app.models.game.compact import CompactPiece
+from app.models.game.engine import PieceType
+from app.models.game.transposition import ReplacementPolicy, TranspositionTable
+
+Move = tuple[int, int]
+
+# Slots of the per-search cache of legal moves, keyed on Zobrist hashes
+LEGAL_MOVE_SLOTS = 1 << 14
+
+
+class BotLevel(StrEnum):
+    EASY = "easy"
+    MEDIUM = "medium"
+    HARD = "hard"
+
+
+class SearchConfig(NamedTuple):
+    # Seconds of search per move, per worker
+    time_budget: float
+    # Independent searches run in parallel and merged at the root
+    workers: int
+    # UCB exploration constant
+    exploration: float
+    # Random plies played after leaving the tree before a game is scored as a draw
+    rollout_depth: int
+
+
+BOT_LEVELS: dict[BotLevel, SearchConfig] = {
+    BotLevel.EASY: SearchConfig(
+        time_budget=0.25, workers=1, exploration=1.4, rollout_depth=20
+    ),
+    BotLevel.MEDIUM: SearchConfig(
+        time_budget=1.0, workers=2, exploration=1.0, rollout_depth=40
+    ),
+    BotLevel.HARD: SearchConfig(
+        time_budget=2.5, workers=4, exploration=0.7, rollout_depth=60
+    ),
+}
+
+
+def player_for_turn(turn: int) -> Player:
+    return Player.PLAYER_ONE if turn % 2 == 0 else Player.PLAYER_TWO
+
+
+class _Node:
+    __slots__ = ("move", "parent", "player", "children", "visits", "wins", "available")
+
+    def __init__(
+        self, move: Optional[Move], parent: Optional["_Node"], player: Optional[Player]
+    ):
+        self.move = move
+        self.parent = parent
+        # The player who made `move`, and whose wins this node counts
+        self.player = player
+        self.children: dict[Move, _Node] = {}
+        self.visits = 0
+        self.wins = 0.0
+        self.available = 1
+
+    def ucb(self, exploration: float) -> float:
+        return self.wins / self.visits + exploration * math.sqrt(
+            math.log(self.available) / self.visits
+        )
+
+
+def determinize(
+    pieces: list[CompactPiece], turn: int, bot_player: Player, rng: random.Random
+) -> BitboardGameEngine:
+    """Build an engine where one of the opponent's Dancers, chosen at random, is the spy.
+
+    The bot only knows its own spy, so every search iteration samples the hidden one.
+    """
+    opponent_dancers = [
+        index
+        for index, piece in enumerate(pieces)
+        if piece.player != bot_player and piece.piece_type == PieceType.DANCER
+    ]
+    spy_index = rng.choice(opponent_dancers) if opponent_dancers else -1
+    sampled: list[CompactPiece] = []
+    for index, piece in enumerate(pieces):
+        is_spy = piece.is_spy if piece.player == bot_player else index == spy_index
+        sampled.append(
+            CompactPiece(
+                id=piece.id,
+                piece_type=piece.piece_type,
+                player=piece.player,
+                square=piece.square,
+                marking=piece.marking,
+                is_spy=is_spy,
+            )
+        )
+    return BitboardGameEngine(pieces=sampled, turn=turn)
+
+
+def _rollout(
+    game_engine: BitboardGameEngine,
+    bot_player: Player,
+    depth: int,
+    rng: random.Random,
+) -> float:
+    for _ in range(depth):
+        if game_engine.victory is not None:
+            break
+        moves = game_engine.generate_moves(player=player_for_turn(game_engine.turn))
+        if not moves:
+            break
+        game_engine.make_move(*rng.choice(moves))
+    if game_engine.victory is None:
+        return 0.5
+    return 1.0 if game_engine.victory[0] == bot_player else 0.0
+
+
+def search(
+    pieces: list[CompactPiece],
+    turn: int,
+    bot_player: Player,
+    config: SearchConfig,
+    seed: Optional[int] = None,
+) -> dict[Move, int]:
+    """Single-observer information-set MCTS from the bot's point of view.
+
+    Runs until the time budget is spent and returns the visit count of every root
+    move. Module-level and picklable so it can run in a process pool.
+    """
+    root = _grow_tree(
+        pieces=pieces,
+        turn=turn,
+        bot_player=bot_player,
+        config=config,
+        rng=random.Random(seed),
+    )
+    return {move: child.visits for move, child in root.children.items()}
+
+
+def _grow_tree(
+    pieces: list[CompactPiece],
+    turn: int,
+    bot_player: Player,
+    config: SearchConfig,
+    rng: random.Random,
+) -> _Node:
+    root = _Node(move=None, parent=None, player=None)
+    # Tree positions recur on most iterations, so their moves are generated once
+    legal_moves = TranspositionTable(
+        size=LEGAL_MOVE_SLOTS, policy=ReplacementPolicy.ALWAYS
+    )
+    deadline = time.monotonic() + config.time_budget
+    while time.monotonic() < deadline:
+        game_engine = determinize(
+            pieces=pieces, turn=turn, bot_player=bot_player, rng=rng
+        )
+        node = root
+
+        # Selection and expansion, restricted to moves legal in this determinization
+        while game_engine.victory is None:
+            mover = player_for_turn(game_engine.turn)
+            position_hash = game_engine.zobrist_hash
+            entry = legal_moves.get(key=position_hash)
+            if entry is not None:
+                moves = entry.value
+            else:
+                moves = game_engine.generate_moves(player=mover)
+                legal_moves.store(key=position_hash, value=moves)
+            if not moves:
+                break
+            # Every legal child was available on this visit, whether the node is
+            # expanded or selected from. A new child starts out counting it
+            children = node.children
+            untried = []
+            for move in moves:
+                child = children.get(move)
+                if child is None:
+                    untried.append(move)
+                else:
+                    child.available += 1
+            if untried:
+                move = rng.choice(untried)
+                game_engine.make_move(*move)
+                child = _Node(move=move, parent=node, player=mover)
+                children[move] = child
+                node = child
+                break
+            move = max(
+                moves,
+                key=lambda m: children[m].ucb(exploration=config.exploration),
+            )
+            game_engine.make_move(*move)
+            node = children[move]
+
+        reward = _rollout(
+            game_engine=game_engine,
+            bot_player=bot_player,
+            depth=config.rollout_depth,
+            rng=rng,
+        )
+
+        while node is not None:
+            node.visits += 1
+            if node.player is not None:
+                node.wins += reward if node.player == bot_player else 1.0 - reward
+            node = node.parent
+
+    return root
+
+
+def best_move(visit_counts: list[dict[Move, int]]) -> Optional[Move]:
+    """Merge root visit counts from parallel searches and pick the most visited move."""
+    totals: dict[Move, int] = {}
+    for counts in visit_counts:
+        for move, visits in counts.items():
+            totals[move] = totals.get(move, 0) + visits
+    if not totals:
+        return None
+    return max(totals, key=lambda move: totals[move])
@@ -0,0 +1,101 @@
+from enum import StrEnum
+from typing import Any, NamedTuple, Optional
+
+# Rough per-slot cost of a stored entry (tuple, boxed ints and list slot), used to
+# turn a memory cap into a slot count. Stored values are not counted.
+ENTRY_BYTES = 144
+
+
+class ReplacementPolicy(StrEnum):
+    ALWAYS = "always"
+    DEPTH_PREFERRED = "depth_preferred"
+    AGE_PREFERRED = "age_preferred"
+
+
+class TranspositionEntry(NamedTuple):
+    key: int
+    depth: int
+    value: Any
+    generation: int
+
+
+class TranspositionTable:
+    """Fixed-size table keyed on Zobrist hashes, one entry per slot.
+
+    The slot count is a power of two, taken from `size` or derived from `max_bytes`.
+    When two positions share a slot, the replacement policy decides which one stays:
+    - ALWAYS: the newest entry wins
+    - DEPTH_PREFERRED: the deeper search wins; entries from older generations always lose
+    - AGE_PREFERRED: only entries from older generations are replaced
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        policy: ReplacementPolicy = ReplacementPolicy.DEPTH_PREFERRED,
+    ):
+        if size is None:
+            if max_bytes is None:
+                raise ValueError("Either size or max_bytes must be set")
+            size = max_bytes // ENTRY_BYTES
+        elif max_bytes is not None:
+            size = min(size, max_bytes // ENTRY_BYTES)
+        if size < 1:
+            raise ValueError(f"Transposition table too small: {size} slots")
+        self.size = 1 << (size.bit_length() - 1)
+        self.policy = policy
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.replacements = 0
+        self.rejections = 0
+        self._mask = self.size - 1
+        self._entries: list[Optional[TranspositionEntry]] = [None] * self.size
+
+    def get(self, key: int) -> Optional[TranspositionEntry]:
+        entry = self._entries[key & self._mask]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def store(self, key: int, value: Any, depth: int = 0) -> bool:
+        """Store a value for a position. Returns False if the policy kept the old entry."""
+        slot = key & self._mask
+        existing = self._entries[slot]
+        if existing is not None and existing.key != key:
+            if not self._should_replace(existing=existing, depth=depth):
+                self.rejections += 1
+                return False
+            self.replacements += 1
+        self._entries[slot] = TranspositionEntry(
+            key=key, depth=depth, value=value, generation=self.generation
+        )
+        self.stores += 1
+        return True
+
+    def _should_replace(self, existing: TranspositionEntry, depth: int) -> bool:
+        if self.policy == ReplacementPolicy.ALWAYS:
+            return True
+        is_stale = existing.generation != self.generation
+        if self.policy == ReplacementPolicy.AGE_PREFERRED:
+            return is_stale
+        return is_stale or depth >= existing.depth
+
+    def new_generation(self) -> None:
+        """Mark existing entries as stale, e.g. once a new root position is searched."""
+        self.generation += 1
+
+    def clear(self) -> None:
+        self._entries = [None] * self.size
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return sum(entry is not None for entry in self._entries)
+
+    def __contains__(self, key: int) -> bool:
+        entry = self._entries[key & self._mask]
+        return entry is not None and entry.key == key
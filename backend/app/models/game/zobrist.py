@@ -0,0 +1,70 @@
+import random
+
+from app.models.game.base import SQUARE_COUNT, Marking, Player
+from app.models.game.compact import CompactPiece
+from app.models.game.engine import PieceType
+
+# Fixed seed so hashes are stable across processes and restarts
+ZOBRIST_SEED = 0x5A5A_2025
+
+_PIECE_TYPE_INDEX = {piece_type: index for index, piece_type in enumerate(PieceType)}
+_PLAYER_INDEX = {player: index for index, player in enumerate(Player)}
+_MARKING_INDEX = {marking: index for index, marking in enumerate(Marking)}
+PIECE_KIND_COUNT = len(PieceType) * len(Player) * 2 * len(Marking)
+
+_rng = random.Random(ZOBRIST_SEED)
+# One key per (piece kind, square), flattened as `kind * SQUARE_COUNT + square`
+PIECE_KEYS: list[int] = [
+    _rng.getrandbits(64) for _ in range(PIECE_KIND_COUNT * SQUARE_COUNT)
+]
+# Mixed in when player two is to move, i.e. when `turn` is odd
+SIDE_TO_MOVE_KEY: int = _rng.getrandbits(64)
+
+
+def piece_kind(
+    piece_type: PieceType, player: Player, is_spy: bool, marking: Marking
+) -> int:
+    """Index of a piece's type, owner, spy flag and marking combination."""
+    return (
+        (_PIECE_TYPE_INDEX[piece_type] * len(Player) + _PLAYER_INDEX[player]) * 2
+        + is_spy
+    ) * len(Marking) + _MARKING_INDEX[marking]
+
+
+# `_KEY_OFFSETS[piece_type][player][is_spy][marking]` is `piece_kind(...) * SQUARE_COUNT`
+_KEY_OFFSETS = {
+    piece_type: {
+        player: {
+            is_spy: {
+                marking: piece_kind(
+                    piece_type=piece_type,
+                    player=player,
+                    is_spy=is_spy,
+                    marking=marking,
+                )
+                * SQUARE_COUNT
+                for marking in Marking
+            }
+            for is_spy in (False, True)
+        }
+        for player in Player
+    }
+    for piece_type in PieceType
+}
+
+
+def piece_key(piece: CompactPiece, square: int) -> int:
+    offset = _KEY_OFFSETS[piece.piece_type][piece.player][piece.is_spy][piece.marking]
+    return PIECE_KEYS[offset + square]
+
+
+def side_to_move_key(turn: int) -> int:
+    return SIDE_TO_MOVE_KEY if turn % 2 else 0
+
+
+def hash_pieces(pieces: list[CompactPiece], turn: int) -> int:
+    """Hash a position from scratch. Engines keep this up to date incrementally."""
+    position_hash = side_to_move_key(turn=turn)
+    for piece in pieces:
+        position_hash ^= piece_key(piece=piece, square=piece.square)
+    return position_hash
@@ -0,0 +1,295 @@
+import asyncio
+import functools
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional
+
+from app.utils.metrics import Metrics
+
+log = logging.getLogger(__name__)
+
+GAME_COLUMNS = (
+    "pieces",
+    "captured_pieces",
+    "winner",
+    "victory_type",
+    "movement",
+    "turn",
+    "version",
+    "pieces_schema",
+)
+ROOM_COLUMNS = ("player_one_id", "player_two_id", "status")
+EVENT_COLUMNS = ("seq", "turn", "event_type", "square", "new_square", "marking")
+SNAPSHOT_COLUMNS = ("seq", "turn", "board", "captured_board")
+
+# Column defaults of the Supabase tables, applied by the local backends on insert
+GAME_DEFAULTS: dict[str, Any] = {
+    "pieces": [],
+    "captured_pieces": [],
+    "winner": None,
+    "victory_type": None,
+    "movement": None,
+    "turn": 0,
+    "version": 0,
+    "pieces_schema": None,
+}
+ROOM_DEFAULTS: dict[str, Any] = {
+    "player_one_id": None,
+    "player_two_id": None,
+    "status": "waiting",
+}
+
+# Table and operation of each query method, for the metrics every backend records
+QUERY_LABELS: dict[str, tuple[str, str]] = {
+    "get_game": ("games", "select"),
+    "get_games": ("games", "select"),
+    "get_game_version": ("games", "select"),
+    "insert_game": ("games", "insert"),
+    "insert_games": ("games", "insert"),
+    "update_game": ("games", "update"),
+    "update_games": ("games", "update"),
+    "append_event": ("game_events", "insert"),
+    "get_events": ("game_events", "select"),
+    "insert_snapshot": ("game_snapshots", "insert"),
+    "get_latest_snapshot": ("game_snapshots", "select"),
+    "get_room": ("rooms", "select"),
+    "get_rooms": ("rooms", "select"),
+    "insert_rooms": ("rooms", "insert"),
+    "update_room": ("rooms", "update"),
+    # A whole `commit_move` in one database function, where a backend has one
+    "_commit_move_rpc": ("games", "rpc"),
+}
+QUERY_SECONDS = Metrics().histogram(
+    "sashay_db_query_duration_seconds",
+    "Time for one database round trip, by table and operation.",
+    ("table", "operation"),
+)
+QUERY_ERRORS = Metrics().counter(
+    "sashay_db_query_errors",
+    "Database calls that raised, by table and operation.",
+    ("table", "operation"),
+)
+
+
+class Repository(ABC):
+    """Storage for the `games`, `game_events`, `game_snapshots` and `rooms` tables.
+
+    Rows are plain dicts keyed by column name, shaped like Supabase rows and including
+    `game_id`. Updates only touch the columns they are given.
+    """
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        for name, (table, operation) in QUERY_LABELS.items():
+            method = cls.__dict__.get(name)
+            if method is not None:
+                setattr(cls, name, _timed(method, table=table, operation=operation))
+
+    ### Games
+
+    @abstractmethod
+    async def get_game(self, game_id: str) -> Optional[dict[str, Any]]: ...
+
+    @abstractmethod
+    async def get_games(self, game_ids: list[str]) -> dict[str, dict[str, Any]]:
+        """Rows for every game that exists, keyed by game id."""
+        ...
+
+    @abstractmethod
+    async def get_game_version(self, game_id: str) -> Optional[int]:
+        """Only the `version` of a game, which every write to it bumps."""
+        ...
+
+    @abstractmethod
+    async def insert_game(self, game_id: str, values: dict[str, Any]) -> bool:
+        """Returns False if the game already exists."""
+        ...
+
+    @abstractmethod
+    async def insert_games(self, rows: list[dict[str, Any]]) -> None:
+        """Insert several games at once. Every row must include `game_id`."""
+        ...
+
+    @abstractmethod
+    async def update_game(
+        self,
+        game_id: str,
+        values: dict[str, Any],
+        expected_version: Optional[int] = None,
+        below_turn: Optional[int] = None,
+    ) -> bool:
+        """Update a game, only if its version is still `expected_version` and its
+        turn is lower than `below_turn`, for whichever of them is set.
+
+        Returns False if no row was updated, because the game does not exist or the
+        condition failed.
+        """
+        ...
+
+    @abstractmethod
+    async def update_games(self, updates: dict[str, dict[str, Any]]) -> None:
+        """Apply unconditional updates to several games, keyed by game id."""
+        ...
+
+    ### Game history
+
+    @abstractmethod
+    async def append_event(self, game_id: str, event: dict[str, Any]) -> bool:
+        """Append to a game's log. Returns False if an event with the same `seq`
+        exists, because another write got there first."""
+        ...
+
+    @abstractmethod
+    async def get_events(
+        self, game_id: str, after_seq: int = 0
+    ) -> list[dict[str, Any]]:
+        """Events with a `seq` greater than `after_seq`, oldest first."""
+        ...
+
+    @abstractmethod
+    async def insert_snapshot(self, game_id: str, snapshot: dict[str, Any]) -> None: ...
+
+    @abstractmethod
+    async def get_latest_snapshot(self, game_id: str) -> Optional[dict[str, Any]]: ...
+
+    ### Rooms
+
+    @abstractmethod
+    async def get_room(self, game_id: str) -> Optional[dict[str, Any]]: ...
+
+    @abstractmethod
+    async def get_rooms(self, game_ids: list[str]) -> dict[str, dict[str, Any]]: ...
+
+    @abstractmethod
+    async def insert_rooms(self, rows: list[dict[str, Any]]) -> None: ...
+
+    @abstractmethod
+    async def update_room(
+        self,
+        game_id: str,
+        values: dict[str, Any],
+        where_null: tuple[str, ...] = (),
+        where_not_null: tuple[str, ...] = (),
+    ) -> bool:
+        """Update a room, only if the columns in `where_null` are null and those in
+        `where_not_null` are not. Returns False if no row was updated."""
+        ...
+
+    async def create_room(
+        self, game_id: str, player_one_id: Optional[str], player_two_id: Optional[str]
+    ) -> None:
+        await self.insert_rooms(
+            rows=[
+                {
+                    "game_id": game_id,
+                    "player_one_id": player_one_id,
+                    "player_two_id": player_two_id,
+                }
+            ]
+        )
+
+    async def set_room_status(self, game_id: str, status: str) -> bool:
+        return await self.update_room(game_id=game_id, values={"status": status})
+
+    async def commit_move(
+        self,
+        game_id: str,
+        event: dict[str, Any],
+        values: dict[str, Any],
+        expected_version: int,
+        room_status: Optional[str] = None,
+        snapshot: Optional[dict[str, Any]] = None,
+        previous_values: Optional[dict[str, Any]] = None,
+    ) -> bool:
+        """Write the game row `values` and bump its version, append the event of a
+        move or marking change, then write the room status and the snapshot, for
+        those that are given.
+
+        Returns False if the row's version is no longer `expected_version`, having
+        written nothing, or if the event's `seq` is taken. Checking the version
+        first keeps state read before another write, such as a setup, out of the
+        log. Without a transaction, an event that cannot be appended, for a taken
+        `seq` or an error, leaves the row ahead of the log, so the row is put back
+        to `previous_values`, the values it held for the columns in `values`, and
+        `expected_version`. Backends that can write the whole commit at once
+        should.
+        """
+        if not await self.update_game(
+            game_id=game_id,
+            values={**values, "version": expected_version + 1},
+            expected_version=expected_version,
+        ):
+            return False
+        try:
+            appended = await self.append_event(game_id=game_id, event=event)
+        except Exception:
+            await self._revert_commit(
+                game_id=game_id,
+                previous_values=previous_values or {},
+                expected_version=expected_version,
+            )
+            raise
+        if not appended:
+            await self._revert_commit(
+                game_id=game_id,
+                previous_values=previous_values or {},
+                expected_version=expected_version,
+            )
+            return False
+        writes = []
+        if room_status is not None:
+            writes.append(self.set_room_status(game_id=game_id, status=room_status))
+        if snapshot is not None:
+            writes.append(self.insert_snapshot(game_id=game_id, snapshot=snapshot))
+        await asyncio.gather(*writes)
+        return True
+
+    async def _revert_commit(
+        self, game_id: str, previous_values: dict[str, Any], expected_version: int
+    ) -> None:
+        """Undo the row write of a commit whose event was not logged.
+
+        Skipped if another commit has written the row since, as it was built on
+        the row this one left.
+        """
+        try:
+            reverted = await self.update_game(
+                game_id=game_id,
+                values={**previous_values, "version": expected_version},
+                expected_version=expected_version + 1,
+            )
+        except Exception:
+            log.exception("Could not revert game %s after a failed commit", game_id)
+            return
+        if not reverted:
+            log.error(
+                "Game %s was written after a commit that failed to log its event, "
+                "so its row is ahead of its log",
+                game_id,
+            )
+
+    async def ping(self) -> None:
+        """Raise if the store cannot be reached."""
+        return None
+
+    async def close(self) -> None:
+        """Release connections. The repository is unusable afterwards."""
+        return None
+
+
+def _timed(
+    method: Callable[..., Any], table: str, operation: str
+) -> Callable[..., Any]:
+    @functools.wraps(method)
+    async def timed(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        except Exception:
+            QUERY_ERRORS.inc(table, operation)
+            raise
+        finally:
+            QUERY_SECONDS.observe(time.perf_counter() - start, table, operation)
+
+    return timed
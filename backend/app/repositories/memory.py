@@ -0,0 +1,135 @@
+import json
+from typing import Any, Optional
+
+from app.repositories.base import GAME_DEFAULTS, ROOM_DEFAULTS, Repository
+
+
+class MemoryRepository(Repository):
+    """Dict-backed store for benchmarks and load tests.
+
+    Values go through a JSON round trip on the way in and out, like they would over
+    the network, so callers never share mutable rows with the store.
+    """
+
+    def __init__(self) -> None:
+        self.games: dict[str, str] = {}
+        self.rooms: dict[str, str] = {}
+        self.events: dict[str, list[str]] = {}
+        self.snapshots: dict[str, list[str]] = {}
+
+    async def get_game(self, game_id: str) -> Optional[dict[str, Any]]:
+        return _load(self.games.get(game_id))
+
+    async def get_games(self, game_ids: list[str]) -> dict[str, dict[str, Any]]:
+        return {
+            game_id: json.loads(self.games[game_id])
+            for game_id in game_ids
+            if game_id in self.games
+        }
+
+    async def get_game_version(self, game_id: str) -> Optional[int]:
+        row = _load(self.games.get(game_id))
+        return row["version"] if row is not None else None
+
+    async def insert_game(self, game_id: str, values: dict[str, Any]) -> bool:
+        if game_id in self.games:
+            return False
+        _insert(
+            table=self.games,
+            defaults=GAME_DEFAULTS,
+            row={"game_id": game_id, **values},
+        )
+        return True
+
+    async def insert_games(self, rows: list[dict[str, Any]]) -> None:
+        for row in rows:
+            _insert(table=self.games, defaults=GAME_DEFAULTS, row=row)
+
+    async def update_game(
+        self,
+        game_id: str,
+        values: dict[str, Any],
+        expected_version: Optional[int] = None,
+        below_turn: Optional[int] = None,
+    ) -> bool:
+        row = _load(self.games.get(game_id))
+        if (
+            row is None
+            or (expected_version is not None and row["version"] != expected_version)
+            or (below_turn is not None and row["turn"] >= below_turn)
+        ):
+            return False
+        row.update(values)
+        self.games[game_id] = json.dumps(row)
+        return True
+
+    async def update_games(self, updates: dict[str, dict[str, Any]]) -> None:
+        for game_id, values in updates.items():
+            await self.update_game(game_id=game_id, values=values)
+
+    async def append_event(self, game_id: str, event: dict[str, Any]) -> bool:
+        events = self.events.setdefault(game_id, [])
+        if event["seq"] <= len(events):
+            return False
+        if event["seq"] != len(events) + 1:
+            raise ValueError(f"Out of order event: {event['seq']}")
+        events.append(json.dumps(event))
+        return True
+
+    async def get_events(
+        self, game_id: str, after_seq: int = 0
+    ) -> list[dict[str, Any]]:
+        # Events are stored in order from seq 1, so seq n is at index n - 1
+        return [json.loads(event) for event in self.events.get(game_id, [])[after_seq:]]
+
+    async def insert_snapshot(self, game_id: str, snapshot: dict[str, Any]) -> None:
+        self.snapshots.setdefault(game_id, []).append(json.dumps(snapshot))
+
+    async def get_latest_snapshot(self, game_id: str) -> Optional[dict[str, Any]]:
+        snapshots = self.snapshots.get(game_id)
+        return json.loads(snapshots[-1]) if snapshots else None
+
+    async def get_room(self, game_id: str) -> Optional[dict[str, Any]]:
+        return _load(self.rooms.get(game_id))
+
+    async def get_rooms(self, game_ids: list[str]) -> dict[str, dict[str, Any]]:
+        return {
+            game_id: json.loads(self.rooms[game_id])
+            for game_id in game_ids
+            if game_id in self.rooms
+        }
+
+    async def insert_rooms(self, rows: list[dict[str, Any]]) -> None:
+        for row in rows:
+            _insert(table=self.rooms, defaults=ROOM_DEFAULTS, row=row)
+
+    async def update_room(
+        self,
+        game_id: str,
+        values: dict[str, Any],
+        where_null: tuple[str, ...] = (),
+        where_not_null: tuple[str, ...] = (),
+    ) -> bool:
+        row = _load(self.rooms.get(game_id))
+        if (
+            row is None
+            or any(row.get(column) is not None for column in where_null)
+            or any(row.get(column) is None for column in where_not_null)
+        ):
+            return False
+        row.update(values)
+        self.rooms[game_id] = json.dumps(row)
+        return True
+
+
+def _load(stored: Optional[str]) -> Optional[dict[str, Any]]:
+    return None if stored is None else json.loads(stored)
+
+
+def _insert(
+    table: dict[str, str], defaults: dict[str, Any], row: dict[str, Any]
+) -> None:
+    game_id = row["game_id"]
+    if game_id in table:
+        raise ValueError(f"Duplicate game_id: {game_id}")
+    table[game_id] = json.dumps({**defaults, **row})
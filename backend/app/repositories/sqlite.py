@@ -0,0 +1,290 @@
+import asyncio
+import json
+import sqlite3
+import threading
+from typing import Any, Optional
+
+from app.repositories.base import (EVENT_COLUMNS, GAME_COLUMNS, GAME_DEFAULTS,
+                                   ROOM_COLUMNS, ROOM_DEFAULTS,
+                                   SNAPSHOT_COLUMNS, Repository)
+
+# Columns holding lists or objects, stored as JSON text
+JSON_COLUMNS = {"pieces", "captured_pieces", "movement"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id TEXT PRIMARY KEY,
+    pieces TEXT NOT NULL,
+    captured_pieces TEXT NOT NULL,
+    winner TEXT,
+    victory_type TEXT,
+    movement TEXT,
+    turn INTEGER NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0,
+    pieces_schema INTEGER
+);
+CREATE TABLE IF NOT EXISTS game_events (
+    game_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    turn INTEGER NOT NULL,
+    event_type TEXT NOT NULL,
+    square INTEGER NOT NULL,
+    new_square INTEGER,
+    marking TEXT,
+    PRIMARY KEY (game_id, seq)
+);
+CREATE TABLE IF NOT EXISTS game_snapshots (
+    game_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    turn INTEGER NOT NULL,
+    board TEXT NOT NULL,
+    captured_board TEXT NOT NULL,
+    PRIMARY KEY (game_id, seq)
+);
+CREATE TABLE IF NOT EXISTS rooms (
+    game_id TEXT PRIMARY KEY,
+    player_one_id TEXT,
+    player_two_id TEXT,
+    status TEXT NOT NULL
+);
+"""
+
+
+class SqliteRepository(Repository):
+    """Single-file store for local deployments, with the schema of the Supabase tables.
+
+    `sqlite3` is blocking, so every call runs in a worker thread. One connection is
+    shared and guarded by a lock, which keeps writes serialized.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        columns = {
+            row["name"] for row in self._connection.execute("PRAGMA table_info(games)")
+        }
+        if "version" not in columns:
+            # Files created before games had a version
+            self._connection.execute(
+                "ALTER TABLE games ADD COLUMN version INTEGER NOT NULL DEFAULT 0"
+            )
+        if "pieces_schema" not in columns:
+            # Files created before stored pieces were tagged
+            self._connection.execute(
+                "ALTER TABLE games ADD COLUMN pieces_schema INTEGER"
+            )
+
+    async def _run(self, sql: str, parameters: Any = (), many: bool = False) -> Any:
+        return await asyncio.to_thread(self._execute, sql, parameters, many)
+
+    def _execute(self, sql: str, parameters: Any, many: bool) -> Any:
+        with self._lock, self._connection:
+            if many:
+                return self._connection.executemany(sql, parameters).rowcount
+            cursor = self._connection.execute(sql, parameters)
+            if sql.lstrip().upper().startswith("SELECT"):
+                return cursor.fetchall()
+            return cursor.rowcount
+
+    async def get_game(self, game_id: str) -> Optional[dict[str, Any]]:
+        games = await self.get_games(game_ids=[game_id])
+        return games.get(game_id)
+
+    async def get_games(self, game_ids: list[str]) -> dict[str, dict[str, Any]]:
+        return await self._select(
+            table="games", columns=GAME_COLUMNS, game_ids=game_ids
+        )
+
+    async def get_game_version(self, game_id: str) -> Optional[int]:
+        rows = await self._run("SELECT version FROM games WHERE game_id = ?", [game_id])
+        return rows[0]["version"] if rows else None
+
+    async def insert_game(self, game_id: str, values: dict[str, Any]) -> bool:
+        try:
+            await self.insert_games(rows=[{"game_id": game_id, **values}])
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    async def insert_games(self, rows: list[dict[str, Any]]) -> None:
+        await self._insert(
+            table="games", columns=GAME_COLUMNS, defaults=GAME_DEFAULTS, rows=rows
+        )
+
+    async def update_game(
+        self,
+        game_id: str,
+        values: dict[str, Any],
+        expected_version: Optional[int] = None,
+        below_turn: Optional[int] = None,
+    ) -> bool:
+        sql, parameters = _update_statement(
+            table="games", columns=GAME_COLUMNS, values=values
+        )
+        sql += " WHERE game_id = ?"
+        parameters.append(game_id)
+        if expected_version is not None:
+            sql += " AND version = ?"
+            parameters.append(expected_version)
+        if below_turn is not None:
+            sql += " AND turn < ?"
+            parameters.append(below_turn)
+        return await self._run(sql, parameters) > 0
+
+    async def update_games(self, updates: dict[str, dict[str, Any]]) -> None:
+        # Rows are grouped by the columns they set, so each group is one executemany
+        statements: dict[tuple[str, ...], list[list[Any]]] = {}
+        for game_id, values in updates.items():
+            _, parameters = _update_statement(
+                table="games", columns=GAME_COLUMNS, values=values
+            )
+            statements.setdefault(tuple(values), []).append([*parameters, game_id])
+        for columns, parameters in statements.items():
+            sql, _ = _update_statement(
+                table="games",
+                columns=GAME_COLUMNS,
+                values=dict.fromkeys(columns),
+            )
+            await self._run(sql + " WHERE game_id = ?", parameters, many=True)
+
+    async def append_event(self, game_id: str, event: dict[str, Any]) -> bool:
+        try:
+            await self._run(
+                f"INSERT INTO game_events (game_id, {', '.join(EVENT_COLUMNS)})"
+                f" VALUES ({', '.join('?' * (len(EVENT_COLUMNS) + 1))})",
+                [game_id] + [event.get(column) for column in EVENT_COLUMNS],
+            )
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    async def get_events(
+        self, game_id: str, after_seq: int = 0
+    ) -> list[dict[str, Any]]:
+        rows = await self._run(
+            f"SELECT {', '.join(EVENT_COLUMNS)} FROM game_events"
+            " WHERE game_id = ? AND seq > ? ORDER BY seq",
+            [game_id, after_seq],
+        )
+        return [dict(row) for row in rows]
+
+    async def insert_snapshot(self, game_id: str, snapshot: dict[str, Any]) -> None:
+        await self._run(
+            f"INSERT INTO game_snapshots (game_id, {', '.join(SNAPSHOT_COLUMNS)})"
+            f" VALUES ({', '.join('?' * (len(SNAPSHOT_COLUMNS) + 1))})",
+            [game_id]
+            + [_encode(column, snapshot[column]) for column in SNAPSHOT_COLUMNS],
+        )
+
+    async def get_latest_snapshot(self, game_id: str) -> Optional[dict[str, Any]]:
+        rows = await self._run(
+            f"SELECT {', '.join(SNAPSHOT_COLUMNS)} FROM game_snapshots"
+            " WHERE game_id = ? ORDER BY seq DESC LIMIT 1",
+            [game_id],
+        )
+        return _decode(rows[0]) if rows else None
+
+    async def get_room(self, game_id: str) -> Optional[dict[str, Any]]:
+        rooms = await self.get_rooms(game_ids=[game_id])
+        return rooms.get(game_id)
+
+    async def get_rooms(self, game_ids: list[str]) -> dict[str, dict[str, Any]]:
+        return await self._select(
+            table="rooms", columns=ROOM_COLUMNS, game_ids=game_ids
+        )
+
+    async def insert_rooms(self, rows: list[dict[str, Any]]) -> None:
+        await self._insert(
+            table="rooms", columns=ROOM_COLUMNS, defaults=ROOM_DEFAULTS, rows=rows
+        )
+
+    async def update_room(
+        self,
+        game_id: str,
+        values: dict[str, Any],
+        where_null: tuple[str, ...] = (),
+        where_not_null: tuple[str, ...] = (),
+    ) -> bool:
+        sql, parameters = _update_statement(
+            table="rooms", columns=ROOM_COLUMNS, values=values
+        )
+        sql += " WHERE game_id = ?"
+        parameters.append(game_id)
+        unknown = set(where_null + where_not_null) - set(ROOM_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown rooms columns: {sorted(unknown)}")
+        sql += "".join(f" AND {column} IS NULL" for column in where_null)
+        sql += "".join(f" AND {column} IS NOT NULL" for column in where_not_null)
+        return await self._run(sql, parameters) > 0
+
+    async def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    async def _select(
+        self, table: str, columns: tuple[str, ...], game_ids: list[str]
+    ) -> dict[str, dict[str, Any]]:
+        if not game_ids:
+            return {}
+        placeholders = ", ".join("?" * len(game_ids))
+        rows = await self._run(
+            f"SELECT game_id, {', '.join(columns)} FROM {table}"
+            f" WHERE game_id IN ({placeholders})",
+            game_ids,
+        )
+        return {row["game_id"]: _decode(row) for row in rows}
+
+    async def _insert(
+        self,
+        table: str,
+        columns: tuple[str, ...],
+        defaults: dict[str, Any],
+        rows: list[dict[str, Any]],
+    ) -> None:
+        if not rows:
+            return
+        placeholders = ", ".join("?" * (len(columns) + 1))
+        await self._run(
+            f"INSERT INTO {table} (game_id, {', '.join(columns)})"
+            f" VALUES ({placeholders})",
+            [_insert_parameters(columns, {**defaults, **row}) for row in rows],
+            many=True,
+        )
+
+
+def _update_statement(
+    table: str, columns: tuple[str, ...], values: dict[str, Any]
+) -> tuple[str, list[Any]]:
+    unknown = set(values) - set(columns)
+    if unknown:
+        raise ValueError(f"Unknown {table} columns: {sorted(unknown)}")
+    assignments = ", ".join(f"{column} = ?" for column in values)
+    parameters = [_encode(column, value) for column, value in values.items()]
+    return f"UPDATE {table} SET {assignments}", parameters
+
+
+def _insert_parameters(columns: tuple[str, ...], row: dict[str, Any]) -> list[Any]:
+    return [row["game_id"]] + [_encode(column, row[column]) for column in columns]
+
+
+def _encode(column: str, value: Any) -> Any:
+    if column in JSON_COLUMNS:
+        return None if value is None else json.dumps(value)
+    return value
+
+
+def _decode(row: sqlite3.Row) -> dict[str, Any]:
+    return {
+        column: (
+            json.loads(row[column])
+            if column in JSON_COLUMNS and row[column] is not None
+            else row[column]
+        )
+        for column in row.keys()
+    }
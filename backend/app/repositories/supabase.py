@@ -0,0 +1,230 @@
+import asyncio
+from typing import Any, Optional
+
+from supabase import AsyncClient, PostgrestAPIError
+
+from app.repositories.base import (EVENT_COLUMNS, GAME_COLUMNS, ROOM_COLUMNS,
+                                   SNAPSHOT_COLUMNS, Repository)
+
+# Postgres error code for a duplicate primary key
+UNIQUE_VIOLATION = "23505"
+
+
+class SupabaseRepository(Repository):
+    def __init__(self, client: AsyncClient, use_rpc: bool = False):
+        self.client = client
+        # Whether the database has the functions in the README, which do a whole
+        # write in one round trip
+        self.use_rpc = use_rpc
+
+    async def get_game(self, game_id: str) -> Optional[dict[str, Any]]:
+        response = (
+            await self.client.table("games")
+            .select("game_id", *GAME_COLUMNS)
+            .eq("game_id", game_id)
+            .execute()
+        )
+        return _first_row(response.data)
+
+    async def get_games(self, game_ids: list[str]) -> dict[str, dict[str, Any]]:
+        if not game_ids:
+            return {}
+        response = (
+            await self.client.table("games")
+            .select("game_id", *GAME_COLUMNS)
+            .in_("game_id", game_ids)
+            .execute()
+        )
+        return {row["game_id"]: row for row in response.data or []}
+
+    async def get_game_version(self, game_id: str) -> Optional[int]:
+        response = (
+            await self.client.table("games")
+            .select("version")
+            .eq("game_id", game_id)
+            .execute()
+        )
+        row = _first_row(response.data)
+        return row["version"] if row is not None else None
+
+    async def insert_game(self, game_id: str, values: dict[str, Any]) -> bool:
+        try:
+            await self.client.table("games").insert(
+                {"game_id": game_id, **values}
+            ).execute()
+        except PostgrestAPIError as e:
+            if e.code == UNIQUE_VIOLATION:
+                return False
+            raise
+        return True
+
+    async def insert_games(self, rows: list[dict[str, Any]]) -> None:
+        if rows:
+            await self.client.table("games").insert(rows).execute()
+
+    async def update_game(
+        self,
+        game_id: str,
+        values: dict[str, Any],
+        expected_version: Optional[int] = None,
+        below_turn: Optional[int] = None,
+    ) -> bool:
+        query = self.client.table("games").update(values).eq("game_id", game_id)
+        if expected_version is not None:
+            query = query.eq("version", expected_version)
+        if below_turn is not None:
+            query = query.lt("turn", below_turn)
+        response = await query.execute()
+        return bool(response.data)
+
+    async def update_games(self, updates: dict[str, dict[str, Any]]) -> None:
+        # PostgREST has no multi-row update with different values, so the updates
+        # are sent concurrently instead
+        await asyncio.gather(
+            *(
+                self.client.table("games")
+                .update(values)
+                .eq("game_id", game_id)
+                .execute()
+                for game_id, values in updates.items()
+            )
+        )
+
+    async def append_event(self, game_id: str, event: dict[str, Any]) -> bool:
+        try:
+            await self.client.table("game_events").insert(
+                {"game_id": game_id, **event}
+            ).execute()
+        except PostgrestAPIError as e:
+            if e.code == UNIQUE_VIOLATION:
+                return False
+            raise
+        return True
+
+    async def get_events(
+        self, game_id: str, after_seq: int = 0
+    ) -> list[dict[str, Any]]:
+        response = (
+            await self.client.table("game_events")
+            .select(*EVENT_COLUMNS)
+            .eq("game_id", game_id)
+            .gt("seq", after_seq)
+            .order("seq")
+            .execute()
+        )
+        return response.data or []
+
+    async def insert_snapshot(self, game_id: str, snapshot: dict[str, Any]) -> None:
+        await self.client.table("game_snapshots").insert(
+            {"game_id": game_id, **snapshot}
+        ).execute()
+
+    async def get_latest_snapshot(self, game_id: str) -> Optional[dict[str, Any]]:
+        response = (
+            await self.client.table("game_snapshots")
+            .select(*SNAPSHOT_COLUMNS)
+            .eq("game_id", game_id)
+            .order("seq", desc=True)
+            .limit(1)
+            .execute()
+        )
+        return _first_row(response.data)
+
+    async def get_room(self, game_id: str) -> Optional[dict[str, Any]]:
+        response = (
+            await self.client.table("rooms")
+            .select("game_id", *ROOM_COLUMNS)
+            .eq("game_id", game_id)
+            .execute()
+        )
+        return _first_row(response.data)
+
+    async def get_rooms(self, game_ids: list[str]) -> dict[str, dict[str, Any]]:
+        if not game_ids:
+            return {}
+        response = (
+            await self.client.table("rooms")
+            .select("game_id", *ROOM_COLUMNS)
+            .in_("game_id", game_ids)
+            .execute()
+        )
+        return {row["game_id"]: row for row in response.data or []}
+
+    async def insert_rooms(self, rows: list[dict[str, Any]]) -> None:
+        if rows:
+            await self.client.table("rooms").insert(rows).execute()
+
+    async def update_room(
+        self,
+        game_id: str,
+        values: dict[str, Any],
+        where_null: tuple[str, ...] = (),
+        where_not_null: tuple[str, ...] = (),
+    ) -> bool:
+        query = self.client.table("rooms").update(values).eq("game_id", game_id)
+        for column in where_null:
+            query = query.is_(column, "null")
+        for column in where_not_null:
+            query = query.not_.is_(column, "null")
+        response = await query.execute()
+        return bool(response.data)
+
+    async def ping(self) -> None:
+        await self.client.table("rooms").select("game_id").limit(1).execute()
+
+    async def commit_move(
+        self,
+        game_id: str,
+        event: dict[str, Any],
+        values: dict[str, Any],
+        expected_version: int,
+        room_status: Optional[str] = None,
+        snapshot: Optional[dict[str, Any]] = None,
+        previous_values: Optional[dict[str, Any]] = None,
+    ) -> bool:
+        if not self.use_rpc:
+            return await super().commit_move(
+                game_id=game_id,
+                event=event,
+                values=values,
+                expected_version=expected_version,
+                room_status=room_status,
+                snapshot=snapshot,
+                previous_values=previous_values,
+            )
+        return await self._commit_move_rpc(
+            game_id=game_id,
+            event=event,
+            values=values,
+            expected_version=expected_version,
+            room_status=room_status,
+            snapshot=snapshot,
+        )
+
+    async def _commit_move_rpc(
+        self,
+        game_id: str,
+        event: dict[str, Any],
+        values: dict[str, Any],
+        expected_version: int,
+        room_status: Optional[str],
+        snapshot: Optional[dict[str, Any]],
+    ) -> bool:
+        response = await self.client.rpc(
+            "commit_move",
+            {
+                "p_game_id": game_id,
+                "p_event": event,
+                "p_values": values,
+                "p_expected_version": expected_version,
+                "p_room_status": room_status,
+                "p_snapshot": snapshot,
+            },
+        ).execute()
+        return response.data is True
+
+
+def _first_row(data: Any) -> Optional[dict[str, Any]]:
+    if not data or not isinstance(data, list) or not isinstance(data[0], dict):
+        return None
+    return data[0]
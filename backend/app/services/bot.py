@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import os
+import random
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import httpx
+
+from app.models.game.base import POSITIONS, Player
+from app.models.game.compact import CompactPiece
+from app.models.game.ismcts import (BOT_LEVELS, BotLevel, Move, best_move,
+                                    search)
+from app.services.database import DatabaseService
+from app.services.games import ENGINE_SECONDS, GamesService
+from app.services.rooms import GET_ROOM
+from app.utils.errors import RoomFullError, RoomNotFoundError
+from app.utils.game import generate_random_setup, is_player_turn
+from app.utils.single_flight import SingleFlight
+from app.utils.singleton import Singleton
+
+log = logging.getLogger(__name__)
+
+BOT_PLAYER_ID_PREFIX = "bot:"
+BOT_PLAYER = Player.PLAYER_TWO
+# Games whose opponent, bot or human, is remembered
+BOT_LEVEL_CACHE_GAMES = 4096
+
+
+class BotService(metaclass=Singleton):
+    """Server-side opponent that sits in the `player_two_id` slot of a room.
+
+    Searches run in a process pool so the event loop stays free while the bot thinks.
+    Seats are never given up, so once a game has its second player, whether that is
+    a bot is remembered and moves in games without one cost nothing extra.
+    """
+
+    _executor: Optional[ProcessPoolExecutor] = None
+
+    def __init__(self) -> None:
+        self.games_service = GamesService()
+        self.max_workers = int(os.environ.get("BOT_MAX_WORKERS", os.cpu_count() or 1))
+        self._tasks: set[asyncio.Task] = set()
+        self._thinking: set[str] = set()
+        # Bot level of each game with both seats taken, None if it has no bot
+        self._levels: OrderedDict[str, Optional[BotLevel]] = OrderedDict()
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    async def join_room(self, game_id: str, level: BotLevel) -> None:
+        repository = await DatabaseService().get_repository()
+        # The seat is only taken if it is free, which also stops two bots joining
+        if not await repository.update_room(
+            game_id=game_id,
+            values={
+                "player_two_id": f"{BOT_PLAYER_ID_PREFIX}{level}",
+                "status": "planning",
+            },
+            where_null=("player_two_id",),
+        ):
+            if await repository.get_room(game_id=game_id) is None:
+                raise RoomNotFoundError(
+                    status_code=httpx.codes.NOT_FOUND, detail="Room not found"
+                )
+            raise RoomFullError(
+                status_code=httpx.codes.CONFLICT, detail="Room already has two players"
+            )
+        SingleFlight().forget(operation=GET_ROOM, key=game_id)
+        self._remember_level(game_id=game_id, level=level)
+        await self.games_service.initialize(
+            game_id=game_id, pieces=generate_random_setup(player=BOT_PLAYER)
+        )
+
+    async def get_bot_level(self, game_id: str) -> Optional[BotLevel]:
+        if game_id in self._levels:
+            self._levels.move_to_end(game_id)
+            return self._levels[game_id]
+        repository = await DatabaseService().get_repository()
+        # Shared with the players' own room reads when the game starts
+        room = await SingleFlight().do(
+            operation=GET_ROOM,
+            key=game_id,
+            function=lambda: repository.get_room(game_id=game_id),
+        )
+        if room is None:
+            return None
+        player_two_id = room.get("player_two_id")
+        if not isinstance(player_two_id, str):
+            # The seat may still go to a bot
+            return None
+        level = (
+            BotLevel(player_two_id.removeprefix(BOT_PLAYER_ID_PREFIX))
+            if player_two_id.startswith(BOT_PLAYER_ID_PREFIX)
+            else None
+        )
+        self._remember_level(game_id=game_id, level=level)
+        return level
+
+    def _remember_level(self, game_id: str, level: Optional[BotLevel]) -> None:
+        self._levels[game_id] = level
+        self._levels.move_to_end(game_id)
+        if len(self._levels) > BOT_LEVEL_CACHE_GAMES:
+            self._levels.popitem(last=False)
+
+    def schedule_response(self, game_id: str) -> None:
+        """Let the bot reply in the background, if this game has one.
+
+        Games known to have no bot are skipped without a task. Others are looked
+        up once per game.
+        """
+        if game_id in self._levels and self._levels[game_id] is None:
+            return
+        task = asyncio.create_task(self.respond(game_id=game_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def respond(self, game_id: str) -> None:
+        if game_id in self._thinking:
+            return
+        self._thinking.add(game_id)
+        try:
+            level = await self.get_bot_level(game_id=game_id)
+            if level is None:
+                return
+            game_state = await self.games_service.get_game_state(game_id=game_id)
+            if game_state.victory_state is not None or not is_player_turn(
+                player=BOT_PLAYER, turn=game_state.turn
+            ):
+                return
+            # Built in this process from the cached game
+            pieces = CompactPiece.from_dicts(
+                pieces_data=game_state.pieces, trusted=True
+            )
+            with ENGINE_SECONDS.time("bot_search"):
+                move = await self.choose_move(
+                    pieces=pieces, turn=game_state.turn, level=level
+                )
+            if move is None:
+                log.info("Bot has no legal move in game %s", game_id)
+                return
+            square, new_square = move
+            piece = next(p for p in pieces if p.square == square)
+            await self.games_service.move_piece(
+                game_id=game_id,
+                piece=piece.to_piece(),
+                new_position=POSITIONS[new_square],
+            )
+            log.info("Bot moved in game %s", game_id)
+        except Exception as e:
+            log.exception("Bot failed to move in game %s: %s", game_id, e)
+        finally:
+            self._thinking.discard(game_id)
+
+    async def choose_move(
+        self, pieces: list[CompactPiece], turn: int, level: BotLevel
+    ) -> Optional[Move]:
+        config = BOT_LEVELS[level]
+        loop = asyncio.get_running_loop()
+        executor = self.get_executor()
+        searches = [
+            loop.run_in_executor(
+                executor,
+                search,
+                pieces,
+                turn,
+                BOT_PLAYER,
+                config,
+                random.getrandbits(64),
+            )
+            for _ in range(max(1, min(config.workers, self.max_workers)))
+        ]
+        return best_move(visit_counts=list(await asyncio.gather(*searches)))
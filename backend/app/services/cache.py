@@ -0,0 +1,211 @@
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.models.game.base import Player
+from app.models.game.codec import PieceIds
+from app.models.game.compact import CompactPiece
+from app.models.game.engine import Movement, VictoryState, VictoryType
+from app.models.game.history import GameHistory
+from app.utils.singleton import Singleton
+
+log = logging.getLogger(__name__)
+
+# Rough cost of a cached game without its pieces (entry, dict slot, movement model,
+# id table), and of each cached piece (slotted object, id string, list slot). Used
+# to enforce the memory ceiling without walking every object.
+GAME_BYTES = 2048
+PIECE_BYTES = 176
+
+
+class CachedGame:
+    """Parsed state of one game. Treat as immutable: mutations build a new one."""
+
+    __slots__ = (
+        "pieces",
+        "captured_pieces",
+        "winner",
+        "victory_type",
+        "movement",
+        "turn",
+        "seq",
+        "version",
+        "piece_ids",
+        "history",
+        "size_bytes",
+        "last_access",
+        "verified_at",
+    )
+
+    def __init__(
+        self,
+        pieces: list[CompactPiece],
+        captured_pieces: list[CompactPiece],
+        winner: Optional[Player],
+        victory_type: Optional[VictoryType],
+        movement: Optional[Movement],
+        turn: int,
+        seq: int,
+        version: int,
+        piece_ids: PieceIds,
+        history: GameHistory,
+    ):
+        self.pieces = pieces
+        self.captured_pieces = captured_pieces
+        self.winner = winner
+        self.victory_type = victory_type
+        self.movement = movement
+        self.turn = turn
+        # Number of events in the game's log that this state includes
+        self.seq = seq
+        # Version of the `games` row this state was read from or written with
+        self.version = version
+        self.piece_ids = piece_ids
+        self.history = history
+        self.size_bytes = GAME_BYTES + PIECE_BYTES * (
+            len(pieces) + len(captured_pieces)
+        )
+        self.last_access = time.monotonic()
+        # When the stored version was last known to match
+        self.verified_at = self.last_access
+
+    @property
+    def victory_state(self) -> Optional[VictoryState]:
+        if self.winner and self.victory_type:
+            return VictoryState(player=self.winner, victory_type=self.victory_type)
+        return None
+
+    @property
+    def etag(self) -> str:
+        """Changes with every write to the game, setups included."""
+        return f'"{self.version}.{self.turn}.{self.seq}"'
+
+    def copy_pieces(self) -> list[CompactPiece]:
+        """Engines move and capture pieces in place, so they get their own copies."""
+        return [piece.copy() for piece in self.pieces]
+
+
+class GameCache(metaclass=Singleton):
+    """Process-wide cache of game state.
+
+    Entries are filled on first read and replaced on every write, so they must only
+    be written by `GamesService`, after the database write succeeds. A read that
+    raced an invalidation or a newer write is not cached. Other workers can write
+    the same game, so reads check an entry against the stored version once it is
+    older than `revalidate_seconds`. Least recently
+    used games are evicted once `max_games` or `max_bytes` is exceeded, and games
+    idle for longer than `ttl_seconds` are dropped when next touched.
+    """
+
+    def __init__(self) -> None:
+        self.max_games = int(os.environ.get("GAME_CACHE_MAX_GAMES", 1024))
+        self.max_bytes = int(os.environ.get("GAME_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+        self.ttl_seconds = float(os.environ.get("GAME_CACHE_TTL_SECONDS", 30 * 60))
+        self.revalidate_seconds = float(
+            os.environ.get("GAME_CACHE_REVALIDATE_SECONDS", 0)
+        )
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        # Entries found out of date with the stored version
+        self.stale = 0
+        self.size_bytes = 0
+        self._games: OrderedDict[str, CachedGame] = OrderedDict()
+        # Bumped by every invalidation. A load notes it before reading the database,
+        # and its result is dropped if the game was invalidated since
+        self.generation = 0
+        self._invalidated: OrderedDict[str, int] = OrderedDict()
+        # Generation of the latest invalidation no longer tracked per game
+        self._invalidated_floor = 0
+
+    def get(self, game_id: str) -> Optional[CachedGame]:
+        game = self._games.get(game_id)
+        if game is None:
+            self.misses += 1
+            return None
+        now = time.monotonic()
+        if now - game.last_access > self.ttl_seconds:
+            self._remove(game_id=game_id)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        game.last_access = now
+        self._games.move_to_end(game_id)
+        self.hits += 1
+        return game
+
+    def put(self, game_id: str, game: CachedGame) -> None:
+        self._remove(game_id=game_id)
+        self._games[game_id] = game
+        self.size_bytes += game.size_bytes
+        self._evict()
+
+    def put_loaded(self, game_id: str, game: CachedGame, generation: int) -> bool:
+        """Cache a game read from the database after `generation` was noted.
+
+        Skipped if the game was invalidated since, or if a write cached a later
+        state meanwhile. Returns whether the game was cached.
+        """
+        if self._invalidated.get(game_id, self._invalidated_floor) > generation:
+            return False
+        current = self._games.get(game_id)
+        if current is not None and (current.version, current.seq) >= (
+            game.version,
+            game.seq,
+        ):
+            return False
+        self.put(game_id=game_id, game=game)
+        return True
+
+    def needs_revalidation(self, game: CachedGame) -> bool:
+        return time.monotonic() - game.verified_at >= self.revalidate_seconds
+
+    def invalidate(self, game_id: str) -> None:
+        self._remove(game_id=game_id)
+        self.generation += 1
+        self._invalidated[game_id] = self.generation
+        self._invalidated.move_to_end(game_id)
+        if len(self._invalidated) > self.max_games:
+            _, self._invalidated_floor = self._invalidated.popitem(last=False)
+
+    def clear(self) -> None:
+        self._games.clear()
+        self.size_bytes = 0
+        self.generation += 1
+        self._invalidated.clear()
+        self._invalidated_floor = self.generation
+
+    def _remove(self, game_id: str) -> None:
+        game = self._games.pop(game_id, None)
+        if game is not None:
+            self.size_bytes -= game.size_bytes
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self._games:
+            game_id, game = next(iter(self._games.items()))
+            if now - game.last_access > self.ttl_seconds:
+                self.expirations += 1
+            elif len(self._games) > self.max_games or self.size_bytes > self.max_bytes:
+                self.evictions += 1
+            else:
+                break
+            self._remove(game_id=game_id)
+            log.debug("Evicted game %s from cache", game_id)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "games": len(self._games),
+            "bytes": self.size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "stale": self.stale,
+        }
+
+    def __len__(self) -> int:
+        return len(self._games)
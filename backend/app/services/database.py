@@ -1,17 +1,66 @@
+import asyncio
+import logging
 import os
+from enum import StrEnum
+from typing import Any, Optional
 
-from realtime import Optional
-from supabase import AsyncClient, create_async_client
+import httpx
+from supabase import AsyncClient, AsyncClientOptions, create_async_client
 
+from app.repositories.base import Repository
+from app.repositories.memory import MemoryRepository
+from app.repositories.sqlite import SqliteRepository
+from app.repositories.supabase import SupabaseRepository
 from app.utils.singleton import Singleton
 
+log = logging.getLogger(__name__)
+
+
+class DatabaseBackend(StrEnum):
+    SUPABASE = "supabase"
+    SQLITE = "sqlite"
+    MEMORY = "memory"
+
 
 class DatabaseService(metaclass=Singleton):
+    """Owns the storage backend for the lifetime of the app.
+
+    `start` builds the repository and, on Supabase, opens the HTTP connection pool
+    before the first request, then pings the database every
+    `health_check_interval` seconds and reconnects after a failed ping.
+    """
+
     _client: Optional[AsyncClient] = None
+    _http_client: Optional[httpx.AsyncClient] = None
+    _repository: Optional[Repository] = None
+    _health_check: Optional[asyncio.Task] = None
     _url: str
     _key: str
 
     def __init__(self) -> None:
+        self.backend = DatabaseBackend(
+            os.environ.get("DATABASE_BACKEND") or DatabaseBackend.SUPABASE
+        )
+        self.sqlite_path = os.environ.get("SQLITE_PATH") or "db.sqlite3"
+        self.supabase_rpc = os.environ.get("SUPABASE_RPC", "").lower() == "true"
+        self.max_connections = int(os.environ.get("SUPABASE_MAX_CONNECTIONS", 20))
+        self.max_keepalive_connections = int(
+            os.environ.get("SUPABASE_MAX_KEEPALIVE_CONNECTIONS", 10)
+        )
+        self.keepalive_expiry = float(
+            os.environ.get("SUPABASE_KEEPALIVE_EXPIRY_SECONDS", 60)
+        )
+        self.timeout = float(os.environ.get("SUPABASE_TIMEOUT_SECONDS", 10))
+        self.warm_connections = int(os.environ.get("SUPABASE_WARM_CONNECTIONS", 2))
+        self.health_check_interval = float(
+            os.environ.get("SUPABASE_HEALTH_CHECK_SECONDS", 30)
+        )
+        self.healthy: Optional[bool] = None
+        self.reconnects = 0
+        # Creating the client awaits, so concurrent first requests would each make one
+        self._lock = asyncio.Lock()
+        if self.backend != DatabaseBackend.SUPABASE:
+            return
         url: str | None = os.environ.get("SUPABASE_URL")
         if url is None:
             raise ValueError("SUPABASE_URL must be set")
@@ -21,7 +70,114 @@ class DatabaseService(metaclass=Singleton):
         self._url = url
         self._key = key
 
+    async def start(self) -> None:
+        """Connect before serving, so the first requests do not pay for it."""
+        repository = await self.get_repository()
+        if self.backend != DatabaseBackend.SUPABASE:
+            return
+        # Each concurrent ping opens its own connection, which stays in the pool
+        await asyncio.gather(
+            *(repository.ping() for _ in range(max(1, self.warm_connections)))
+        )
+        self.healthy = True
+        if self.health_check_interval > 0 and self._health_check is None:
+            self._health_check = asyncio.create_task(self._check_health())
+        log.info("Connected to Supabase")
+
     async def get_client(self) -> AsyncClient:
         if self._client is None:
-            self._client = await create_async_client(self._url, self._key)
+            async with self._lock:
+                if self._client is None:
+                    self._client = await self._connect()
         return self._client
+
+    async def _connect(self) -> AsyncClient:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            timeout=self.timeout,
+            follow_redirects=True,
+            http2=True,
+        )
+        try:
+            client = await create_async_client(
+                self._url,
+                self._key,
+                options=AsyncClientOptions(
+                    httpx_client=http_client,
+                    postgrest_client_timeout=self.timeout,
+                ),
+            )
+        except Exception:
+            await http_client.aclose()
+            raise
+        self._http_client = http_client
+        return client
+
+    async def get_repository(self) -> Repository:
+        if self._repository is None:
+            if self.backend == DatabaseBackend.SQLITE:
+                self._repository = SqliteRepository(path=self.sqlite_path)
+            elif self.backend == DatabaseBackend.MEMORY:
+                self._repository = MemoryRepository()
+            else:
+                client = await self.get_client()
+                if self._repository is None:
+                    self._repository = SupabaseRepository(
+                        client=client, use_rpc=self.supabase_rpc
+                    )
+        return self._repository
+
+    async def _check_health(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await (await self.get_repository()).ping()
+                self.healthy = True
+            except Exception as e:
+                log.warning("Supabase health check failed, reconnecting: %s", e)
+                self.healthy = False
+                await self._reconnect()
+
+    async def _reconnect(self) -> None:
+        """Replace the client and its pool. Requests already holding a connection
+        from the old pool fail as they would have anyway."""
+        async with self._lock:
+            old_http_client = self._http_client
+            try:
+                self._client = await self._connect()
+            except Exception as e:
+                log.warning("Could not reconnect to Supabase: %s", e)
+                return
+            self._repository = SupabaseRepository(
+                client=self._client, use_rpc=self.supabase_rpc
+            )
+            self.reconnects += 1
+        if old_http_client is not None:
+            await old_http_client.aclose()
+
+    async def close(self) -> None:
+        if self._health_check is not None:
+            self._health_check.cancel()
+            self._health_check = None
+        if self._repository is not None:
+            await self._repository.close()
+            self._repository = None
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        self._client = None
+
+    def set_repository(self, repository: Repository) -> None:
+        """Swap the storage backend, e.g. for a benchmark with a prepared store."""
+        self._repository = repository
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "healthy": self.healthy,
+            "reconnects": self.reconnects,
+        }
@@ -1,167 +1,463 @@
+import asyncio
 import logging
-from typing import Optional
+import os
+import time
+from typing import Any, Optional
 
 import httpx
 
+from app.models.api.games.game_update import GameUpdate, GameUpdateType
 from app.models.api.games.get_game_state import GameState, GetGameStateResponse
 from app.models.api.games.initialize import InitializeCaptureResponse
 from app.models.api.games.move_piece import MovePieceResponse
-from app.models.game.base import Position
-from app.models.game.engine import (GameBoard, GameEngine, Marking, Movement,
-                                    Piece, VictoryState, parse_piece)
+from app.models.game.base import Player, Position, square_of
+from app.models.game.bitboard import BitboardGameBoard, BitboardGameEngine
+from app.models.game.codec import (PieceIds, decode_pieces_text,
+                                   encode_game_state, encode_pieces_text)
+from app.models.game.compact import PIECES_SCHEMA, CompactPiece
+from app.models.game.engine import (Marking, Movement, Piece, VictoryState,
+                                    VictoryType)
+from app.models.game.history import EventType, GameEvent, Replay, replay_events
+from app.repositories.base import Repository
+from app.services.cache import CachedGame, GameCache
 from app.services.database import DatabaseService
-from app.utils.errors import (InvalidInitializationError, NotPlayerTurnError,
-                              RoomNotFoundError)
+from app.services.hub import GameHub
+from app.utils.errors import (GameConflictError, InvalidInitializationError,
+                              NotPlayerTurnError, RoomNotFoundError)
 from app.utils.game import is_player_turn
+from app.utils.metrics import Metrics
+from app.utils.single_flight import SingleFlight
 
 log = logging.getLogger(__name__)
 
+LOAD_GAME = "load_game"
+SETUP_ATTEMPTS = 3
+ENGINE_SECONDS = Metrics().histogram(
+    "sashay_engine_duration_seconds",
+    "Time spent in the game engine, by step.",
+    ("step",),
+)
+
 
 class GamesService:
+    """Game state lives in three tables:
+    - `games`: the board after setup, plus turn, winner and last movement, which
+      also drive the realtime feed
+    - `game_events`: an append-only log of moves and marking changes
+    - `game_snapshots`: the board every `snapshot_interval` turns, so loading a game
+      replays at most that many moves
+    """
+
+    def __init__(self) -> None:
+        self.snapshot_interval = int(os.environ.get("GAME_SNAPSHOT_INTERVAL", 10))
+
     async def initialize_capture(self, game_id: str) -> InitializeCaptureResponse:
-        game_state: GetGameStateResponse = await self.get_game_state(game_id=game_id)
-        raw_pieces = game_state.pieces
-        curr_pieces: list[Piece] = [parse_piece(p) for p in raw_pieces]
-        game_engine = GameEngine(pieces=curr_pieces)
-        captured_pieces: list[Piece] = game_engine.process_initialization_capture()
-        updated_pieces: list[Piece] = game_engine.game_board.get_pieces()
+        cached_game: CachedGame = await self.get_cached_game(game_id=game_id)
+        game_engine = BitboardGameEngine(pieces=cached_game.copy_pieces())
+        with ENGINE_SECONDS.time("setup_capture"):
+            captured_pieces: list[CompactPiece] = (
+                game_engine.process_initialization_capture()
+            )
+        updated_pieces: list[CompactPiece] = game_engine.game_board.get_pieces()
         return InitializeCaptureResponse(
             status_code=httpx.codes.OK,
-            pieces=updated_pieces,
-            captured_pieces=captured_pieces,
+            pieces=[p.to_piece() for p in updated_pieces],
+            captured_pieces=[p.to_piece() for p in captured_pieces],
         )
 
     async def move_piece(
-        self, game_id: str, piece: Piece, new_position: Position
+        self, game_id: str, piece: Piece, new_position: Position, delta: bool = False
     ) -> MovePieceResponse:
-        client = await DatabaseService().get_client()
-        game_state: GetGameStateResponse = await self.get_game_state(game_id=game_id)
-        raw_pieces = game_state.pieces
-        turn: int = game_state.turn
+        repository = await DatabaseService().get_repository()
+        # The commit checks the stored version, so a stale state is caught there.
+        # Checks that fail before the commit check it themselves
+        cached_game: CachedGame = await self.get_cached_game(
+            game_id=game_id, revalidate=False
+        )
+        turn: int = cached_game.turn
         if not is_player_turn(player=piece.player, turn=turn):
-            raise NotPlayerTurnError(
-                status_code=httpx.codes.BAD_REQUEST,
-                detail=f"It's not {piece.player.value}'s turn",
+            raise await self._rejection(
+                game_id=game_id,
+                cached_game=cached_game,
+                error=NotPlayerTurnError(
+                    status_code=httpx.codes.BAD_REQUEST,
+                    detail=f"It's not {piece.player.value}'s turn",
+                ),
             )
 
-        curr_pieces: list[Piece] = [parse_piece(p) for p in raw_pieces]
-        game_engine = GameEngine(pieces=curr_pieces)
+        curr_pieces: list[CompactPiece] = cached_game.copy_pieces()
+        game_engine = BitboardGameEngine(pieces=curr_pieces)
         matching_piece = next((p for p in curr_pieces if p.id == piece.id), None)
         if matching_piece is None:
-            raise ValueError(f"Piece with id {piece.id} not found in game")
+            raise await self._rejection(
+                game_id=game_id,
+                cached_game=cached_game,
+                error=ValueError(f"Piece with id {piece.id} not found in game"),
+            )
         original_position: Position = matching_piece.position
-        game_engine.move_piece(piece=matching_piece, new_position=new_position)
-        captured_pieces: list[Piece] = game_engine.process_potential_capture(
-            new_position=new_position
-        )
+        # Checks the move against the piece's generated targets
+        with ENGINE_SECONDS.time("move"):
+            game_engine.move_piece(piece=matching_piece, new_position=new_position)
+        with ENGINE_SECONDS.time("capture"):
+            captured_pieces: list[CompactPiece] = game_engine.process_potential_capture(
+                new_position=new_position
+            )
 
-        updated_pieces: list[Piece] = game_engine.game_board.get_pieces()
+        updated_pieces: list[CompactPiece] = game_engine.game_board.get_pieces()
         turn += 1
-        victory_state: Optional[VictoryState] = game_engine.process_potential_win()
-        if victory_state:
-            await client.table("rooms").update({"status": "completed"}).eq(
-                "game_id", game_id
-            ).execute()
+        with ENGINE_SECONDS.time("victory"):
+            victory_state: Optional[VictoryState] = game_engine.process_potential_win()
         movement: Movement = Movement(
             previous_position=original_position,
             new_position=new_position,
         )
-        await client.table("games").update(
-            {
-                "pieces": [p.model_dump() for p in updated_pieces],
-                "captured_pieces": [p.model_dump() for p in captured_pieces],
-                "turn": turn,
-                "winner": victory_state.player if victory_state else None,
-                "victory_type": victory_state.victory_type if victory_state else None,
-                "movement": movement.model_dump(),
-            }
-        ).eq("game_id", game_id).execute()
-
-        return MovePieceResponse.model_validate(
-            {
-                "status_code": httpx.codes.OK,
-                "captured_pieces": captured_pieces,
-                "victory_state": victory_state,
-                "pieces": updated_pieces,
-                "movement": movement,
-                "turn": turn,
-            }
-        )
-
-    async def get_game_state(self, game_id: str) -> GetGameStateResponse:
-        client = await DatabaseService().get_client()
-        response = (
-            await client.table("games")
-            .select(
-                "pieces",
-                "captured_pieces",
-                "winner",
-                "victory_type",
-                "movement",
-                "turn",
-            )
-            .eq("game_id", game_id)
-            .execute()
-        )
-        if not response.data:
+        updated_game = CachedGame(
+            pieces=updated_pieces,
+            captured_pieces=captured_pieces,
+            winner=victory_state.player if victory_state else None,
+            victory_type=victory_state.victory_type if victory_state else None,
+            movement=movement,
+            turn=turn,
+            seq=cached_game.seq + 1,
+            version=cached_game.version + 1,
+            piece_ids=cached_game.piece_ids,
+            history=cached_game.history.record(
+                seq=cached_game.seq + 1,
+                piece_id=matching_piece.id,
+                turn=turn,
+                removed_ids=tuple(p.id for p in captured_pieces),
+            ),
+        )
+        event = GameEvent(
+            seq=updated_game.seq,
+            turn=turn,
+            event_type=EventType.MOVE,
+            square=square_of(original_position.row, original_position.col),
+            new_square=square_of(new_position.row, new_position.col),
+        )
+        try:
+            # The log is the source of truth for the board. The `games` row only
+            # carries the small fields the realtime feed and clients look at, and
+            # the version every write bumps. The commit fails if another request,
+            # in this worker or another, wrote the game since it was read
+            if not await repository.commit_move(
+                game_id=game_id,
+                event=event.to_dict(),
+                values={
+                    "turn": turn,
+                    "winner": updated_game.winner,
+                    "victory_type": updated_game.victory_type,
+                    "movement": movement.model_dump(),
+                },
+                expected_version=cached_game.version,
+                previous_values={
+                    "turn": cached_game.turn,
+                    "winner": cached_game.winner,
+                    "victory_type": cached_game.victory_type,
+                    "movement": (
+                        cached_game.movement.model_dump()
+                        if cached_game.movement
+                        else None
+                    ),
+                },
+                room_status="completed" if victory_state else None,
+                snapshot=(
+                    {
+                        "seq": updated_game.seq,
+                        "turn": turn,
+                        "board": encode_pieces_text(
+                            pieces=updated_pieces, piece_ids=updated_game.piece_ids
+                        ),
+                        "captured_board": encode_pieces_text(
+                            pieces=captured_pieces,
+                            piece_ids=updated_game.piece_ids,
+                        ),
+                    }
+                    if turn % self.snapshot_interval == 0
+                    else None
+                ),
+            ):
+                raise _conflict(game_id=game_id)
+        except Exception:
+            # The row may or may not have been written, so reload it next time
+            GameCache().invalidate(game_id=game_id)
+            raise
+        GameCache().put(game_id=game_id, game=updated_game)
+        _publish(
+            game_id=game_id,
+            cached_game=updated_game,
+            update_type=GameUpdateType.MOVE,
+            since_turn=turn - 1,
+        )
+
+        # The history always holds the turn before the move, so a delta is exact
+        changes = (
+            _pieces_since(cached_game=updated_game, since_turn=turn - 1)
+            if delta
+            else None
+        )
+        pieces, removed_piece_ids = changes or (updated_pieces, [])
+        # Built from checked state, so it is not validated again. Pieces are dicts
+        # shaped like `Piece.model_dump()`, which `ModelResponse` writes as they are
+        return MovePieceResponse.model_construct(
+            status_code=httpx.codes.OK,
+            captured_pieces=[p.to_dict() for p in captured_pieces],
+            victory_state=victory_state,
+            pieces=[p.to_dict() for p in pieces],
+            movement=movement,
+            turn=turn,
+            since_turn=turn - 1 if changes is not None else None,
+            removed_piece_ids=removed_piece_ids,
+        )
+
+    async def get_game_state(
+        self, game_id: str, since_turn: Optional[int] = None
+    ) -> GetGameStateResponse:
+        """The whole board, or with `since_turn` only what changed after that turn.
+
+        Falls back to the whole board, with `since_turn` unset, when the game's
+        history does not reach back that far.
+        """
+        cached_game: CachedGame = await self.get_cached_game(game_id=game_id)
+        return _game_state(cached_game=cached_game, since_turn=since_turn)
+
+    async def get_game_state_if_changed(
+        self, game_id: str, etag: Optional[str], since_turn: Optional[int] = None
+    ) -> tuple[Optional[GetGameStateResponse], str]:
+        """`get_game_state` plus its ETag, or no state if `etag` is still current."""
+        cached_game: CachedGame = await self.get_cached_game(game_id=game_id)
+        if etag is not None and etag == cached_game.etag:
+            return None, cached_game.etag
+        return (
+            _game_state(cached_game=cached_game, since_turn=since_turn),
+            cached_game.etag,
+        )
+
+    async def get_game_state_binary(
+        self, game_id: str, include_piece_ids: bool = True
+    ) -> bytes:
+        cached_game: CachedGame = await self.get_cached_game(game_id=game_id)
+        victory_state = cached_game.victory_state
+        return encode_game_state(
+            turn=cached_game.turn,
+            victory=(
+                (victory_state.player, victory_state.victory_type)
+                if victory_state
+                else None
+            ),
+            movement=cached_game.movement,
+            pieces=cached_game.pieces,
+            captured_pieces=cached_game.captured_pieces,
+            piece_ids=cached_game.piece_ids,
+            include_piece_ids=include_piece_ids,
+        )
+
+    async def get_game_update(self, game_id: str) -> GameUpdate:
+        """The whole board, as the first message of a game's WebSocket channel."""
+        cached_game: CachedGame = await self.get_cached_game(game_id=game_id)
+        return _game_update(
+            game_id=game_id,
+            cached_game=cached_game,
+            update_type=GameUpdateType.STATE,
+            since_turn=None,
+        )
+
+    async def get_cached_game(
+        self, game_id: str, revalidate: bool = True
+    ) -> CachedGame:
+        """Parsed game state, read from the database only on a cache miss.
+
+        Another worker may have written the game, so a hit is checked against the
+        stored version first, unless it was checked within the cache's
+        `revalidate_seconds`. Writes pass `revalidate=False`, as their commit checks
+        the version anyway.
+        """
+        game_cache = GameCache()
+        cached_game: Optional[CachedGame] = game_cache.get(game_id=game_id)
+        if (
+            cached_game is not None
+            and revalidate
+            and game_cache.needs_revalidation(game=cached_game)
+        ):
+            repository = await DatabaseService().get_repository()
+            version = await repository.get_game_version(game_id=game_id)
+            if version == cached_game.version:
+                cached_game.verified_at = time.monotonic()
+            else:
+                log.info("Game %s was written elsewhere, reloading it", game_id)
+                game_cache.stale += 1
+                game_cache.invalidate(game_id=game_id)
+                SingleFlight().forget(operation=LOAD_GAME, key=game_id)
+                cached_game = None
+        if cached_game is not None:
+            return cached_game
+        # Everyone notified of a change asks at once, so concurrent misses share a load
+        return await SingleFlight().do(
+            operation=LOAD_GAME,
+            key=game_id,
+            function=lambda: self._load_game(game_id=game_id),
+        )
+
+    async def _rejection(
+        self, game_id: str, cached_game: CachedGame, error: Exception
+    ) -> Exception:
+        """What to raise when a write's checks fail on state read with
+        `revalidate=False`.
+
+        The commit never runs to catch a stale state, so the stored version is
+        checked here. If the game moved on, the state is dropped and the write gets
+        a conflict to retry on the stored game. Otherwise `error` stands.
+        """
+        repository = await DatabaseService().get_repository()
+        version = await repository.get_game_version(game_id=game_id)
+        if version == cached_game.version:
+            cached_game.verified_at = time.monotonic()
+            return error
+        log.info("Game %s was written elsewhere, rejecting a stale write", game_id)
+        game_cache = GameCache()
+        game_cache.stale += 1
+        game_cache.invalidate(game_id=game_id)
+        return _conflict(game_id=game_id)
+
+    async def _load_game(self, game_id: str) -> CachedGame:
+        repository = await DatabaseService().get_repository()
+        # A setup that lands while this load reads the database invalidates the
+        # game, and the older state read here must not be cached over it
+        generation = GameCache().generation
+        # The snapshot does not depend on the row, so both are read at once
+        game_row, snapshot = await asyncio.gather(
+            repository.get_game(game_id=game_id),
+            repository.get_latest_snapshot(game_id=game_id),
+        )
+        if game_row is None:
             raise RoomNotFoundError(
                 status_code=httpx.codes.NOT_FOUND,
                 detail=f"Room not found",
             )
 
-        game_state = GameState.model_validate(response.data[0])
-        return GetGameStateResponse(
-            status_code=httpx.codes.OK,
-            pieces=game_state.pieces,
-            captured_pieces=game_state.captured_pieces,
-            victory_state=(
-                VictoryState(
-                    player=game_state.winner, victory_type=game_state.victory_type
+        # Rows this backend wrote are tagged, so their pieces are read without the
+        # full checks. Rows written before the tag are validated
+        trusted = game_row.get("pieces_schema") == PIECES_SCHEMA
+        game_state = _read_game_row(game_row=game_row, trusted=trusted)
+        # Pieces keep their ids for the whole game, so the setup board in the row
+        # (survivors plus pieces captured during setup) lists every id
+        piece_ids = PieceIds(
+            ids=list(
+                dict.fromkeys(
+                    p["id"] for p in game_state.pieces + game_state.captured_pieces
                 )
-                if game_state.winner and game_state.victory_type
-                else None
+            )
+        )
+        if snapshot is not None:
+            base_seq: int = snapshot["seq"]
+            base_turn: int = snapshot["turn"]
+            base_pieces = decode_pieces_text(
+                text=snapshot["board"], piece_ids=piece_ids
+            )
+            base_captured_pieces = decode_pieces_text(
+                text=snapshot["captured_board"], piece_ids=piece_ids
+            )
+        else:
+            # The row's pieces are the board the log starts from
+            base_seq = 0
+            base_pieces = CompactPiece.from_dicts(
+                pieces_data=game_state.pieces, trusted=trusted
+            )
+            base_captured_pieces = CompactPiece.from_dicts(
+                pieces_data=game_state.captured_pieces, trusted=trusted
+            )
+        events = [
+            GameEvent.from_dict(event)
+            for event in await repository.get_events(
+                game_id=game_id, after_seq=base_seq
+            )
+        ]
+        if snapshot is None:
+            base_turn = _log_start_turn(events=events, row_turn=game_state.turn)
+        with ENGINE_SECONDS.time("replay"):
+            replay: Replay = replay_events(
+                pieces=base_pieces, turn=base_turn, seq=base_seq, events=events
+            )
+        victory = replay.game_engine.victory
+        cached_game = CachedGame(
+            pieces=replay.game_engine.game_board.get_pieces(),
+            captured_pieces=(
+                replay.captured_pieces
+                if replay.captured_pieces is not None
+                else base_captured_pieces
             ),
-            movement=game_state.movement,
-            turn=game_state.turn,
+            winner=victory[0] if victory else game_state.winner,
+            victory_type=victory[1] if victory else game_state.victory_type,
+            movement=replay.movement or game_state.movement,
+            turn=replay.game_engine.turn,
+            seq=replay.seq,
+            version=game_row["version"],
+            piece_ids=piece_ids,
+            history=replay.history,
         )
+        GameCache().put_loaded(game_id=game_id, game=cached_game, generation=generation)
+        return cached_game
 
     async def initialize(self, game_id: str, pieces: list[Piece]) -> None:
-        game_board = GameBoard(pieces=pieces)
-        if not game_board.are_pieces_valid_during_setup(pieces=pieces):
+        setup_pieces: list[CompactPiece] = [
+            CompactPiece.from_piece(piece) for piece in pieces
+        ]
+        game_board = BitboardGameBoard(pieces=setup_pieces)
+        if not game_board.are_pieces_valid_during_setup(pieces=setup_pieces):
             raise InvalidInitializationError(
                 status_code=httpx.codes.BAD_REQUEST,
                 detail=f"Invalid board setup",
             )
 
-        client = await DatabaseService().get_client()
-        response = (
-            await client.table("games")
-            .select("pieces")
-            .eq("game_id", game_id)
-            .execute()
-        )
-        if not response.data:
+        repository = await DatabaseService().get_repository()
+        try:
+            # Both players submit their setup at about the same time, and each write
+            # builds on the other's, so a lost race is retried on a fresh read
+            for _ in range(SETUP_ATTEMPTS):
+                if await self._store_setup(
+                    repository=repository, game_id=game_id, pieces=pieces
+                ):
+                    return
+                log.info("Setup of game %s changed concurrently, retrying", game_id)
+            raise GameConflictError(
+                status_code=httpx.codes.CONFLICT,
+                detail="Game setup changed concurrently",
+            )
+        finally:
+            # Setup writes do not know the full row, so the cached copy is dropped
+            # and reloaded on the next read
+            GameCache().invalidate(game_id=game_id)
+            SingleFlight().forget(operation=LOAD_GAME, key=game_id)
+
+    async def _store_setup(
+        self, repository: Repository, game_id: str, pieces: list[Piece]
+    ) -> bool:
+        """Add a player's pieces to the game. Returns False if another write to the
+        pieces got there first."""
+        game_row = await repository.get_game(game_id=game_id)
+        if game_row is None:
             log.info("No existing pieces stored for game %s", game_id)
-            await client.table("games").insert(
-                {
-                    "game_id": game_id,
+            return await repository.insert_game(
+                game_id=game_id,
+                values={
                     "pieces": [piece.model_dump() for piece in pieces],
                     "captured_pieces": [],
-                }
-            ).execute()
-            return
+                    "pieces_schema": PIECES_SCHEMA,
+                },
+            )
 
         log.info("Found existing pieces for game %s", game_id)
-        if not isinstance(response.data[0], dict) or "pieces" not in response.data[0]:
+        if "pieces" not in game_row:
             raise Exception(
                 f"No 'pieces' key found in existing game data for game {game_id}"
             )
-        existing_pieces = response.data[0]["pieces"]
+        existing_pieces = game_row["pieces"]
         if not isinstance(existing_pieces, list):
             raise Exception(
                 f"'pieces' key is not a list in existing game data for game {game_id}"
             )
         existing_pieces += [piece.model_dump() for piece in pieces]
+        version: int = game_row["version"]
 
         players_seen = set()
         for piece in existing_pieces:
@@ -171,66 +467,217 @@ class GamesService:
                 raise Exception(f"Piece in game {game_id} is not a dict: {piece!r}")
 
         if len(players_seen) == 2:
-            await client.table("rooms").update({"status": "active"}).eq(
-                "game_id", game_id
-            ).execute()
-            game_engine = GameEngine(
-                pieces=[parse_piece(p) for p in existing_pieces if isinstance(p, dict)]
-            )
-            captured_pieces: list[Piece] = game_engine.process_initialization_capture()
-            updated_pieces: list[Piece] = game_engine.game_board.get_pieces()
-            victory_state: Optional[VictoryState] = game_engine.process_potential_win()
-            await client.table("games").update(
-                {
-                    "pieces": [p.model_dump() for p in updated_pieces],
-                    "captured_pieces": [p.model_dump() for p in captured_pieces],
+            game_engine = BitboardGameEngine(
+                pieces=CompactPiece.from_dicts(
+                    pieces_data=existing_pieces,
+                    trusted=game_row.get("pieces_schema") == PIECES_SCHEMA,
+                )
+            )
+            with ENGINE_SECONDS.time("setup_capture"):
+                captured_pieces: list[CompactPiece] = (
+                    game_engine.process_initialization_capture()
+                )
+            updated_pieces: list[CompactPiece] = game_engine.game_board.get_pieces()
+            with ENGINE_SECONDS.time("victory"):
+                victory_state: Optional[VictoryState] = (
+                    game_engine.process_potential_win()
+                )
+            if not await repository.update_game(
+                game_id=game_id,
+                values={
+                    "pieces": [p.to_dict() for p in updated_pieces],
+                    "captured_pieces": [p.to_dict() for p in captured_pieces],
                     "winner": victory_state.player if victory_state else None,
                     "victory_type": (
                         victory_state.victory_type if victory_state else None
                     ),
-                }
-            ).eq("game_id", game_id).execute()
-        else:
-            await client.table("games").update({"pieces": existing_pieces}).eq(
-                "game_id", game_id
-            ).execute()
+                    "version": version + 1,
+                    # Every piece was just read into the engine and written back
+                    "pieces_schema": PIECES_SCHEMA,
+                },
+                expected_version=version,
+            ):
+                return False
+            await repository.set_room_status(game_id=game_id, status="active")
+            return True
+        return await repository.update_game(
+            game_id=game_id,
+            values={"pieces": existing_pieces, "version": version + 1},
+            expected_version=version,
+        )
 
     async def toggle_marking(
         self, game_id: str, piece_id: str, marking: Marking
     ) -> None:
-        client = await DatabaseService().get_client()
-        response = (
-            await client.table("games")
-            .select("pieces")
-            .eq("game_id", game_id)
-            .execute()
-        )
-        if not response.data:
-            raise RoomNotFoundError(
-                status_code=httpx.codes.NOT_FOUND,
-                detail=f"Room not found",
-            )
-        if not isinstance(response.data[0], dict) or "pieces" not in response.data[0]:
-            raise Exception(
-                f"No 'pieces' key found in existing game data for game {game_id}"
-            )
-        existing_pieces = response.data[0]["pieces"]
-        if not isinstance(existing_pieces, list):
-            raise Exception(
-                f"'pieces' key is not a list in existing game data for game {game_id}"
-            )
-        game_state: GetGameStateResponse = await self.get_game_state(game_id=game_id)
-        raw_pieces = game_state.pieces
-        curr_pieces: list[Piece] = [parse_piece(p) for p in raw_pieces]
+        repository = await DatabaseService().get_repository()
+        cached_game: CachedGame = await self.get_cached_game(
+            game_id=game_id, revalidate=False
+        )
+        curr_pieces: list[CompactPiece] = cached_game.copy_pieces()
         matching_piece = next((p for p in curr_pieces if p.id == piece_id), None)
         if matching_piece is None:
-            raise ValueError(f"Piece with id {piece_id} not found in game")
+            raise await self._rejection(
+                game_id=game_id,
+                cached_game=cached_game,
+                error=ValueError(f"Piece with id {piece_id} not found in game"),
+            )
 
-        game_engine = GameEngine(pieces=curr_pieces)
+        game_engine = BitboardGameEngine(pieces=curr_pieces)
         game_engine.toggle_marking(piece=matching_piece, marking=marking)
-        updated_pieces: list[Piece] = game_engine.game_board.get_pieces()
-        await client.table("games").update(
-            {
-                "pieces": [p.model_dump() for p in updated_pieces],
-            }
-        ).eq("game_id", game_id).execute()
+        updated_pieces: list[CompactPiece] = game_engine.game_board.get_pieces()
+        event = GameEvent(
+            seq=cached_game.seq + 1,
+            turn=cached_game.turn,
+            event_type=EventType.MARKING,
+            square=matching_piece.square,
+            marking=marking,
+        )
+        try:
+            # Only the event and the version change, so the row's fields stay
+            if not await repository.commit_move(
+                game_id=game_id,
+                event=event.to_dict(),
+                values={},
+                expected_version=cached_game.version,
+            ):
+                raise _conflict(game_id=game_id)
+        except Exception:
+            GameCache().invalidate(game_id=game_id)
+            raise
+        updated_game = CachedGame(
+            pieces=updated_pieces,
+            captured_pieces=cached_game.captured_pieces,
+            winner=cached_game.winner,
+            victory_type=cached_game.victory_type,
+            movement=cached_game.movement,
+            turn=cached_game.turn,
+            seq=event.seq,
+            version=cached_game.version + 1,
+            piece_ids=cached_game.piece_ids,
+            history=cached_game.history.record(seq=event.seq, piece_id=piece_id),
+        )
+        GameCache().put(game_id=game_id, game=updated_game)
+        _publish(
+            game_id=game_id,
+            cached_game=updated_game,
+            update_type=GameUpdateType.MARKING,
+            since_turn=updated_game.turn,
+        )
+
+
+def _conflict(game_id: str) -> GameConflictError:
+    """The cached state was stale. Drop it so a retry starts from the stored game."""
+    log.info("Write to game %s lost a race", game_id)
+    SingleFlight().forget(operation=LOAD_GAME, key=game_id)
+    return GameConflictError(
+        status_code=httpx.codes.CONFLICT,
+        detail="The game changed, reload and retry",
+    )
+
+
+def _log_start_turn(events: list[GameEvent], row_turn: int) -> int:
+    """Turn of the board the log starts from, when there is no snapshot.
+
+    That is the setup board at turn 0 for games started with the log. Rows written
+    before it hold the board of their current turn instead, and have no events
+    until their next move or marking. Each event records the turn it leaves the
+    game at, so the first one tells which.
+    """
+    if not events:
+        return row_turn
+    first = events[0]
+    return first.turn - 1 if first.event_type == EventType.MOVE else first.turn
+
+
+def _read_game_row(game_row: dict[str, Any], trusted: bool) -> GameState:
+    """A trusted row is taken as it is, apart from parsing its movement."""
+    if not trusted:
+        return GameState.model_validate(game_row)
+    movement = game_row["movement"]
+    return GameState.model_construct(
+        pieces=game_row["pieces"],
+        captured_pieces=game_row["captured_pieces"],
+        winner=Player(game_row["winner"]) if game_row["winner"] else None,
+        victory_type=(
+            VictoryType(game_row["victory_type"]) if game_row["victory_type"] else None
+        ),
+        movement=Movement.model_validate(movement) if movement else None,
+        turn=game_row["turn"],
+    )
+
+
+def _pieces_since(
+    cached_game: CachedGame, since_turn: Optional[int]
+) -> Optional[tuple[list[CompactPiece], list[str]]]:
+    """Pieces changed and ids of pieces captured after `since_turn`.
+
+    None if `since_turn` is None or older than the game's history.
+    """
+    if since_turn is None:
+        return None
+    changes = cached_game.history.changes_since_turn(turn=since_turn)
+    if changes is None:
+        return None
+    changed_ids = set(changes[0])
+    return [p for p in cached_game.pieces if p.id in changed_ids], changes[1]
+
+
+def _game_state(
+    cached_game: CachedGame, since_turn: Optional[int]
+) -> GetGameStateResponse:
+    delta = _pieces_since(cached_game=cached_game, since_turn=since_turn)
+    pieces, removed_piece_ids = delta or (cached_game.pieces, [])
+    return GetGameStateResponse.model_construct(
+        status_code=httpx.codes.OK,
+        pieces=[p.to_dict() for p in pieces],
+        captured_pieces=[p.to_dict() for p in cached_game.captured_pieces],
+        victory_state=cached_game.victory_state,
+        movement=cached_game.movement,
+        turn=cached_game.turn,
+        since_turn=since_turn if delta is not None else None,
+        removed_piece_ids=removed_piece_ids,
+    )
+
+
+def _game_update(
+    game_id: str,
+    cached_game: CachedGame,
+    update_type: GameUpdateType,
+    since_turn: Optional[int],
+) -> GameUpdate:
+    delta = _pieces_since(cached_game=cached_game, since_turn=since_turn)
+    pieces, removed_piece_ids = delta or (cached_game.pieces, [])
+    return GameUpdate.model_construct(
+        type=update_type,
+        game_id=game_id,
+        seq=cached_game.seq,
+        turn=cached_game.turn,
+        etag=cached_game.etag,
+        pieces=[p.to_dict() for p in pieces],
+        captured_pieces=[p.to_dict() for p in cached_game.captured_pieces],
+        victory_state=cached_game.victory_state,
+        movement=cached_game.movement,
+        since_turn=since_turn if delta is not None else None,
+        removed_piece_ids=removed_piece_ids,
+    )
+
+
+def _publish(
+    game_id: str,
+    cached_game: CachedGame,
+    update_type: GameUpdateType,
+    since_turn: int,
+) -> None:
+    """Push a committed change to the game's WebSocket subscribers, if any."""
+    hub = GameHub()
+    if not hub.is_watched(game_id=game_id):
+        return
+    hub.publish(
+        game_id=game_id,
+        update=_game_update(
+            game_id=game_id,
+            cached_game=cached_game,
+            update_type=update_type,
+            since_turn=since_turn,
+        ),
+    )
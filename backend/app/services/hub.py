@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import os
+
+from fastapi import WebSocket, WebSocketDisconnect
+from starlette.websockets import WebSocketState
+
+from app.models.api.games.game_update import GameUpdate
+from app.utils.serialization import dump_model
+from app.utils.singleton import Singleton
+
+log = logging.getLogger(__name__)
+
+# Close codes, see RFC 6455 section 7.4
+GOING_AWAY = 1001
+TRY_AGAIN_LATER = 1013
+# From the range left to applications
+GAME_NOT_FOUND = 4404
+CLOSE_TIMEOUT_SECONDS = 5
+
+
+class Subscriber:
+    """One WebSocket on a game channel, with its own bounded queue of messages."""
+
+    __slots__ = ("websocket", "queue", "stopped", "dropped")
+
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        # Set to end the connection, even while a send to the client is stuck
+        self.stopped = asyncio.Event()
+        self.dropped = False
+
+    async def send_messages(self) -> None:
+        while True:
+            await self.websocket.send_text(await self.queue.get())
+
+    async def receive_messages(self) -> None:
+        # Clients only listen, but reading is how a disconnect is noticed
+        try:
+            while True:
+                await self.websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+
+class GameHub(metaclass=Singleton):
+    """Pushes game updates to every player and spectator subscribed to a game.
+
+    Each update is serialized once and queued to every subscriber. A subscriber whose
+    queue is full is too slow to keep up; it is disconnected rather than allowed to
+    hold back the others or grow without bound, and resyncs over REST on reconnect.
+    """
+
+    def __init__(self) -> None:
+        self.queue_size = int(os.environ.get("GAME_HUB_QUEUE_SIZE", 64))
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self._subscribers: dict[str, set[Subscriber]] = {}
+
+    async def serve(
+        self, game_id: str, websocket: WebSocket, first: GameUpdate
+    ) -> None:
+        """Run an accepted connection until either side closes it."""
+        subscriber = Subscriber(websocket=websocket, queue_size=self.queue_size)
+        subscriber.queue.put_nowait(dump_model(first).decode())
+        self._subscribers.setdefault(game_id, set()).add(subscriber)
+        tasks = [
+            asyncio.create_task(subscriber.send_messages()),
+            asyncio.create_task(subscriber.receive_messages()),
+            asyncio.create_task(subscriber.stopped.wait()),
+        ]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self._unsubscribe(game_id=game_id, subscriber=subscriber)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if subscriber.dropped:
+                log.warning("Dropped slow subscriber from game %s", game_id)
+            await _close(
+                websocket=websocket,
+                code=TRY_AGAIN_LATER if subscriber.dropped else GOING_AWAY,
+            )
+
+    def is_watched(self, game_id: str) -> bool:
+        return game_id in self._subscribers
+
+    def publish(self, game_id: str, update: GameUpdate) -> None:
+        subscribers = self._subscribers.get(game_id)
+        if not subscribers:
+            return
+        self.published += 1
+        message = dump_model(update).decode()
+        for subscriber in subscribers:
+            if subscriber.stopped.is_set():
+                continue
+            try:
+                subscriber.queue.put_nowait(message)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                subscriber.dropped = True
+                subscriber.stopped.set()
+                self.dropped += 1
+
+    def close(self) -> None:
+        for subscribers in self._subscribers.values():
+            for subscriber in subscribers:
+                subscriber.stopped.set()
+
+    def _unsubscribe(self, game_id: str, subscriber: Subscriber) -> None:
+        subscribers = self._subscribers.get(game_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._subscribers[game_id]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "games": len(self._subscribers),
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+async def _close(websocket: WebSocket, code: int) -> None:
+    if websocket.application_state == WebSocketState.DISCONNECTED:
+        return
+    try:
+        await asyncio.wait_for(websocket.close(code=code), CLOSE_TIMEOUT_SECONDS)
+    except Exception:
+        # The client already went away, or stopped reading
+        pass
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, NamedTuple, Optional, TypeVar
+
+import httpx
+from pydantic import BaseModel
+
+from app.utils.errors import IdempotencyKeyReusedError
+from app.utils.single_flight import SingleFlight
+from app.utils.singleton import Singleton
+
+T = TypeVar("T")
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    response: Any
+    expires_at: float
+
+
+class IdempotencyStore(metaclass=Singleton):
+    """Results of completed writes, by the `Idempotency-Key` the client sent.
+
+    A retry with the same key gets the stored result back without running the write
+    again, and a retry that arrives while the first attempt is still running waits
+    for it and counts as a replay. Either way a key sent with a different request is
+    rejected. Only successful results are stored, so a failed write can be retried.
+    Keys are dropped after `ttl_seconds`, or oldest first beyond `max_keys`.
+    """
+
+    def __init__(self) -> None:
+        self.max_keys = int(os.environ.get("IDEMPOTENCY_MAX_KEYS", 4096))
+        self.ttl_seconds = float(os.environ.get("IDEMPOTENCY_TTL_SECONDS", 5 * 60))
+        self.replays = 0
+        self._responses: OrderedDict[tuple[str, str], StoredResponse] = OrderedDict()
+        # Fingerprint of the request each running write was started by
+        self._running: dict[tuple[str, str], str] = {}
+
+    async def run(
+        self,
+        operation: str,
+        game_id: str,
+        key: Optional[str],
+        request: BaseModel,
+        function: Callable[[], Awaitable[T]],
+    ) -> tuple[T, bool]:
+        """Result of `function`, and whether it was replayed from an earlier call.
+
+        Without a key, `function` simply runs. Keys are scoped to the game.
+        """
+        if key is None:
+            return await function(), False
+        key = f"{game_id}:{key}"
+        fingerprint = hashlib.sha256(request.model_dump_json().encode()).hexdigest()
+        stored = self._get(operation=operation, key=key)
+        if stored is not None:
+            _check_fingerprint(expected=stored.fingerprint, fingerprint=fingerprint)
+            self.replays += 1
+            return stored.response, True
+
+        running = self._running.get((operation, key))
+        if running is not None:
+            _check_fingerprint(expected=running, fingerprint=fingerprint)
+        else:
+            self._running[(operation, key)] = fingerprint
+
+        async def call() -> T:
+            try:
+                response = await function()
+                self._put(
+                    operation=operation,
+                    key=key,
+                    stored=StoredResponse(
+                        fingerprint=fingerprint,
+                        response=response,
+                        expires_at=time.monotonic() + self.ttl_seconds,
+                    ),
+                )
+                return response
+            finally:
+                # Later requests see the stored result, or start over on a failure
+                self._running.pop((operation, key), None)
+                SingleFlight().forget(operation=f"idempotent_{operation}", key=key)
+
+        response = await SingleFlight().do(
+            operation=f"idempotent_{operation}", key=key, function=call
+        )
+        if running is not None:
+            self.replays += 1
+        return response, running is not None
+
+    def _get(self, operation: str, key: str) -> Optional[StoredResponse]:
+        stored = self._responses.get((operation, key))
+        if stored is not None and stored.expires_at < time.monotonic():
+            del self._responses[(operation, key)]
+            return None
+        return stored
+
+    def _put(self, operation: str, key: str, stored: StoredResponse) -> None:
+        self._responses[(operation, key)] = stored
+        self._responses.move_to_end((operation, key))
+        now = time.monotonic()
+        while self._responses:
+            oldest = next(iter(self._responses.values()))
+            if len(self._responses) <= self.max_keys and oldest.expires_at >= now:
+                break
+            self._responses.popitem(last=False)
+
+    def stats(self) -> dict[str, int]:
+        return {"keys": len(self._responses), "replays": self.replays}
+
+
+def _check_fingerprint(expected: str, fingerprint: str) -> None:
+    if fingerprint != expected:
+        raise IdempotencyKeyReusedError(
+            status_code=httpx.codes.UNPROCESSABLE_ENTITY,
+            detail="Idempotency key was already used for a different request",
+        )
@@ -0,0 +1,223 @@
+import asyncio
+import cProfile
+import hmac
+import logging
+import os
+import pstats
+import random
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Optional
+
+import httpx
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.models.api.profiles.list_profiles import ProfileInfo
+from app.utils.errors import NotAuthorizedError, ProfileNotFoundError
+from app.utils.singleton import Singleton
+
+log = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile-token"
+PROFILE_NAME = re.compile(r"^[\w-]+$")
+# Phases are matched on the source path of Python functions, or on the name of
+# built-ins. The first match wins
+PHASES: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("engine", ("/app/models/game/",)),
+    (
+        "serialization",
+        (
+            "/app/models/api/",
+            "/pydantic/",
+            "pydantic_core",
+            "/fastapi/encoders",
+            "/json/",
+            "_json",
+            "orjson",
+        ),
+    ),
+    (
+        "database",
+        (
+            "/app/repositories/",
+            "/postgrest/",
+            "/supabase/",
+            "/httpx/",
+            "/httpcore/",
+            "/h2/",
+            "/hpack/",
+            "sqlite3",
+        ),
+    ),
+    ("framework", ("/fastapi/", "/starlette/", "/anyio/", "/asyncio/")),
+    ("io_wait", ("select.epoll", "select.kqueue", "select.select", "_overlapped")),
+)
+OTHER_PHASE = "other"
+
+
+class Profiler(metaclass=Singleton):
+    """Profiles requests that send `X-Profile-Token`, or a `sample_rate` share of all
+    requests, and keeps the last `max_files` profiles in `directory`.
+
+    Each profile is a cProfile dump (`.prof`, for snakeviz, flameprof or `python -m
+    pstats`) and a summary of where the time went by phase. One request is profiled
+    at a time. cProfile sees the whole thread, so other requests interleaved on the
+    event loop while the profiled one awaits are counted too.
+    """
+
+    def __init__(self) -> None:
+        self.token = os.environ.get("PROFILE_TOKEN") or None
+        self.sample_rate = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+        self.directory = Path(os.environ.get("PROFILE_DIR") or "profiles")
+        self.max_files = int(os.environ.get("PROFILE_MAX_FILES", 50))
+        self.active = False
+
+    def reason_to_profile(self, token: Optional[str]) -> Optional[str]:
+        if self.active:
+            return None
+        if token is not None and self.is_authorized(token=token):
+            return "header"
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    def is_authorized(self, token: Optional[str]) -> bool:
+        if self.token is None or token is None:
+            return False
+        return hmac.compare_digest(token.encode(), self.token.encode())
+
+    def check_authorized(self, authorization: Optional[str]) -> None:
+        """Admin calls send the token as `Authorization: Bearer ...` rather than in
+        `X-Profile-Token`, so they are not profiled themselves."""
+        scheme, _, token = (authorization or "").partition(" ")
+        if scheme.lower() != "bearer" or not self.is_authorized(token=token):
+            raise NotAuthorizedError(
+                status_code=httpx.codes.FORBIDDEN,
+                detail="A valid profile token is required",
+            )
+
+    async def save(self, profile: cProfile.Profile, info: dict[str, Any]) -> None:
+        # Writing and pruning touch the disk, so they run off the event loop
+        await asyncio.to_thread(self._save, profile=profile, info=info)
+
+    def _save(self, profile: cProfile.Profile, info: dict[str, Any]) -> None:
+        stats = pstats.Stats(profile)
+        created_at = datetime.now(timezone.utc)
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", info["path"]).strip("-") or "root"
+        name = f"{created_at:%Y%m%dT%H%M%S%fZ}-{info['method'].lower()}-{slug[:60]}"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stats.dump_stats(self.directory / f"{name}.prof")
+        summary = ProfileInfo(
+            name=name,
+            created_at=created_at,
+            phases_ms=_phases_ms(stats=stats),
+            **info,
+        )
+        (self.directory / f"{name}.json").write_text(summary.model_dump_json())
+        self._prune()
+
+    def _prune(self) -> None:
+        summaries = sorted(self.directory.glob("*.json"))
+        for summary in summaries[: max(0, len(summaries) - self.max_files)]:
+            summary.unlink(missing_ok=True)
+            summary.with_suffix(".prof").unlink(missing_ok=True)
+
+    def list_profiles(self) -> list[ProfileInfo]:
+        """Newest first."""
+        if not self.directory.is_dir():
+            return []
+        profiles = []
+        for summary in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                profiles.append(ProfileInfo.model_validate_json(summary.read_text()))
+            except (OSError, ValueError):
+                # Pruned by another worker while listing, or half written
+                continue
+        return profiles
+
+    def get_path(self, name: str) -> Path:
+        path = self.directory / f"{name}.prof"
+        if not PROFILE_NAME.match(name) or not path.is_file():
+            raise ProfileNotFoundError(
+                status_code=httpx.codes.NOT_FOUND, detail="Profile not found"
+            )
+        return path
+
+
+class ProfilingMiddleware:
+    """Runs the chosen requests under cProfile, then saves the profile."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profiler = Profiler()
+        reason = profiler.reason_to_profile(token=_header(scope, PROFILE_HEADER))
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        profiler.active = True
+        profile = cProfile.Profile()
+        start = perf_counter()
+        try:
+            profile.enable()
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                profile.disable()
+            try:
+                await profiler.save(
+                    profile=profile,
+                    info={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status,
+                        "reason": reason,
+                        "duration_ms": (perf_counter() - start) * 1000,
+                    },
+                )
+            except Exception as e:
+                # The response already went out, so this is only logged
+                log.exception("Failed to save profile of %s: %s", scope["path"], e)
+        finally:
+            profiler.active = False
+
+
+def _header(scope: Scope, name: str) -> Optional[str]:
+    encoded = name.encode()
+    for key, value in scope["headers"]:
+        if key == encoded:
+            return value.decode("latin-1")
+    return None
+
+
+def _phases_ms(stats: pstats.Stats) -> dict[str, float]:
+    """Own time of every function, summed by phase."""
+    phases = dict.fromkeys([phase for phase, _ in PHASES] + [OTHER_PHASE], 0.0)
+    entries = stats.stats.items()  # pyright: ignore[reportAttributeAccessIssue]
+    for (filename, _, function_name), (_, _, own_time, _, _) in entries:
+        location = function_name if filename == "~" else filename.replace("\\", "/")
+        phase = next(
+            (
+                phase
+                for phase, markers in PHASES
+                if any(marker in location for marker in markers)
+            ),
+            OTHER_PHASE,
+        )
+        phases[phase] += own_time * 1000
+    return {phase: round(ms, 3) for phase, ms in phases.items()}
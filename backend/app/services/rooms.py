@@ -3,62 +3,55 @@ import httpx
 from app.models.api.rooms.get_player_number import GetPlayerNumberResponse
 from app.models.api.rooms.join import JoinRoomResponse
 from app.services.database import DatabaseService
-from app.utils.errors import (RoomMissingHostPlayerError, RoomNotFoundError,
-                              UserNotInRoomError)
+from app.utils.errors import (RoomFullError, RoomMissingHostPlayerError,
+                              RoomNotFoundError, UserNotInRoomError)
+from app.utils.single_flight import SingleFlight
+
+GET_ROOM = "get_room"
 
 
 class RoomsService:
     async def create_room(
         self, game_id: str, player_one_id: str | None, player_two_id: str | None
     ) -> None:
-        client = await DatabaseService().get_client()
-        await client.table("rooms").insert(
-            {
-                "game_id": game_id,
-                "player_one_id": player_one_id,
-                "player_two_id": player_two_id,
-            }
-        ).execute()
-
-    async def join_room(self, game_id: str, player_id: str) -> JoinRoomResponse:
-        client = await DatabaseService().get_client()
-        response = (
-            await client.table("rooms")
-            .select("player_one_id", "player_two_id")
-            .eq("game_id", game_id)
-            .execute()
+        repository = await DatabaseService().get_repository()
+        await repository.create_room(
+            game_id=game_id, player_one_id=player_one_id, player_two_id=player_two_id
         )
-        if (
-            not response.data
-            or not isinstance(response.data, list)
-            or not response.data[0]
-        ):
-            raise RoomNotFoundError(
-                status_code=httpx.codes.NOT_FOUND, detail="Room not found"
-            )
+        SingleFlight().forget(operation=GET_ROOM, key=game_id)
 
-        player_info = response.data[0]
-        player_one_id = (
-            player_info.get("player_one_id") if isinstance(player_info, dict) else None
-        )
-        player_two_id = (
-            player_info.get("player_two_id") if isinstance(player_info, dict) else None
+    async def join_room(self, game_id: str, player_id: str) -> JoinRoomResponse:
+        repository = await DatabaseService().get_repository()
+        # Each update checks the host is there and the seat is free itself, so a
+        # join is usually one round trip, and the room is only read to explain a
+        # failed join. A taken seat is never given away, as a bot may hold it
+        joined = await repository.update_room(
+            game_id=game_id,
+            values={"player_two_id": player_id, "status": "planning"},
+            where_null=("player_two_id",),
+            where_not_null=("player_one_id",),
+        ) or await repository.update_room(
+            game_id=game_id,
+            values={"player_one_id": player_id, "status": "planning"},
+            where_null=("player_one_id",),
+            where_not_null=("player_two_id",),
         )
-        if not player_one_id and not player_two_id:
-            raise Exception("Room is missing host player")
+        if not joined:
+            room = await repository.get_room(game_id=game_id)
+            if room is None:
+                raise RoomNotFoundError(
+                    status_code=httpx.codes.NOT_FOUND, detail="Room not found"
+                )
+            seats = (room.get("player_one_id"), room.get("player_two_id"))
+            if player_id not in seats:
+                if all(seats):
+                    raise RoomFullError(
+                        status_code=httpx.codes.CONFLICT,
+                        detail="Room already has two players",
+                    )
+                raise Exception("Room is missing host player")
 
-        if player_one_id:
-            await client.table("rooms").update(
-                {"player_two_id": player_id, "status": "planning"}
-            ).eq("game_id", game_id).execute()
-            return JoinRoomResponse(
-                status_code=httpx.codes.OK,
-                message="Room joined successfully",
-                is_player_one=None,
-            )
-        await client.table("rooms").update(
-            {"player_one_id": player_id, "status": "planning"}
-        ).eq("game_id", game_id).execute()
+        SingleFlight().forget(operation=GET_ROOM, key=game_id)
         return JoinRoomResponse(
             status_code=httpx.codes.OK,
             message="Room joined successfully",
@@ -68,29 +61,20 @@ class RoomsService:
     async def get_player_number(
         self, game_id: str, user_id: str
     ) -> GetPlayerNumberResponse:
-        client = await DatabaseService().get_client()
-        response = (
-            await client.table("rooms")
-            .select("player_one_id", "player_two_id")
-            .eq("game_id", game_id)
-            .execute()
+        repository = await DatabaseService().get_repository()
+        # Both players ask as soon as they are notified, so concurrent reads share one
+        player_info = await SingleFlight().do(
+            operation=GET_ROOM,
+            key=game_id,
+            function=lambda: repository.get_room(game_id=game_id),
         )
-        if (
-            not response.data
-            or not isinstance(response.data, list)
-            or not response.data[0]
-        ):
+        if not player_info:
             raise RoomNotFoundError(
                 status_code=httpx.codes.NOT_FOUND, detail="Room not found"
             )
 
-        player_info = response.data[0]
-        player_one_id = (
-            player_info.get("player_one_id") if isinstance(player_info, dict) else None
-        )
-        player_two_id = (
-            player_info.get("player_two_id") if isinstance(player_info, dict) else None
-        )
+        player_one_id = player_info.get("player_one_id")
+        player_two_id = player_info.get("player_two_id")
         if not player_one_id and not player_two_id:
             raise RoomMissingHostPlayerError(
                 status_code=httpx.codes.NOT_FOUND, detail="Room is missing host player"
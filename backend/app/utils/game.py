@@ -1,4 +1,9 @@
-from app.models.game.base import Player
+import random
+from typing import Optional
+
+from app.models.game.base import (COLS, Marking, PieceLimits, Player, Position,
+                                  get_player_side_rows)
+from app.models.game.engine import Dancer, GameBoard, Master, Piece
 
 
 def is_player_turn(player: Player, turn: int) -> bool:
@@ -8,3 +13,41 @@ def is_player_turn(player: Player, turn: int) -> bool:
         return turn % 2 == 1
     else:
         raise ValueError(f"Invalid player: {player}")
+
+
+def generate_random_setup(
+    player: Player, rng: Optional[random.Random] = None
+) -> list[Piece]:
+    """Generate a setup for one player that passes `are_pieces_valid_during_setup`."""
+    rng = rng or random.Random()
+    squares = [
+        (row, col) for row in get_player_side_rows(player=player) for col in range(COLS)
+    ]
+    piece_count = (
+        PieceLimits.DANCER.value + PieceLimits.SPY.value + PieceLimits.MASTER.value
+    )
+    while True:
+        chosen = rng.sample(squares, piece_count)
+        pieces: list[Piece] = []
+        for index, (row, col) in enumerate(chosen):
+            position = Position(row=row, col=col)
+            if index < PieceLimits.MASTER.value:
+                pieces.append(
+                    Master(
+                        player=player,
+                        position=position,
+                        marking=Marking.NONE,
+                        is_spy=False,
+                    )
+                )
+            else:
+                pieces.append(
+                    Dancer(
+                        player=player,
+                        position=position,
+                        marking=Marking.NONE,
+                        is_spy=index == PieceLimits.MASTER.value,
+                    )
+                )
+        if GameBoard(pieces=pieces).are_pieces_valid_during_setup(pieces=pieces):
+            return pieces
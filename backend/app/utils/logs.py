@@ -0,0 +1,228 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.metrics import route_label
+from app.utils.singleton import Singleton
+
+TEXT_FORMAT = "%(name)s - %(message)s"
+# Attributes every LogRecord has, so anything else was passed as a field. Uvicorn
+# also passes a copy of its messages with terminal colors
+RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "color_message"}
+ACCESS_LOGGER = "app.access"
+# Uvicorn gives these their own handlers and stops them propagating to the root
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_request_fields: ContextVar[Optional[dict[str, Any]]] = ContextVar(
+    "request_fields", default=None
+)
+
+
+def bind_log_fields(**fields: Any) -> None:
+    """Add fields, like `game_id`, to every record logged for the current request."""
+    request_fields = _request_fields.get()
+    if request_fields is not None:
+        request_fields.update(fields)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the listener thread without formatting them, and drops them
+    when the queue is full instead of waiting.
+
+    Only the request fields are attached here, since they live in the caller's
+    context. Messages are formatted by the listener.
+    """
+
+    def __init__(self, log_queue: queue.Queue, sample_rates: dict[str, float]):
+        super().__init__(log_queue)
+        self.sample_rates = sample_rates
+        self._logger_rates: dict[str, float] = {}
+        self.dropped = 0
+        self.sampled_out = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.levelno <= logging.INFO and self._sampled_out(record.name):
+            self.sampled_out += 1
+            return
+        request_fields = _request_fields.get()
+        if request_fields:
+            for key, value in request_fields.items():
+                record.__dict__.setdefault(key, value)
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def _sampled_out(self, name: str) -> bool:
+        rate = self._logger_rates.get(name)
+        if rate is None:
+            rate = self._logger_rates[name] = _rate_for(
+                name=name, sample_rates=self.sample_rates
+            )
+        return rate < 1 and random.random() >= rate
+
+
+class StructuredFormatter(logging.Formatter):
+    """One JSON object per line, or text with the fields appended as `key=value`."""
+
+    def __init__(self, as_json: bool):
+        super().__init__(TEXT_FORMAT)
+        self.as_json = as_json
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {
+            key: value
+            for key, value in record.__dict__.items()
+            if key not in RECORD_ATTRIBUTES
+        }
+        if not self.as_json:
+            text = super().format(record)
+            if not fields:
+                return text
+            return f"{text} " + " ".join(f"{k}={v}" for k, v in fields.items())
+        line = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **fields,
+        }
+        if record.exc_info:
+            line["exception"] = self.formatException(record.exc_info)
+        return json.dumps(line, default=str)
+
+
+class LogPipeline(metaclass=Singleton):
+    """Root logging through a bounded queue, written out by a background thread.
+
+    Configured from `LOG_FORMAT` (`text` or `json`), `LOG_LEVEL`, `LOG_QUEUE_SIZE`
+    and `LOG_SAMPLE_RATES`, which keeps a share of the INFO and DEBUG records of a
+    logger and its children, e.g. `app.controllers=0.1,app.access=0.01`.
+    """
+
+    def __init__(self) -> None:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(
+            StructuredFormatter(as_json=os.environ.get("LOG_FORMAT") == "json")
+        )
+        self.handler = DroppingQueueHandler(
+            log_queue=queue.Queue(maxsize=int(os.environ.get("LOG_QUEUE_SIZE", 10000))),
+            sample_rates=_parse_sample_rates(os.environ.get("LOG_SAMPLE_RATES", "")),
+        )
+        self.listener = logging.handlers.QueueListener(
+            self.handler.queue, stream_handler, respect_handler_level=True
+        )
+        self.running = False
+        atexit.register(self.stop)
+
+    def start(self) -> None:
+        """Replace the root handlers with the queue, and send Uvicorn's records to
+        the root too. Safe to call again."""
+        root = logging.getLogger()
+        if self.handler not in root.handlers:
+            for handler in list(root.handlers):
+                root.removeHandler(handler)
+            root.addHandler(self.handler)
+            root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+            logging.getLogger("httpx").setLevel(logging.WARNING)
+        # Uvicorn may configure its loggers after this module first ran, so they
+        # are reset on every call
+        for name in UVICORN_LOGGERS:
+            logger = logging.getLogger(name)
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+            logger.propagate = True
+        # `app.access` already logs every request, with more fields
+        logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+        if not self.running:
+            self.listener.start()
+            self.running = True
+
+    def stop(self) -> None:
+        """Write out what is queued and stop the thread."""
+        if self.running:
+            self.listener.stop()
+            self.running = False
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": self.handler.queue.qsize(),
+            "dropped": self.handler.dropped,
+            "sampled_out": self.handler.sampled_out,
+        }
+
+
+class AccessLogMiddleware:
+    """Logs one record per HTTP request with its route template, status and latency, and
+    collects the fields handlers bind for the other records of the request."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.log = logging.getLogger(ACCESS_LOGGER)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_fields: dict[str, Any] = {
+            "method": scope["method"],
+            "path": scope["path"],
+        }
+        token = _request_fields.set(request_fields)
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.log.info(
+                "%s %s %s",
+                scope["method"],
+                scope["path"],
+                status,
+                extra={
+                    "route": route_label(scope),
+                    "status": status,
+                    "latency_ms": round((perf_counter() - start) * 1000, 3),
+                },
+            )
+            _request_fields.reset(token)
+
+
+def _parse_sample_rates(text: str) -> dict[str, float]:
+    sample_rates = {}
+    for entry in text.split(","):
+        name, _, rate = entry.partition("=")
+        if name.strip() and rate.strip():
+            sample_rates[name.strip()] = float(rate)
+    return sample_rates
+
+
+def _rate_for(name: str, sample_rates: dict[str, float]) -> float:
+    """The rate of the logger, or of its closest configured parent."""
+    while name:
+        if name in sample_rates:
+            return sample_rates[name]
+        name = name.rpartition(".")[0]
+    return 1.0
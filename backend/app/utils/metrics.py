@@ -0,0 +1,263 @@
+from bisect import bisect_left
+from time import perf_counter
+from typing import Any, Iterator, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.singleton import Singleton
+
+# Upper bounds in seconds, from a cached read up to a slow database call
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+UNMATCHED_ROUTE = "unmatched"
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        # One count per bucket, plus the last one for values above every bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+
+
+class Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self) -> None:
+        self.start = perf_counter()
+
+    def __exit__(self, *_: Any) -> None:
+        self.histogram.observe(perf_counter() - self.start)
+
+
+class HistogramFamily:
+    """Durations in seconds, one histogram per combination of label values.
+
+    Observing is a bisect and two additions, so it is cheap enough for every request,
+    query and engine step. Label values must come from a small fixed set.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...],
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        self._histograms: dict[tuple[str, ...], Histogram] = {}
+
+    def labels(self, *label_values: str) -> Histogram:
+        histogram = self._histograms.get(label_values)
+        if histogram is None:
+            histogram = self._histograms[label_values] = Histogram(buckets=self.buckets)
+        return histogram
+
+    def observe(self, seconds: float, *label_values: str) -> None:
+        self.labels(*label_values).observe(seconds)
+
+    def time(self, *label_values: str) -> Timer:
+        return Timer(histogram=self.labels(*label_values))
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for label_values, histogram in self._histograms.items():
+            labels = list(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets, histogram.counts):
+                cumulative += count
+                yield _sample(
+                    f"{self.name}_bucket", labels + [("le", str(bound))], cumulative
+                )
+            cumulative += histogram.counts[-1]
+            yield _sample(f"{self.name}_bucket", labels + [("le", "+Inf")], cumulative)
+            yield _sample(f"{self.name}_sum", labels, histogram.sum)
+            yield _sample(f"{self.name}_count", labels, cumulative)
+
+
+class CounterFamily:
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._counts: dict[tuple[str, ...], int] = {}
+
+    def inc(self, *label_values: str) -> None:
+        self._counts[label_values] = self._counts.get(label_values, 0) + 1
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for label_values, count in self._counts.items():
+            yield _sample(
+                f"{self.name}_total", list(zip(self.label_names, label_values)), count
+            )
+
+
+class Metrics(metaclass=Singleton):
+    """Process-wide metrics in the Prometheus text format.
+
+    Histograms and counters are registered once, usually at import, and recorded
+    as the app runs. Stats kept elsewhere, like the cache counters, are passed to
+    `render` and exported as they are at scrape time.
+    """
+
+    def __init__(self) -> None:
+        self._families: dict[str, HistogramFamily | CounterFamily] = {}
+
+    def histogram(
+        self, name: str, documentation: str, label_names: tuple[str, ...]
+    ) -> HistogramFamily:
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = HistogramFamily(
+                name=name, documentation=documentation, label_names=label_names
+            )
+        if not isinstance(family, HistogramFamily):
+            raise ValueError(f"Metric {name} is not a histogram")
+        return family
+
+    def counter(
+        self, name: str, documentation: str, label_names: tuple[str, ...]
+    ) -> CounterFamily:
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = CounterFamily(
+                name=name, documentation=documentation, label_names=label_names
+            )
+        if not isinstance(family, CounterFamily):
+            raise ValueError(f"Metric {name} is not a counter")
+        return family
+
+    def render(self, stats: Optional[dict[str, dict[str, Any]]] = None) -> str:
+        """Every metric, then `stats` as gauges named `sashay_{source}_{stat}`.
+
+        A stat that is itself a dict, like single-flight counts per operation, is
+        exported with its key as the `name` label.
+        """
+        lines: list[str] = []
+        for family in self._families.values():
+            lines.extend(family.render())
+        gauges: dict[str, list[tuple[list[tuple[str, str]], float]]] = {}
+        for source, source_stats in (stats or {}).items():
+            for stat, value in source_stats.items():
+                if isinstance(value, dict):
+                    for inner_stat, inner_value in value.items():
+                        _add_gauge(
+                            gauges=gauges,
+                            name=f"sashay_{source}_{inner_stat}",
+                            labels=[("name", stat)],
+                            value=inner_value,
+                        )
+                else:
+                    _add_gauge(
+                        gauges=gauges,
+                        name=f"sashay_{source}_{stat}",
+                        labels=[],
+                        value=value,
+                    )
+        for name, samples in gauges.items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(_sample(name, labels, value) for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+REQUEST_SECONDS = Metrics().histogram(
+    "sashay_http_request_duration_seconds",
+    "Time to respond to an HTTP request, by route template.",
+    ("method", "route", "status"),
+)
+
+
+class RequestMetricsMiddleware:
+    """Times every HTTP request. Plain ASGI, so it adds no task or body copying."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_SECONDS.observe(
+                perf_counter() - start,
+                scope["method"],
+                route_label(scope),
+                str(status),
+            )
+
+
+def route_label(scope: Scope) -> str:
+    """The matched route's path template. Unmatched paths are grouped, so scanners
+    cannot create a series per path."""
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    # Routes of included routers only know their path relative to the router, but
+    # without path parameters the requested path is the full template
+    if scope.get("path_params"):
+        return getattr(route, "path", UNMATCHED_ROUTE)
+    return scope["path"]
+
+
+def _sample(name: str, labels: list[tuple[str, str]], value: float) -> str:
+    if not labels:
+        return f"{name} {value}"
+    label_text = ",".join(f'{label}="{_escape(text)}"' for label, text in labels)
+    return f"{name}{{{label_text}}} {value}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _add_gauge(
+    gauges: dict[str, list[tuple[list[tuple[str, str]], float]]],
+    name: str,
+    labels: list[tuple[str, str]],
+    value: Any,
+) -> None:
+    """Numbers and booleans only, so labels like the backend name are skipped."""
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, (int, float)):
+        gauges.setdefault(name, []).append((labels, value))
@@ -0,0 +1,43 @@
+"""JSON for responses built from already checked state.
+
+Written with orjson, which gives the same compact JSON as pydantic.
+"""
+
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import Response
+
+
+def dumps(content: Any) -> bytes:
+    """Enums are written as their values and nested models as their JSON dump."""
+    return orjson.dumps(content, default=_default)
+
+
+def dump_model(model: BaseModel) -> bytes:
+    """The fields of a model built with `model_construct`, dumped without validation.
+
+    Only for models without aliases or custom serializers.
+    """
+    return dumps(model.__dict__)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class ModelResponse(Response):
+    """A response model built with `model_construct`, written without validation.
+
+    When an endpoint returns a model, FastAPI validates it against the response
+    model again, then pydantic infers how to write every untyped piece dict. A
+    `Response` is sent as it is, so the fields are dumped directly instead.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: BaseModel) -> bytes:
+        return dump_model(content)
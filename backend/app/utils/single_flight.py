@@ -0,0 +1,58 @@
+import asyncio
+from collections import Counter
+from typing import Awaitable, Callable, TypeVar
+
+from app.utils.singleton import Singleton
+
+T = TypeVar("T")
+
+
+class SingleFlight(metaclass=Singleton):
+    """Coalesces concurrent identical reads into one call.
+
+    Callers asking for the same `(operation, key)` while a call is in flight wait for
+    that call and share its result or exception, instead of starting their own. The
+    call runs as its own task, so a caller that is cancelled does not cancel it for
+    the others. Results are shared, not copied, so they must not be mutated.
+    """
+
+    def __init__(self) -> None:
+        self.calls: Counter[str] = Counter()
+        self.coalesced: Counter[str] = Counter()
+        self._in_flight: dict[tuple[str, str], asyncio.Task] = {}
+
+    async def do(
+        self, operation: str, key: str, function: Callable[[], Awaitable[T]]
+    ) -> T:
+        flight_key = (operation, key)
+        task = self._in_flight.get(flight_key)
+        if task is None:
+            self.calls[operation] += 1
+            task = asyncio.ensure_future(function())
+            self._in_flight[flight_key] = task
+            task.add_done_callback(
+                lambda done: self._land(flight_key=flight_key, task=done)
+            )
+        else:
+            self.coalesced[operation] += 1
+        return await asyncio.shield(task)
+
+    def forget(self, operation: str, key: str) -> None:
+        """Start a new call for later callers, after a write the current one may miss."""
+        self._in_flight.pop((operation, key), None)
+
+    def _land(self, flight_key: tuple[str, str], task: asyncio.Task) -> None:
+        if self._in_flight.get(flight_key) is task:
+            del self._in_flight[flight_key]
+        if not task.cancelled():
+            # Marks the exception as retrieved when every caller was cancelled
+            task.exception()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {
+            operation: {
+                "calls": self.calls[operation],
+                "coalesced": self.coalesced[operation],
+            }
+            for operation in self.calls
+        }
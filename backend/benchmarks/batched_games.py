@@ -0,0 +1,77 @@
+"""Random self-play throughput, batched NumPy engine vs one bitboard engine per game.
+
+Needs NumPy (`poetry install --with benchmark`). Run from the backend directory:
+
+    python -m benchmarks.batched_games --games 1000 --max-turns 200
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.models.game.base import Player
+from app.models.game.batched import BatchedGameEngine
+from app.models.game.bitboard import BitboardGameEngine
+from app.models.game.compact import CompactPiece
+from app.models.game.ismcts import player_for_turn
+from app.utils.game import generate_random_setup
+
+
+def build_games(count: int, seed: int) -> list[list[CompactPiece]]:
+    rng = random.Random(seed)
+    return [
+        [
+            CompactPiece.from_piece(piece)
+            for piece in generate_random_setup(player=Player.PLAYER_ONE, rng=rng)
+            + generate_random_setup(player=Player.PLAYER_TWO, rng=rng)
+        ]
+        for _ in range(count)
+    ]
+
+
+def run_batched(games: list[list[CompactPiece]], max_turns: int, seed: int) -> int:
+    batched_engine = BatchedGameEngine.from_pieces(games=games)
+    batched_engine.process_initialization_capture()
+    batched_engine.process_potential_win()
+    batched_engine.play_random(max_turns=max_turns, rng=np.random.default_rng(seed))
+    return int(batched_engine.turns.sum())
+
+
+def run_sequential(games: list[list[CompactPiece]], max_turns: int, seed: int) -> int:
+    rng = random.Random(seed)
+    plies = 0
+    for pieces in games:
+        game_engine = BitboardGameEngine(pieces=pieces)
+        game_engine.process_initialization_capture()
+        game_engine.victory = game_engine.find_victory()
+        while game_engine.victory is None and game_engine.turn < max_turns:
+            moves = game_engine.generate_moves(player=player_for_turn(game_engine.turn))
+            if not moves:
+                break
+            game_engine.make_move(*rng.choice(moves))
+        plies += game_engine.turn
+    return plies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--max-turns", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for name, run in (("batched", run_batched), ("sequential", run_sequential)):
+        games = build_games(count=args.games, seed=args.seed)
+        start = time.perf_counter()
+        plies = run(games=games, max_turns=args.max_turns, seed=args.seed)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:>10}: {args.games / elapsed:10.1f} games/s"
+            f" {plies / elapsed:12.1f} plies/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
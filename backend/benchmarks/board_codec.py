@@ -0,0 +1,104 @@
+"""Size and speed of a stored board, JSON piece dicts vs the compact binary codec.
+
+JSON is decoded three ways: into validated `Piece` models, into engine pieces with
+the strict checks of legacy rows, and into engine pieces trusting a tagged row.
+
+Run from the backend directory:
+
+    python -m benchmarks.board_codec --iterations 20000
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Callable
+
+from app.models.game.base import Player
+from app.models.game.codec import PieceIds, decode_pieces, encode_pieces
+from app.models.game.compact import CompactPiece
+from app.models.game.engine import parse_piece
+from app.utils.game import generate_random_setup
+
+
+def time_per_call(function: Callable[[], object], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pieces = generate_random_setup(
+        player=Player.PLAYER_ONE, rng=rng
+    ) + generate_random_setup(player=Player.PLAYER_TWO, rng=rng)
+    compact_pieces = [CompactPiece.from_piece(piece) for piece in pieces]
+    piece_ids = PieceIds(ids=[piece.id for piece in pieces])
+    stored_json = json.dumps([piece.model_dump() for piece in pieces])
+    stored_binary = encode_pieces(pieces=compact_pieces, piece_ids=piece_ids)
+
+    results = {
+        "json": (
+            len(stored_json.encode()),
+            time_per_call(
+                lambda: json.dumps([piece.model_dump() for piece in pieces]),
+                args.iterations,
+            ),
+            time_per_call(
+                lambda: [parse_piece(piece) for piece in json.loads(stored_json)],
+                args.iterations,
+            ),
+        ),
+        "json, strict": (
+            len(stored_json.encode()),
+            time_per_call(
+                lambda: json.dumps([piece.to_dict() for piece in compact_pieces]),
+                args.iterations,
+            ),
+            time_per_call(
+                lambda: CompactPiece.from_dicts(
+                    pieces_data=json.loads(stored_json), trusted=False
+                ),
+                args.iterations,
+            ),
+        ),
+        "json, trusted": (
+            len(stored_json.encode()),
+            time_per_call(
+                lambda: json.dumps([piece.to_dict() for piece in compact_pieces]),
+                args.iterations,
+            ),
+            time_per_call(
+                lambda: CompactPiece.from_dicts(
+                    pieces_data=json.loads(stored_json), trusted=True
+                ),
+                args.iterations,
+            ),
+        ),
+        "binary": (
+            len(stored_binary),
+            time_per_call(
+                lambda: encode_pieces(pieces=compact_pieces, piece_ids=piece_ids),
+                args.iterations,
+            ),
+            time_per_call(
+                lambda: decode_pieces(data=stored_binary, piece_ids=piece_ids),
+                args.iterations,
+            ),
+        ),
+    }
+    for name, (size, encode_us, decode_us) in results.items():
+        print(
+            f"{name:>13}: {size:6d} bytes  encode {encode_us:8.1f} us"
+            f"  decode {decode_us:8.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
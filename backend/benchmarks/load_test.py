@@ -0,0 +1,301 @@
+"""Throughput and latency per route under many concurrent simulated games.
+
+Each game creates a room, has a second player join, submits both setups, then
+plays up to `--moves` random legal moves: the player to move reads the board from
+`GET /games/pieces`, picks a move with the reference engine and posts it. Games
+run concurrently, at most `--concurrency` at a time, with no pause between requests,
+so latency grows with concurrency once the app is saturated. Moves are picked in
+`--pickers` worker processes, so the players do not slow down the app they drive.
+
+By default the app runs in this process on the in-memory store, with
+`--latency-ms` of simulated delay per storage call. `--database sqlite` uses a
+fresh SQLite file instead. `--url` drives a running server, so several workers can
+be compared, and leaves the storage to that server.
+
+Run from the backend directory:
+
+    python -m benchmarks.load_test --games 2000 --concurrency 500
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional
+
+import httpx
+
+from app.models.game.base import Player
+from app.models.game.engine import GameEngine, parse_piece
+from app.utils.game import generate_random_setup, is_player_turn
+
+ROUTES = (
+    "POST /rooms/create",
+    "POST /rooms/join",
+    "POST /games/initialize",
+    "GET /games/pieces",
+    "POST /games/pieces/move",
+)
+
+
+class LoadTest:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        executor: ProcessPoolExecutor,
+        moves: int,
+        seed: int,
+    ):
+        self.client = client
+        self.executor = executor
+        self.moves = moves
+        self.seed = seed
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.games_finished = 0
+        self.games_failed = 0
+        self.moves_played = 0
+
+    async def request(
+        self,
+        route: str,
+        path: str,
+        body: Optional[dict[str, Any]] = None,
+        params: Optional[dict[str, Any]] = None,
+    ) -> Optional[dict[str, Any]]:
+        """The response body, or None after counting a failure against the route."""
+        method = route.split(" ")[0]
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(
+                method, f"/api/v1{path}", json=body, params=params
+            )
+        except httpx.HTTPError:
+            self.errors[route] += 1
+            return None
+        self.latencies[route].append(time.perf_counter() - start)
+        if response.status_code != httpx.codes.OK:
+            self.errors[route] += 1
+            return None
+        content = response.json()
+        # Controllers report failures in the body with a 200
+        if content.get("status_code", httpx.codes.OK) != httpx.codes.OK:
+            self.errors[route] += 1
+            return None
+        return content
+
+    async def play(self, index: int) -> None:
+        rng = random.Random(self.seed * 1_000_003 + index)
+        game_id = f"load-{uuid.uuid4()}"
+        if not await self.set_up(game_id=game_id, rng=rng):
+            self.games_failed += 1
+            return
+        for _ in range(self.moves):
+            state = await self.request(
+                "GET /games/pieces", "/games/pieces", params={"game_id": game_id}
+            )
+            if state is None:
+                self.games_failed += 1
+                return
+            if state["victory_state"] is not None:
+                break
+            move = await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                pick_random_move,
+                state["pieces"],
+                state["turn"],
+                rng.getrandbits(32),
+            )
+            if move is None:
+                break
+            if (
+                await self.request(
+                    "POST /games/pieces/move",
+                    "/games/pieces/move",
+                    body={"game_id": game_id, "delta": True, **move},
+                )
+                is None
+            ):
+                self.games_failed += 1
+                return
+            self.moves_played += 1
+        self.games_finished += 1
+
+    async def set_up(self, game_id: str, rng: random.Random) -> bool:
+        if (
+            await self.request(
+                "POST /rooms/create",
+                "/rooms/create",
+                body={
+                    "game_id": game_id,
+                    "player_one_id": f"{game_id}-one",
+                    "player_two_id": None,
+                },
+            )
+            is None
+        ):
+            return False
+        if (
+            await self.request(
+                "POST /rooms/join",
+                "/rooms/join",
+                body={"game_id": game_id, "player_id": f"{game_id}-two"},
+            )
+            is None
+        ):
+            return False
+        for player in (Player.PLAYER_ONE, Player.PLAYER_TWO):
+            if (
+                await self.request(
+                    "POST /games/initialize",
+                    "/games/initialize",
+                    body={
+                        "game_id": game_id,
+                        "pieces": [
+                            piece.model_dump(mode="json")
+                            for piece in generate_random_setup(player=player, rng=rng)
+                        ],
+                    },
+                )
+                is None
+            ):
+                return False
+        return True
+
+    def report(self, seconds: float) -> None:
+        total = sum(len(latencies) for latencies in self.latencies.values())
+        print(
+            f"{self.games_finished} games finished, {self.games_failed} failed,"
+            f" {self.moves_played} moves in {seconds:.1f} s"
+        )
+        print(f"{total} requests, {total / seconds:.1f} requests/s\n")
+        print(
+            f"{'route':>24}  {'requests':>8}  {'errors':>6}  {'req/s':>8}"
+            f"  {'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}"
+        )
+        for route in ROUTES:
+            latencies = sorted(self.latencies[route])
+            if not latencies:
+                continue
+            print(
+                f"{route:>24}  {len(latencies):8d}  {self.errors[route]:6d}"
+                f"  {len(latencies) / seconds:8.1f}"
+                f"  {percentile(latencies, 50) * 1000:8.2f}"
+                f"  {percentile(latencies, 95) * 1000:8.2f}"
+                f"  {percentile(latencies, 99) * 1000:8.2f}"
+            )
+
+
+def pick_random_move(
+    pieces: list[dict[str, Any]], turn: int, seed: int
+) -> Optional[dict[str, Any]]:
+    """A random legal move of the player to move, or None if there is none."""
+    rng = random.Random(seed)
+    curr_pieces = [parse_piece(p) for p in pieces]
+    game_engine = GameEngine(pieces=curr_pieces)
+    moves = [
+        (piece, position)
+        for piece in curr_pieces
+        if is_player_turn(player=piece.player, turn=turn)
+        for position in game_engine.get_possible_new_positions(piece=piece)
+    ]
+    if not moves:
+        return None
+    piece, position = rng.choice(moves)
+    return {
+        "piece": piece.model_dump(mode="json"),
+        "new_position": position.model_dump(),
+    }
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(1, round(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def in_process_transport(database: str, latency: float) -> httpx.ASGITransport:
+    os.environ["DATABASE_BACKEND"] = database
+    if database == "sqlite":
+        os.environ["SQLITE_PATH"] = os.path.join(
+            tempfile.mkdtemp(prefix="sashay-load-"), "load.sqlite3"
+        )
+    # Imported here so the app reads the storage settings above
+    from app.api.main import app
+    from app.services.database import DatabaseService
+
+    if latency > 0:
+        from benchmarks.round_trips import CountingRepository
+
+        DatabaseService().set_repository(CountingRepository(latency=latency))
+    return httpx.ASGITransport(app=app)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--moves", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pickers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--database", choices=("memory", "sqlite"), default="memory")
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=0,
+        help="Delay per storage call, on the in-memory store",
+    )
+    parser.add_argument("--url", help="Base URL of a running server")
+    args = parser.parse_args()
+
+    if args.url is not None:
+        transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=args.concurrency)
+        )
+        base_url = args.url
+    else:
+        if args.latency_ms > 0 and args.database != "memory":
+            parser.error("--latency-ms only applies to --database memory")
+        transport = in_process_transport(
+            database=args.database, latency=args.latency_ms / 1000
+        )
+        base_url = "http://load-test"
+    # Request logs would drown the report and cost the run more than the requests
+    logging.disable(logging.INFO)
+
+    with ProcessPoolExecutor(max_workers=args.pickers) as executor:
+        async with httpx.AsyncClient(
+            transport=transport, base_url=base_url, timeout=60
+        ) as client:
+            load_test = LoadTest(
+                client=client, executor=executor, moves=args.moves, seed=args.seed
+            )
+            # The first requests pay for app startup and for starting the pickers,
+            # which are not part of the load
+            await client.get("/api/v1/status")
+            await asyncio.gather(
+                *(
+                    asyncio.get_running_loop().run_in_executor(executor, int)
+                    for _ in range(args.pickers)
+                )
+            )
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def play(index: int) -> None:
+                async with semaphore:
+                    await load_test.play(index=index)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(play(index) for index in range(args.games)))
+            seconds = time.perf_counter() - start
+    load_test.report(seconds=seconds)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,141 @@
+"""Per-request CPU cost of the move endpoint, Pydantic engine vs compact engine.
+
+Each path runs end to end, from the stored piece dicts to the response body. The
+Pydantic path parses every piece into a model, moves with `GameEngine`, builds the
+response with validation and lets FastAPI validate and dump it again, as the
+endpoint did before. The compact path moves with `BitboardGameEngine`, constructs
+the response from piece dicts and writes it with `ModelResponse`, as it does now.
+
+Run from the backend directory:
+
+    python -m benchmarks.move_request --iterations 2000
+"""
+
+import argparse
+import random
+import timeit
+from typing import Any
+
+import httpx
+from pydantic import TypeAdapter
+
+from app.models.api.games.move_piece import MovePieceResponse
+from app.models.game.base import Player, Position
+from app.models.game.bitboard import BitboardGameEngine
+from app.models.game.compact import CompactPiece
+from app.models.game.engine import GameEngine, Movement, parse_piece
+from app.utils.game import generate_random_setup
+from app.utils.serialization import ModelResponse
+
+# FastAPI keeps one adapter per response model, so the old path does not pay for it
+MOVE_ADAPTER = TypeAdapter(MovePieceResponse)
+
+
+def build_stored_pieces(seed: int) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    pieces = generate_random_setup(
+        player=Player.PLAYER_ONE, rng=rng
+    ) + generate_random_setup(player=Player.PLAYER_TWO, rng=rng)
+    return [piece.model_dump() for piece in pieces]
+
+
+def pick_move(raw_pieces: list[dict[str, Any]]) -> tuple[str, Position]:
+    pieces = [CompactPiece.from_dict(p) for p in raw_pieces]
+    game_engine = BitboardGameEngine(pieces=pieces)
+    for piece in pieces:
+        if piece.player != Player.PLAYER_ONE:
+            continue
+        positions = game_engine.get_possible_new_positions(piece=piece)
+        if positions:
+            return piece.id, positions[-1]
+    raise ValueError("No legal move for player one")
+
+
+def pydantic_move_request(
+    raw_pieces: list[dict[str, Any]], piece_id: str, new_position: Position
+) -> tuple[dict[str, Any], bytes]:
+    curr_pieces = [parse_piece(p) for p in raw_pieces]
+    game_engine = GameEngine(pieces=curr_pieces)
+    piece = next(p for p in curr_pieces if p.id == piece_id)
+    original_position = piece.position
+    game_engine.move_piece(piece=piece, new_position=new_position)
+    captured_pieces = game_engine.process_potential_capture(new_position=new_position)
+    updated_pieces = game_engine.game_board.get_pieces()
+    victory_state = game_engine.process_potential_win()
+    movement = Movement(previous_position=original_position, new_position=new_position)
+    stored = {
+        "pieces": [p.model_dump() for p in updated_pieces],
+        "captured_pieces": [p.model_dump() for p in captured_pieces],
+    }
+    response = MovePieceResponse.model_validate(
+        {
+            "status_code": httpx.codes.OK,
+            "captured_pieces": captured_pieces,
+            "victory_state": victory_state,
+            "pieces": updated_pieces,
+            "movement": movement,
+            "turn": 1,
+        }
+    )
+    return stored, MOVE_ADAPTER.dump_json(MOVE_ADAPTER.validate_python(response))
+
+
+def compact_move_request(
+    raw_pieces: list[dict[str, Any]], piece_id: str, new_position: Position
+) -> tuple[dict[str, Any], bytes]:
+    curr_pieces = CompactPiece.from_dicts(pieces_data=raw_pieces, trusted=True)
+    game_engine = BitboardGameEngine(pieces=curr_pieces)
+    piece = next(p for p in curr_pieces if p.id == piece_id)
+    original_position = piece.position
+    game_engine.move_piece(piece=piece, new_position=new_position)
+    captured_pieces = game_engine.process_potential_capture(new_position=new_position)
+    updated_pieces = game_engine.game_board.get_pieces()
+    victory_state = game_engine.process_potential_win()
+    movement = Movement(previous_position=original_position, new_position=new_position)
+    stored = {
+        "pieces": [p.to_dict() for p in updated_pieces],
+        "captured_pieces": [p.to_dict() for p in captured_pieces],
+    }
+    response = MovePieceResponse.model_construct(
+        status_code=httpx.codes.OK,
+        captured_pieces=stored["captured_pieces"],
+        victory_state=victory_state,
+        pieces=stored["pieces"],
+        movement=movement,
+        turn=1,
+        since_turn=None,
+        removed_piece_ids=[],
+    )
+    return stored, ModelResponse(content=response).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    raw_pieces = build_stored_pieces(seed=args.seed)
+    piece_id, new_position = pick_move(raw_pieces=raw_pieces)
+    if pydantic_move_request(raw_pieces, piece_id, new_position) != (
+        compact_move_request(raw_pieces, piece_id, new_position)
+    ):
+        raise AssertionError("Paths disagree on the resulting board or response")
+
+    timings: dict[str, float] = {}
+    for name, request in (
+        ("pydantic", pydantic_move_request),
+        ("compact", compact_move_request),
+    ):
+        seconds = timeit.timeit(
+            lambda: request(raw_pieces, piece_id, new_position),
+            number=args.iterations,
+        )
+        timings[name] = seconds / args.iterations * 1e6
+        print(f"{name:>10}: {timings[name]:8.1f} us/request")
+    reduction = 1 - timings["compact"] / timings["pydantic"]
+    print(f"{'reduction':>10}: {reduction:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
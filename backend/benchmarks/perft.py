@@ -0,0 +1,374 @@
+"""Perft move-tree counter and differential check for engine variants.
+
+Counts nodes, captures and wins per depth from random legal setups, reports nodes
+per second for each engine, and walks the reference and bitboard trees in lockstep
+to report the first position where they disagree. Run from the backend directory:
+
+    python -m benchmarks.perft --depth 2 --setups 5
+    python -m benchmarks.perft --depth 3 --engines bitboard,batched
+"""
+
+import argparse
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional, Protocol
+
+from app.models.game.base import POSITIONS, Player, square_of
+from app.models.game.bitboard import BitboardGameEngine
+from app.models.game.compact import CompactPiece
+from app.models.game.engine import GameEngine, PieceType, VictoryType
+from app.models.game.ismcts import player_for_turn
+from app.utils.game import generate_random_setup
+
+Move = tuple[int, int]
+Victory = Optional[tuple[Player, VictoryType]]
+PositionKey = tuple[tuple[int, PieceType, Player, bool], ...]
+
+
+@dataclass
+class PerftCounts:
+    nodes: list[int] = field(default_factory=list)
+    captures: list[int] = field(default_factory=list)
+    wins: list[int] = field(default_factory=list)
+
+    def add(self, depth: int, captured: int, won: bool) -> None:
+        while len(self.nodes) < depth:
+            self.nodes.append(0)
+            self.captures.append(0)
+            self.wins.append(0)
+        self.nodes[depth - 1] += 1
+        self.captures[depth - 1] += captured
+        self.wins[depth - 1] += won
+
+
+class PerftEngine(Protocol):
+    def moves(self) -> list[Move]: ...
+
+    def play(self, move: Move) -> tuple[Any, int]:
+        """Play a move, returning an undo token and the number of pieces captured."""
+        ...
+
+    def undo(self, token: Any) -> None: ...
+
+    def victory(self) -> Victory: ...
+
+    def position(self) -> PositionKey: ...
+
+
+class ReferenceEngine:
+    """`GameEngine` has no undo, so every move copies the pieces and rebuilds."""
+
+    def __init__(self, pieces: list[CompactPiece], turn: int):
+        self.pieces = [piece.to_piece().model_copy(deep=True) for piece in pieces]
+        self.turn = turn
+        self.game_engine = GameEngine(pieces=self.pieces)
+        # The root can already be won, as it is when the batched engine starts
+        self._victory = self._find_victory()
+
+    def moves(self) -> list[Move]:
+        player = player_for_turn(self.turn)
+        return [
+            (
+                square_of(piece.position.row, piece.position.col),
+                square_of(position.row, position.col),
+            )
+            for piece in self.game_engine.game_board.get_pieces()
+            if piece.player == player
+            for position in self.game_engine.get_possible_new_positions(piece=piece)
+        ]
+
+    def play(self, move: Move) -> tuple[Any, int]:
+        token = (self.pieces, self.turn, self._victory)
+        self.pieces = [
+            piece.model_copy(deep=True)
+            for piece in self.game_engine.game_board.get_pieces()
+        ]
+        self.game_engine = GameEngine(pieces=self.pieces)
+        square, new_square = move
+        piece = next(
+            p
+            for p in self.pieces
+            if square_of(p.position.row, p.position.col) == square
+        )
+        self.game_engine.move_piece(piece=piece, new_position=POSITIONS[new_square])
+        captured = self.game_engine.process_potential_capture(
+            new_position=POSITIONS[new_square]
+        )
+        self.pieces = self.game_engine.game_board.get_pieces()
+        self._victory = self._find_victory()
+        self.turn += 1
+        return token, len(captured)
+
+    def undo(self, token: Any) -> None:
+        self.pieces, self.turn, self._victory = token
+        self.game_engine = GameEngine(pieces=self.pieces)
+
+    def victory(self) -> Victory:
+        return self._victory
+
+    def _find_victory(self) -> Victory:
+        victory_state = self.game_engine.process_potential_win()
+        if victory_state is None:
+            return None
+        return (victory_state.player, victory_state.victory_type)
+
+    def position(self) -> PositionKey:
+        return tuple(
+            sorted(
+                (
+                    square_of(p.position.row, p.position.col),
+                    p.piece_type,
+                    p.player,
+                    p.is_spy,
+                )
+                for p in self.game_engine.game_board.get_pieces()
+            )
+        )
+
+
+class BitboardEngine:
+    def __init__(self, pieces: list[CompactPiece], turn: int):
+        self.game_engine = BitboardGameEngine(
+            pieces=[clone(piece) for piece in pieces], turn=turn
+        )
+        self.game_engine.victory = self.game_engine.find_victory()
+
+    def moves(self) -> list[Move]:
+        return self.game_engine.generate_moves(
+            player=player_for_turn(self.game_engine.turn)
+        )
+
+    def play(self, move: Move) -> tuple[Any, int]:
+        record = self.game_engine.make_move(*move)
+        return record, len(record.captured)
+
+    def undo(self, token: Any) -> None:
+        self.game_engine.unmake_move(record=token)
+
+    def victory(self) -> Victory:
+        return self.game_engine.victory
+
+    def position(self) -> PositionKey:
+        return tuple(
+            (p.square, p.piece_type, p.player, p.is_spy)
+            for p in self.game_engine.game_board.get_pieces()
+        )
+
+
+ENGINES = {"reference": ReferenceEngine, "bitboard": BitboardEngine}
+
+
+def clone(piece: CompactPiece) -> CompactPiece:
+    return CompactPiece(
+        id=piece.id,
+        piece_type=piece.piece_type,
+        player=piece.player,
+        square=piece.square,
+        marking=piece.marking,
+        is_spy=piece.is_spy,
+    )
+
+
+def perft(engine: PerftEngine, depth: int) -> PerftCounts:
+    """Count every line of play up to `depth` plies. Won positions are not expanded."""
+    counts = PerftCounts()
+
+    def walk(remaining: int, ply: int) -> None:
+        for move in engine.moves():
+            token, captured = engine.play(move)
+            won = engine.victory() is not None
+            counts.add(depth=ply, captured=captured, won=won)
+            if remaining > 1 and not won:
+                walk(remaining=remaining - 1, ply=ply + 1)
+            engine.undo(token)
+
+    if engine.victory() is None and depth > 0:
+        walk(remaining=depth, ply=1)
+    return counts
+
+
+def perft_batched(pieces: list[CompactPiece], turn: int, depth: int) -> PerftCounts:
+    """Perft one frontier at a time: every position at a depth is a row of one batch."""
+    # NumPy is optional, so the other engines can run without it
+    import numpy as np
+
+    from app.models.game.batched import BatchedGameEngine
+
+    counts = PerftCounts()
+    frontier = BatchedGameEngine.from_pieces(games=[pieces], turns=[turn])
+    frontier.process_potential_win()
+    for ply in range(1, depth + 1):
+        rows, squares, new_squares = np.nonzero(frontier.legal_move_masks())
+        if len(rows) == 0:
+            break
+        children = BatchedGameEngine(
+            boards=frontier.boards[rows], turns=frontier.turns[rows]
+        )
+        captured = children.step(moves=np.stack((squares, new_squares), axis=1))
+        counts.nodes.append(len(rows))
+        counts.captures.append(int(captured.sum()))
+        counts.wins.append(int((~children.active).sum()))
+        frontier = children
+    return counts
+
+
+@dataclass
+class Disagreement:
+    path: list[Move]
+    position: PositionKey
+    detail: str
+
+
+def diff_trees(
+    reference: PerftEngine, candidate: PerftEngine, depth: int
+) -> Optional[Disagreement]:
+    """Walk both trees in lockstep and return the first position where they differ."""
+    path: list[Move] = []
+    if reference.victory() != candidate.victory():
+        return Disagreement(
+            path=[],
+            position=reference.position(),
+            detail=f"victory {reference.victory()} != {candidate.victory()}",
+        )
+
+    def walk(remaining: int) -> Optional[Disagreement]:
+        reference_moves = sorted(reference.moves())
+        candidate_moves = sorted(candidate.moves())
+        if reference_moves != candidate_moves:
+            return Disagreement(
+                path=list(path),
+                position=reference.position(),
+                detail=(
+                    f"moves only in reference: "
+                    f"{sorted(set(reference_moves) - set(candidate_moves))}, "
+                    f"only in candidate: "
+                    f"{sorted(set(candidate_moves) - set(reference_moves))}"
+                ),
+            )
+        for move in reference_moves:
+            path.append(move)
+            reference_token, reference_captured = reference.play(move)
+            candidate_token, candidate_captured = candidate.play(move)
+            disagreement: Optional[Disagreement] = None
+            if reference_captured != candidate_captured:
+                disagreement = Disagreement(
+                    path=list(path),
+                    position=reference.position(),
+                    detail=f"captures {reference_captured} != {candidate_captured}",
+                )
+            elif reference.position() != candidate.position():
+                disagreement = Disagreement(
+                    path=list(path),
+                    position=reference.position(),
+                    detail=f"positions differ, candidate has {candidate.position()}",
+                )
+            elif reference.victory() != candidate.victory():
+                disagreement = Disagreement(
+                    path=list(path),
+                    position=reference.position(),
+                    detail=f"victory {reference.victory()} != {candidate.victory()}",
+                )
+            elif remaining > 1 and reference.victory() is None:
+                disagreement = walk(remaining=remaining - 1)
+            candidate.undo(candidate_token)
+            reference.undo(reference_token)
+            path.pop()
+            if disagreement is not None:
+                return disagreement
+        return None
+
+    if reference.victory() is not None or depth < 1:
+        return None
+    return walk(remaining=depth)
+
+
+def random_position(
+    rng: random.Random, random_plies: int
+) -> tuple[list[CompactPiece], int]:
+    """A legal setup for both players, after initialization capture and some random plies.
+
+    Setups already won by the initialization capture are drawn again, so every
+    position has moves to count.
+    """
+    while True:
+        pieces = [
+            CompactPiece.from_piece(piece)
+            for piece in generate_random_setup(player=Player.PLAYER_ONE, rng=rng)
+            + generate_random_setup(player=Player.PLAYER_TWO, rng=rng)
+        ]
+        game_engine = BitboardGameEngine(pieces=pieces)
+        game_engine.process_initialization_capture()
+        game_engine.victory = game_engine.find_victory()
+        if game_engine.victory is None:
+            break
+    for _ in range(random_plies):
+        moves = game_engine.generate_moves(player=player_for_turn(game_engine.turn))
+        if not moves:
+            break
+        record = game_engine.make_move(*rng.choice(moves))
+        if game_engine.victory is not None:
+            game_engine.unmake_move(record=record)
+            break
+    return [
+        clone(piece) for piece in game_engine.game_board.get_pieces()
+    ], game_engine.turn
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--setups", type=int, default=3)
+    parser.add_argument("--random-plies", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--engines",
+        default="reference,bitboard,batched",
+        help="Comma-separated subset of reference, bitboard and batched",
+    )
+    args = parser.parse_args()
+    engine_names = args.engines.split(",")
+    rng = random.Random(args.seed)
+    failed = False
+
+    for setup in range(args.setups):
+        pieces, turn = random_position(rng=rng, random_plies=args.random_plies)
+        print(f"setup {setup}: {len(pieces)} pieces, turn {turn}")
+        results: dict[str, PerftCounts] = {}
+        for name in engine_names:
+            start = time.perf_counter()
+            if name == "batched":
+                counts = perft_batched(pieces=pieces, turn=turn, depth=args.depth)
+            else:
+                counts = perft(
+                    engine=ENGINES[name](pieces=pieces, turn=turn), depth=args.depth
+                )
+            elapsed = time.perf_counter() - start
+            results[name] = counts
+            print(
+                f"  {name:>10}: nodes {counts.nodes} captures {counts.captures}"
+                f" wins {counts.wins} ({sum(counts.nodes) / elapsed:,.0f} nodes/s)"
+            )
+        if len({repr(counts) for counts in results.values()}) > 1:
+            print("  MISMATCH in perft counts")
+            failed = True
+
+        if {"reference", "bitboard"} <= set(engine_names):
+            disagreement = diff_trees(
+                reference=ReferenceEngine(pieces=pieces, turn=turn),
+                candidate=BitboardEngine(pieces=pieces, turn=turn),
+                depth=args.depth,
+            )
+            if disagreement is not None:
+                print(
+                    f"  DISAGREEMENT after {disagreement.path}: {disagreement.detail}"
+                )
+                print(f"  position: {disagreement.position}")
+                failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Database round trips per endpoint, over the in-memory store with simulated latency.
+
+Every repository call is counted and delayed by `--latency-ms`, so the response time
+divided by the latency is the number of round trips a request waits on in sequence.
+Calls made in the background after the response, like the bot checking whether it
+should reply, are counted too.
+
+Run from the backend directory:
+
+    python -m benchmarks.round_trips --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Any, Optional
+
+import httpx
+
+os.environ["DATABASE_BACKEND"] = "memory"
+
+from app.api.main import app
+from app.models.game.base import Player
+from app.models.game.bitboard import BitboardGameEngine
+from app.models.game.compact import CompactPiece
+from app.repositories.base import Repository
+from app.repositories.memory import MemoryRepository
+from app.services.cache import GameCache
+from app.services.database import DatabaseService
+from app.utils.game import generate_random_setup, is_player_turn
+
+
+class CountingRepository(MemoryRepository):
+    """Counts and delays the storage calls, but not the helpers built on them."""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+        self.calls = 0
+        for name in Repository.__abstractmethods__:
+            setattr(self, name, self._counted(getattr(self, name)))
+
+    def _counted(self, method: Any) -> Any:
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            self.calls += 1
+            await asyncio.sleep(self.latency)
+            return await method(*args, **kwargs)
+
+        return call
+
+
+def pick_move(pieces: list[dict[str, Any]], turn: int) -> dict[str, Any]:
+    compact_pieces = [CompactPiece.from_dict(p) for p in pieces]
+    game_engine = BitboardGameEngine(pieces=compact_pieces, turn=turn)
+    for piece in compact_pieces:
+        if not is_player_turn(player=piece.player, turn=turn):
+            continue
+        positions = game_engine.get_possible_new_positions(piece=piece)
+        if positions:
+            return {
+                "piece": piece.to_piece().model_dump(mode="json"),
+                "new_position": positions[0].model_dump(),
+            }
+    raise ValueError("No legal move")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Request logs would drown the table
+    logging.disable(logging.INFO)
+    latency = args.latency_ms / 1000
+    repository = CountingRepository(latency=latency)
+    DatabaseService().set_repository(repository)
+    rng = random.Random(args.seed)
+    game_id = "round-trips"
+    results: list[tuple[str, int, float]] = []
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://benchmark"
+    ) as client:
+
+        async def measure(
+            name: str,
+            method: str,
+            path: str,
+            body: Optional[dict[str, Any]] = None,
+            params: Optional[dict[str, Any]] = None,
+            cold: bool = False,
+        ) -> httpx.Response:
+            if cold:
+                GameCache().clear()
+            calls = repository.calls
+            start = time.perf_counter()
+            response = await client.request(
+                method, f"/api/v1{path}", json=body, params=params
+            )
+            elapsed = time.perf_counter() - start
+            # Let background work started by the request finish
+            await asyncio.sleep(latency * 5)
+            response.raise_for_status()
+            if response.json().get("status_code", httpx.codes.OK) != httpx.codes.OK:
+                raise RuntimeError(f"{name} failed: {response.text}")
+            results.append((name, repository.calls - calls, elapsed / latency))
+            return response
+
+        # The first request pays for app startup, which is not a round trip
+        await client.get("/api/v1/status")
+        await measure(
+            "create room",
+            "POST",
+            "/rooms/create",
+            body={"game_id": game_id, "player_one_id": "one", "player_two_id": None},
+        )
+        await measure(
+            "join room",
+            "POST",
+            "/rooms/join",
+            body={"game_id": game_id, "player_id": "two"},
+        )
+        for name, player in (
+            ("initialize, first player", Player.PLAYER_ONE),
+            ("initialize, second player", Player.PLAYER_TWO),
+        ):
+            await measure(
+                name,
+                "POST",
+                "/games/initialize",
+                body={
+                    "game_id": game_id,
+                    "pieces": [
+                        piece.model_dump(mode="json")
+                        for piece in generate_random_setup(player=player, rng=rng)
+                    ],
+                },
+            )
+        await measure(
+            "player number",
+            "GET",
+            "/rooms/player-number",
+            params={"game_id": game_id, "user_id": "one"},
+        )
+        state = (
+            await measure(
+                "pieces, cold cache",
+                "GET",
+                "/games/pieces",
+                params={"game_id": game_id},
+                cold=True,
+            )
+        ).json()
+        await measure(
+            "pieces, cached",
+            "GET",
+            "/games/pieces",
+            params={"game_id": game_id},
+        )
+        move = (
+            await measure(
+                "move",
+                "POST",
+                "/games/pieces/move",
+                body={
+                    "game_id": game_id,
+                    **pick_move(pieces=state["pieces"], turn=state["turn"]),
+                },
+            )
+        ).json()
+        await measure(
+            "move, cold cache",
+            "POST",
+            "/games/pieces/move",
+            body={
+                "game_id": game_id,
+                **pick_move(pieces=move["pieces"], turn=move["turn"]),
+            },
+            cold=True,
+        )
+        await measure(
+            "marking",
+            "POST",
+            "/games/pieces/marking",
+            body={
+                "game_id": game_id,
+                "piece_id": state["pieces"][0]["id"],
+                "marking": "SPY",
+            },
+        )
+        await measure(
+            "create room for bot",
+            "POST",
+            "/rooms/create",
+            body={"game_id": "bot", "player_one_id": "one", "player_two_id": None},
+        )
+        await measure(
+            "bot join",
+            "POST",
+            "/bots/join",
+            body={"game_id": "bot", "level": "easy"},
+        )
+
+    print(f"{'endpoint':>28}  calls  sequential")
+    for name, calls, sequential in results:
+        print(f"{name:>28}  {calls:5d}  {sequential:10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
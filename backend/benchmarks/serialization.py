@@ -0,0 +1,127 @@
+"""Cost of building and writing the pieces and move responses, validated vs constructed.
+
+The validated path is what the endpoints did before: build the response with
+validation and `Piece` models, then let FastAPI validate the returned model against
+the response model and dump it with pydantic. The fast path constructs the response
+from piece dicts and writes it with `ModelResponse`, through orjson.
+
+Run from the backend directory:
+
+    python -m benchmarks.serialization --iterations 5000
+"""
+
+import argparse
+import random
+import timeit
+from typing import Any, Callable
+
+import httpx
+from pydantic import TypeAdapter
+
+from app.models.api.games.get_game_state import GetGameStateResponse
+from app.models.api.games.move_piece import MovePieceResponse
+from app.models.game.base import Player
+from app.models.game.compact import CompactPiece
+from app.models.game.engine import Movement
+from app.utils.game import generate_random_setup
+from app.utils.serialization import ModelResponse
+
+# FastAPI keeps one adapter per response model, so neither path pays to build it
+GAME_STATE_ADAPTER = TypeAdapter(GetGameStateResponse)
+MOVE_ADAPTER = TypeAdapter(MovePieceResponse)
+
+
+def build_pieces(seed: int) -> list[CompactPiece]:
+    rng = random.Random(seed)
+    pieces = generate_random_setup(
+        player=Player.PLAYER_ONE, rng=rng
+    ) + generate_random_setup(player=Player.PLAYER_TWO, rng=rng)
+    return [CompactPiece.from_piece(piece) for piece in pieces]
+
+
+def game_state_fields(pieces: list[CompactPiece]) -> dict[str, Any]:
+    return {
+        "status_code": httpx.codes.OK,
+        "pieces": [p.to_dict() for p in pieces],
+        "captured_pieces": [],
+        "victory_state": None,
+        "movement": None,
+        "turn": 0,
+    }
+
+
+def move_fields(
+    pieces: list[CompactPiece], movement: Movement, as_dicts: bool
+) -> dict[str, Any]:
+    convert = CompactPiece.to_dict if as_dicts else CompactPiece.to_piece
+    return {
+        "status_code": httpx.codes.OK,
+        "captured_pieces": [convert(pieces[-1])],
+        "victory_state": None,
+        "pieces": [convert(p) for p in pieces[:-1]],
+        "movement": movement,
+        "turn": 1,
+    }
+
+
+def validated_game_state(pieces: list[CompactPiece]) -> bytes:
+    response = GetGameStateResponse(**game_state_fields(pieces=pieces))
+    return GAME_STATE_ADAPTER.dump_json(GAME_STATE_ADAPTER.validate_python(response))
+
+
+def constructed_game_state(pieces: list[CompactPiece]) -> bytes:
+    response = GetGameStateResponse.model_construct(**game_state_fields(pieces=pieces))
+    return ModelResponse(content=response).body
+
+
+def validated_move(pieces: list[CompactPiece], movement: Movement) -> bytes:
+    response = MovePieceResponse.model_validate(
+        move_fields(pieces=pieces, movement=movement, as_dicts=False)
+    )
+    return MOVE_ADAPTER.dump_json(MOVE_ADAPTER.validate_python(response))
+
+
+def constructed_move(pieces: list[CompactPiece], movement: Movement) -> bytes:
+    response = MovePieceResponse.model_construct(
+        **move_fields(pieces=pieces, movement=movement, as_dicts=True)
+    )
+    return ModelResponse(content=response).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    pieces = build_pieces(seed=args.seed)
+    movement = Movement(
+        previous_position=pieces[0].position, new_position=pieces[0].position
+    )
+    cases: list[tuple[str, Callable[[], bytes], Callable[[], bytes]]] = [
+        (
+            "GET /games/pieces",
+            lambda: validated_game_state(pieces=pieces),
+            lambda: constructed_game_state(pieces=pieces),
+        ),
+        (
+            "POST /games/pieces/move",
+            lambda: validated_move(pieces=pieces, movement=movement),
+            lambda: constructed_move(pieces=pieces, movement=movement),
+        ),
+    ]
+    for name, validated, constructed in cases:
+        if validated() != constructed():
+            raise AssertionError(f"{name}: the paths wrote different JSON")
+        print(f"{name} ({len(constructed())} bytes)")
+        timings: dict[str, float] = {}
+        for path, function in (("validated", validated), ("fast path", constructed)):
+            seconds = timeit.timeit(function, number=args.iterations)
+            timings[path] = seconds / args.iterations * 1e6
+            print(f"{path:>10}: {timings[path]:8.1f} us/response")
+        reduction = 1 - timings["fast path"] / timings["validated"]
+        print(f"{'reduction':>10}: {reduction:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
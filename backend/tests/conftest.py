@@ -0,0 +1,49 @@
+import os
+import random
+import uuid
+from typing import Iterator
+
+import pytest
+
+# Read when the app first opens its repository, so it must be set before any test
+# starts the app
+os.environ["DATABASE_BACKEND"] = "memory"
+
+from fastapi.testclient import TestClient
+
+from app.api.main import app
+from app.models.game.base import Player
+from app.utils.game import generate_random_setup
+
+
+@pytest.fixture
+def client() -> Iterator[TestClient]:
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def game_id(client: TestClient) -> str:
+    """A new game with both setups submitted, ready for its first move."""
+    game_id = f"test-{uuid.uuid4()}"
+    rng = random.Random(0)
+    client.post(
+        "/api/v1/rooms/create",
+        json={
+            "game_id": game_id,
+            "player_one_id": f"{game_id}-one",
+            "player_two_id": f"{game_id}-two",
+        },
+    ).raise_for_status()
+    for player in (Player.PLAYER_ONE, Player.PLAYER_TWO):
+        client.post(
+            "/api/v1/games/initialize",
+            json={
+                "game_id": game_id,
+                "pieces": [
+                    piece.model_dump(mode="json")
+                    for piece in generate_random_setup(player=player, rng=rng)
+                ],
+            },
+        ).raise_for_status()
+    return game_id
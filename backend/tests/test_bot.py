@@ -0,0 +1,136 @@
+import random
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.models.game.base import Player
+from app.models.game.bitboard import BitboardGameEngine
+from app.models.game.compact import CompactPiece
+from app.models.game.ismcts import (BotLevel, SearchConfig, _grow_tree,
+                                    best_move, search)
+from app.services.database import DatabaseService
+from app.utils.game import generate_random_setup
+from tests.utils import random_move
+
+CONFIG = SearchConfig(time_budget=0.1, workers=1, exploration=1.0, rollout_depth=10)
+
+
+def random_position(seed: int) -> list[CompactPiece]:
+    rng = random.Random(seed)
+    return [
+        CompactPiece.from_piece(piece)
+        for player in (Player.PLAYER_ONE, Player.PLAYER_TWO)
+        for piece in generate_random_setup(player=player, rng=rng)
+    ]
+
+
+def test_search_returns_a_legal_move():
+    for seed in range(3):
+        pieces = random_position(seed=seed)
+        visit_counts = search(
+            pieces=pieces,
+            turn=1,
+            bot_player=Player.PLAYER_TWO,
+            config=CONFIG,
+            seed=seed,
+        )
+        legal = BitboardGameEngine(pieces=pieces, turn=1).generate_moves(
+            player=Player.PLAYER_TWO
+        )
+        assert set(visit_counts) <= set(legal)
+        assert best_move(visit_counts=[visit_counts]) in legal
+
+
+def test_best_move_merges_parallel_searches():
+    assert best_move(visit_counts=[{(0, 6): 3, (1, 7): 2}, {(1, 7): 2}]) == (1, 7)
+    assert best_move(visit_counts=[{}, {}]) is None
+
+
+def test_root_moves_are_available_on_every_visit_since_they_were_added():
+    # The bot's own moves do not depend on which Dancer is sampled as the spy, so
+    # every root move is legal on every visit
+    root = _grow_tree(
+        pieces=random_position(seed=0),
+        turn=1,
+        bot_player=Player.PLAYER_TWO,
+        config=CONFIG,
+        rng=random.Random(0),
+    )
+    visits = root.visits
+    added = len(root.children)
+    assert visits > added
+    assert sorted(child.available for child in root.children.values()) == list(
+        range(visits - added + 1, visits + 1)
+    )
+
+
+def create_room(client: TestClient, player_two_id: str | None = None) -> str:
+    game_id = f"test-{uuid.uuid4()}"
+    client.post(
+        "/api/v1/rooms/create",
+        json={
+            "game_id": game_id,
+            "player_one_id": f"{game_id}-one",
+            "player_two_id": player_two_id,
+        },
+    ).raise_for_status()
+    return game_id
+
+
+def test_bot_cannot_join_a_full_room(client: TestClient):
+    game_id = create_room(client=client, player_two_id="human")
+    response = client.post(
+        "/api/v1/bots/join", json={"game_id": game_id, "level": BotLevel.EASY}
+    )
+    assert response.status_code == 409
+
+
+def test_bot_replies_to_a_move(client: TestClient):
+    game_id = create_room(client=client)
+    client.post(
+        "/api/v1/bots/join", json={"game_id": game_id, "level": BotLevel.EASY}
+    ).raise_for_status()
+    client.post(
+        "/api/v1/games/initialize",
+        json={
+            "game_id": game_id,
+            "pieces": [
+                piece.model_dump(mode="json")
+                for piece in generate_random_setup(
+                    player=Player.PLAYER_ONE, rng=random.Random(0)
+                )
+            ],
+        },
+    ).raise_for_status()
+
+    state = client.get("/api/v1/games/pieces", params={"game_id": game_id}).json()
+    move = random_move(game_id=game_id, state=state, rng=random.Random(0))
+    assert client.post("/api/v1/games/pieces/move", json=move).json()["turn"] == 1
+
+    deadline = time.monotonic() + 30
+    while state["turn"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.1)
+        state = client.get("/api/v1/games/pieces", params={"game_id": game_id}).json()
+    assert state["turn"] == 2
+
+
+def test_human_cannot_take_the_bots_seat(client: TestClient):
+    game_id = create_room(client=client)
+    client.post(
+        "/api/v1/bots/join", json={"game_id": game_id, "level": BotLevel.EASY}
+    ).raise_for_status()
+
+    response = client.post(
+        "/api/v1/rooms/join", json={"game_id": game_id, "player_id": "human"}
+    ).json()
+    assert response["status_code"] == 409
+    repository = client.portal.call(DatabaseService().get_repository)
+    room = client.portal.call(repository.get_room, game_id)
+    assert room["player_two_id"] == f"bot:{BotLevel.EASY}"
+
+    # A player already in the room can join again
+    response = client.post(
+        "/api/v1/rooms/join", json={"game_id": game_id, "player_id": f"{game_id}-one"}
+    ).json()
+    assert response["status_code"] == 200
@@ -0,0 +1,127 @@
+import random
+import uuid
+
+import pytest
+
+from app.models.game.base import POSITIONS, Marking, Player
+from app.models.game.codec import (MAX_TURN, PieceIds, decode_game_state,
+                                   decode_pieces_text, encode_game_state,
+                                   encode_pieces_text)
+from app.models.game.compact import CompactPiece
+from app.models.game.engine import Movement, VictoryType
+from app.utils.game import generate_random_setup
+
+
+def game_state(turn: int) -> bytes:
+    rng = random.Random(0)
+    pieces = [
+        CompactPiece.from_piece(piece)
+        for piece in generate_random_setup(player=Player.PLAYER_ONE, rng=rng)
+    ]
+    return encode_game_state(
+        turn=turn,
+        victory=(Player.PLAYER_TWO, VictoryType.ALLY_SPY_INFILTRATED),
+        movement=None,
+        pieces=pieces,
+        captured_pieces=[],
+        piece_ids=PieceIds(ids=[piece.id for piece in pieces]),
+    )
+
+
+def full_board() -> tuple[list[CompactPiece], list[CompactPiece]]:
+    """Both players' pieces with some marked, split into board and captured."""
+    rng = random.Random(0)
+    pieces = [
+        CompactPiece.from_piece(piece)
+        for player in (Player.PLAYER_ONE, Player.PLAYER_TWO)
+        for piece in generate_random_setup(player=player, rng=rng)
+    ]
+    for piece, marking in zip(pieces[::5], [Marking.SPY, Marking.DANCER] * 10):
+        piece.marking = marking
+    return pieces[3:], pieces[:3]
+
+
+def as_dicts(pieces: list[CompactPiece]) -> list[dict]:
+    return [piece.to_dict() for piece in pieces]
+
+
+@pytest.mark.parametrize("include_piece_ids", [True, False])
+def test_full_game_state_round_trips(include_piece_ids: bool):
+    pieces, captured_pieces = full_board()
+    piece_ids = PieceIds(ids=[piece.id for piece in captured_pieces + pieces])
+    movement = Movement(previous_position=POSITIONS[8], new_position=POSITIONS[14])
+    decoded = decode_game_state(
+        data=encode_game_state(
+            turn=17,
+            victory=(Player.PLAYER_ONE, VictoryType.ALLY_SPY_INFILTRATED),
+            movement=movement,
+            pieces=pieces,
+            captured_pieces=captured_pieces,
+            piece_ids=piece_ids,
+            include_piece_ids=include_piece_ids,
+        ),
+        piece_ids=None if include_piece_ids else piece_ids,
+    )
+    assert decoded.turn == 17
+    assert decoded.victory == (Player.PLAYER_ONE, VictoryType.ALLY_SPY_INFILTRATED)
+    assert decoded.movement == movement
+    assert decoded.piece_ids.ids == piece_ids.ids
+    assert as_dicts(decoded.pieces) == as_dicts(pieces)
+    assert as_dicts(decoded.captured_pieces) == as_dicts(captured_pieces)
+
+
+def test_pieces_text_round_trips():
+    pieces, captured_pieces = full_board()
+    piece_ids = PieceIds(ids=[piece.id for piece in pieces + captured_pieces])
+    for board in (pieces, captured_pieces, []):
+        text = encode_pieces_text(pieces=board, piece_ids=piece_ids)
+        assert as_dicts(decode_pieces_text(text=text, piece_ids=piece_ids)) == (
+            as_dicts(board)
+        )
+
+
+def test_last_turn_that_fits_round_trips():
+    decoded = decode_game_state(data=game_state(turn=MAX_TURN))
+    assert decoded.turn == MAX_TURN
+    assert decoded.victory == (Player.PLAYER_TWO, VictoryType.ALLY_SPY_INFILTRATED)
+
+
+@pytest.mark.parametrize("turn", [MAX_TURN + 1, -1])
+def test_turn_out_of_range_is_rejected(turn: int):
+    with pytest.raises(ValueError):
+        game_state(turn=turn)
+
+
+def test_unknown_victory_type_is_a_decode_error():
+    data = bytearray(game_state(turn=3))
+    # The victory byte follows the 4-byte header; keep the winner bit
+    data[4] = data[4] & 0x80 | 0x7F
+    with pytest.raises(ValueError, match="victory type"):
+        decode_game_state(data=bytes(data))
+
+
+def test_truncated_header_is_a_decode_error():
+    with pytest.raises(ValueError):
+        decode_game_state(data=game_state(turn=3)[:4])
+
+
+@pytest.mark.parametrize(
+    "piece_id",
+    [
+        "A0B1C2D3-0000-4000-8000-000000000000",
+        "a0b1c2d3000040008000000000000000",
+        "{a0b1c2d3-0000-4000-8000-000000000000}",
+        "urn:uuid:a0b1c2d3-0000-4000-8000-000000000000",
+    ],
+)
+def test_non_canonical_uuid_ids_keep_their_form(piece_id: str):
+    ids = [piece_id, "a0b1c2d3-0000-4000-8000-000000000001"]
+    decoded, _ = PieceIds.decode(data=PieceIds(ids=ids).encode())
+    assert decoded.ids == tuple(ids)
+
+
+def test_canonical_uuid_ids_take_sixteen_bytes():
+    ids = [str(uuid.UUID(int=index)) for index in range(3)]
+    encoded = PieceIds(ids=ids).encode()
+    assert len(encoded) == 2 + 16 * len(ids)
+    assert PieceIds.decode(data=encoded)[0].ids == tuple(ids)
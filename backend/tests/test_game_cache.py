@@ -0,0 +1,100 @@
+import random
+
+from fastapi.testclient import TestClient
+
+from app.models.game.base import Player
+from app.models.game.codec import PieceIds
+from app.models.game.history import GameHistory
+from app.services.cache import CachedGame, GameCache
+from app.services.database import DatabaseService
+from tests.utils import random_move
+
+
+def cached_game(seq: int) -> CachedGame:
+    return CachedGame(
+        pieces=[],
+        captured_pieces=[],
+        winner=None,
+        victory_type=None,
+        movement=None,
+        turn=seq,
+        seq=seq,
+        version=seq,
+        piece_ids=PieceIds(ids=[]),
+        history=GameHistory.start(pieces=[], seq=seq, turn=seq),
+    )
+
+
+def test_load_that_raced_an_invalidation_is_not_cached():
+    game_cache = GameCache()
+    game_cache.clear()
+    generation = game_cache.generation
+    # A setup lands and invalidates the game while the load reads the database
+    game_cache.invalidate(game_id="raced")
+    assert not game_cache.put_loaded(
+        game_id="raced", game=cached_game(seq=0), generation=generation
+    )
+    assert game_cache.get(game_id="raced") is None
+
+    # A load that starts after the invalidation is cached
+    assert game_cache.put_loaded(
+        game_id="raced", game=cached_game(seq=0), generation=game_cache.generation
+    )
+    assert game_cache.get(game_id="raced") is not None
+
+
+def test_load_does_not_replace_a_newer_write():
+    game_cache = GameCache()
+    game_cache.clear()
+    generation = game_cache.generation
+    game_cache.put(game_id="written", game=cached_game(seq=2))
+    assert not game_cache.put_loaded(
+        game_id="written", game=cached_game(seq=1), generation=generation
+    )
+    assert game_cache.get(game_id="written").seq == 2
+
+
+def test_untracked_invalidations_are_assumed_recent():
+    game_cache = GameCache()
+    game_cache.clear()
+    generation = game_cache.generation
+    for index in range(game_cache.max_games + 1):
+        game_cache.invalidate(game_id=f"game-{index}")
+    # The first game's invalidation is no longer tracked, so it might be newer
+    assert not game_cache.put_loaded(
+        game_id="game-0", game=cached_game(seq=0), generation=generation
+    )
+
+
+def test_game_stored_before_the_event_log_loads_at_its_turn(
+    client: TestClient, game_id: str
+):
+    board = client.get("/api/v1/games/pieces", params={"game_id": game_id}).json()
+    # Rows written before the log hold the current board and turn, without events
+    legacy_id = f"{game_id}-legacy"
+    repository = client.portal.call(DatabaseService().get_repository)
+    client.portal.call(
+        lambda: repository.insert_game(
+            game_id=legacy_id,
+            values={
+                "pieces": board["pieces"],
+                "captured_pieces": board["captured_pieces"],
+                "turn": 5,
+            },
+        )
+    )
+    state = client.get("/api/v1/games/pieces", params={"game_id": legacy_id}).json()
+    assert state["turn"] == 5
+
+    move = random_move(game_id=legacy_id, state=state, rng=random.Random(0))
+    assert move["piece"]["player"] == Player.PLAYER_TWO.value
+    moved = client.post("/api/v1/games/pieces/move", json=move).json()
+    assert moved["turn"] == 6
+
+    # Reloaded from the row and the one event logged since
+    GameCache().invalidate(game_id=legacy_id)
+    reloaded = client.get("/api/v1/games/pieces", params={"game_id": legacy_id})
+    assert reloaded.json()["turn"] == 6
+    assert {piece["id"]: piece for piece in reloaded.json()["pieces"]} == {
+        piece["id"]: piece for piece in moved["pieces"]
+    }
@@ -0,0 +1,139 @@
+import asyncio
+import random
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models.game.base import Player
+from app.repositories.memory import MemoryRepository
+from app.services.cache import GameCache
+from app.services.database import DatabaseService
+from app.services.games import GamesService
+from app.utils.game import generate_random_setup
+from tests.utils import random_move
+
+
+def test_stale_version_and_taken_seq_are_rejected():
+    repository = MemoryRepository()
+    event = {"seq": 1, "turn": 1, "event_type": "move", "square": 0, "new_square": 6}
+
+    async def commit(expected_version: int) -> bool:
+        return await repository.commit_move(
+            game_id="game",
+            event=event,
+            values={"turn": 1},
+            expected_version=expected_version,
+        )
+
+    async def scenario() -> None:
+        await repository.insert_game(game_id="game", values={"version": 2})
+        # Read before the setup that bumped the version to 2
+        assert not await commit(expected_version=1)
+        assert await repository.get_events(game_id="game") == []
+
+        assert await commit(expected_version=2)
+        assert await repository.get_game_version(game_id="game") == 3
+        # Same seq again, as from a request that read the state after the version
+        # was bumped but before the event landed
+        assert not await commit(expected_version=3)
+        assert len(await repository.get_events(game_id="game")) == 1
+
+    asyncio.run(scenario())
+
+
+def test_move_from_state_cached_before_another_workers_setup(client: TestClient):
+    game_id = f"test-{uuid.uuid4()}"
+    rng = random.Random(0)
+    client.post(
+        "/api/v1/rooms/create",
+        json={
+            "game_id": game_id,
+            "player_one_id": f"{game_id}-one",
+            "player_two_id": f"{game_id}-two",
+        },
+    ).raise_for_status()
+    client.post(
+        "/api/v1/games/initialize",
+        json={
+            "game_id": game_id,
+            "pieces": [
+                piece.model_dump(mode="json")
+                for piece in generate_random_setup(player=Player.PLAYER_ONE, rng=rng)
+            ],
+        },
+    ).raise_for_status()
+    # This worker caches the board with only player one's pieces
+    stale = client.get("/api/v1/games/pieces", params={"game_id": game_id}).json()
+
+    # Another worker stores player two's setup, which this worker's cache misses
+    repository = client.portal.call(DatabaseService().get_repository)
+    assert client.portal.call(
+        lambda: GamesService()._store_setup(
+            repository=repository,
+            game_id=game_id,
+            pieces=generate_random_setup(player=Player.PLAYER_TWO, rng=rng),
+        )
+    )
+
+    move = random_move(game_id=game_id, state=stale, rng=rng)
+    response = client.post("/api/v1/games/pieces/move", json=move).json()
+    assert response["status_code"] == 409
+    assert client.portal.call(repository.get_events, game_id) == []
+
+    # Reads see the other worker's write, and moves from it commit
+    current = client.get("/api/v1/games/pieces", params={"game_id": game_id}).json()
+    assert {piece["player"] for piece in current["pieces"]} == {
+        player.value for player in Player
+    }
+    move = random_move(game_id=game_id, state=current, rng=rng)
+    assert client.post("/api/v1/games/pieces/move", json=move).json()["turn"] == 1
+
+
+def test_move_rejected_on_a_stale_turn_succeeds_on_retry(
+    client: TestClient, game_id: str
+):
+    rng = random.Random(1)
+    state = client.get("/api/v1/games/pieces", params={"game_id": game_id}).json()
+    stale = GameCache().get(game_id=game_id)
+
+    # Player one moves on another worker, whose write this worker's cache misses
+    move = random_move(game_id=game_id, state=state, rng=rng)
+    moved = client.post("/api/v1/games/pieces/move", json=move).json()
+    assert moved["turn"] == 1
+    GameCache().put(game_id=game_id, game=stale)
+
+    # The cached turn says it is still player one's, so the move is retryable
+    move = random_move(game_id=game_id, state=moved, rng=rng)
+    response = client.post("/api/v1/games/pieces/move", json=move).json()
+    assert response["status_code"] == 409
+    assert GameCache().get(game_id=game_id) is None
+
+    response = client.post("/api/v1/games/pieces/move", json=move).json()
+    assert response["status_code"] == 200
+    assert response["turn"] == 2
+
+
+class FailingAppendRepository(MemoryRepository):
+    async def append_event(self, game_id: str, event: dict) -> bool:
+        raise ConnectionError("lost the connection")
+
+
+def test_row_is_reverted_when_the_event_is_not_logged():
+    repository = FailingAppendRepository()
+    event = {"seq": 1, "turn": 1, "event_type": "move", "square": 0, "new_square": 6}
+
+    async def scenario() -> None:
+        await repository.insert_game(game_id="game", values={"version": 2})
+        with pytest.raises(ConnectionError):
+            await repository.commit_move(
+                game_id="game",
+                event=event,
+                values={"turn": 1, "winner": None},
+                expected_version=2,
+                previous_values={"turn": 0, "winner": None},
+            )
+        row = await repository.get_game(game_id="game")
+        assert (row["version"], row["turn"]) == (2, 0)
+
+    asyncio.run(scenario())
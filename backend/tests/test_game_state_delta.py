@@ -0,0 +1,87 @@
+import random
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.models.game.base import Player
+from app.utils.game import generate_random_setup
+from tests.utils import random_move
+
+
+def test_matching_etag_is_not_modified(client: TestClient, game_id: str):
+    response = client.get("/api/v1/games/pieces", params={"game_id": game_id})
+    etag = response.headers["ETag"]
+
+    response = client.get(
+        "/api/v1/games/pieces",
+        params={"game_id": game_id},
+        headers={"If-None-Match": etag},
+    )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+
+def test_etag_changes_with_a_setup(client: TestClient):
+    game_id = f"test-{uuid.uuid4()}"
+    rng = random.Random(0)
+    client.post(
+        "/api/v1/rooms/create",
+        json={
+            "game_id": game_id,
+            "player_one_id": f"{game_id}-one",
+            "player_two_id": f"{game_id}-two",
+        },
+    ).raise_for_status()
+
+    def initialize(player: Player) -> None:
+        client.post(
+            "/api/v1/games/initialize",
+            json={
+                "game_id": game_id,
+                "pieces": [
+                    piece.model_dump(mode="json")
+                    for piece in generate_random_setup(player=player, rng=rng)
+                ],
+            },
+        ).raise_for_status()
+
+    initialize(player=Player.PLAYER_ONE)
+    before = client.get("/api/v1/games/pieces", params={"game_id": game_id})
+    # Setups move neither the turn nor the event log
+    initialize(player=Player.PLAYER_TWO)
+
+    response = client.get(
+        "/api/v1/games/pieces",
+        params={"game_id": game_id},
+        headers={"If-None-Match": before.headers["ETag"]},
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != before.headers["ETag"]
+    assert len(response.json()["pieces"]) > len(before.json()["pieces"])
+
+
+def test_board_since_a_turn_is_a_delta(client: TestClient, game_id: str):
+    before = client.get("/api/v1/games/pieces", params={"game_id": game_id})
+    state = before.json()
+    move = random_move(game_id=game_id, state=state, rng=random.Random(0))
+    assert client.post("/api/v1/games/pieces/move", json=move).json()["turn"] == 1
+
+    response = client.get(
+        "/api/v1/games/pieces",
+        params={"game_id": game_id, "since_turn": state["turn"]},
+        headers={"If-None-Match": before.headers["ETag"]},
+    )
+    delta = response.json()
+    assert response.status_code == 200
+    assert delta["since_turn"] == state["turn"]
+    assert move["piece"]["id"] in [piece["id"] for piece in delta["pieces"]]
+    assert len(delta["pieces"]) < len(state["pieces"])
+
+    # Applying the delta to the old board gives the current board
+    board = {piece["id"]: piece for piece in state["pieces"]}
+    for piece_id in delta["removed_piece_ids"]:
+        del board[piece_id]
+    board.update({piece["id"]: piece for piece in delta["pieces"]})
+    current = client.get("/api/v1/games/pieces", params={"game_id": game_id}).json()
+    assert board == {piece["id"]: piece for piece in current["pieces"]}
@@ -0,0 +1,135 @@
+import asyncio
+from typing import Optional
+
+from fastapi import WebSocketDisconnect
+from starlette.websockets import WebSocketState
+
+from app.models.api.games.game_update import GameUpdate, GameUpdateType
+from app.services.hub import GOING_AWAY, TRY_AGAIN_LATER, GameHub
+
+QUEUE_SIZE = 4
+
+
+class FakeWebSocket:
+    """Records what is sent. `stuck` stops it reading after the first message."""
+
+    def __init__(self, stuck: bool = False) -> None:
+        self.application_state = WebSocketState.CONNECTED
+        self.stuck = stuck
+        self.sent: list[str] = []
+        self.close_code: Optional[int] = None
+        self.disconnected = asyncio.Event()
+
+    async def send_text(self, message: str) -> None:
+        if self.stuck and self.sent:
+            await asyncio.Event().wait()
+        self.sent.append(message)
+
+    async def receive_text(self) -> str:
+        await self.disconnected.wait()
+        raise WebSocketDisconnect()
+
+    async def close(self, code: int) -> None:
+        self.close_code = code
+        self.application_state = WebSocketState.DISCONNECTED
+
+
+def update(game_id: str, seq: int) -> GameUpdate:
+    return GameUpdate.model_construct(
+        type=GameUpdateType.STATE if seq == 0 else GameUpdateType.MOVE,
+        game_id=game_id,
+        seq=seq,
+        turn=seq,
+        etag=f'"{seq}"',
+        pieces=[],
+        captured_pieces=[],
+        victory_state=None,
+        movement=None,
+        since_turn=seq - 1 if seq else None,
+        removed_piece_ids=[],
+    )
+
+
+async def subscribe(
+    hub: GameHub, game_id: str, websocket: FakeWebSocket
+) -> asyncio.Task:
+    serving = asyncio.create_task(
+        hub.serve(
+            game_id=game_id, websocket=websocket, first=update(game_id=game_id, seq=0)
+        )
+    )
+    while not websocket.sent:
+        await asyncio.sleep(0)
+    return serving
+
+
+def test_update_is_sent_once_serialized_to_every_subscriber():
+    hub = GameHub()
+    websockets = [FakeWebSocket() for _ in range(3)]
+    other = FakeWebSocket()
+
+    async def scenario() -> None:
+        serving = [
+            await subscribe(hub=hub, game_id="fan-out", websocket=websocket)
+            for websocket in websockets
+        ]
+        serving.append(await subscribe(hub=hub, game_id="other", websocket=other))
+        hub.publish(game_id="fan-out", update=update(game_id="fan-out", seq=1))
+        while any(len(websocket.sent) < 2 for websocket in websockets):
+            await asyncio.sleep(0)
+        for websocket in websockets + [other]:
+            websocket.disconnected.set()
+        await asyncio.wait_for(asyncio.gather(*serving), timeout=5)
+
+    asyncio.run(scenario())
+    messages = [websocket.sent[1] for websocket in websockets]
+    assert all(message is messages[0] for message in messages)
+    assert '"seq":1' in messages[0]
+    assert len(other.sent) == 1
+
+
+def test_disconnected_subscriber_is_removed():
+    hub = GameHub()
+    websocket = FakeWebSocket()
+
+    async def scenario() -> None:
+        serving = await subscribe(hub=hub, game_id="leaving", websocket=websocket)
+        assert hub.is_watched(game_id="leaving")
+        websocket.disconnected.set()
+        await asyncio.wait_for(serving, timeout=5)
+        # Nothing is queued for a subscriber that left
+        hub.publish(game_id="leaving", update=update(game_id="leaving", seq=1))
+
+    asyncio.run(scenario())
+    assert not hub.is_watched(game_id="leaving")
+    assert websocket.close_code == GOING_AWAY
+    assert len(websocket.sent) == 1
+
+
+def test_slow_subscriber_is_dropped():
+    hub = GameHub()
+    slow, fast = FakeWebSocket(stuck=True), FakeWebSocket()
+    default_queue_size = hub.queue_size
+    dropped = hub.dropped
+
+    async def scenario() -> None:
+        serving_slow = await subscribe(hub=hub, game_id="slow", websocket=slow)
+        serving_fast = await subscribe(hub=hub, game_id="slow", websocket=fast)
+        # The slow client blocks on its second message and the rest queue up
+        for seq in range(1, hub.queue_size + 3):
+            hub.publish(game_id="slow", update=update(game_id="slow", seq=seq))
+            await asyncio.sleep(0)
+        await asyncio.wait_for(serving_slow, timeout=5)
+        assert hub.is_watched(game_id="slow")
+        fast.disconnected.set()
+        await asyncio.wait_for(serving_fast, timeout=5)
+
+    hub.queue_size = QUEUE_SIZE
+    try:
+        asyncio.run(scenario())
+    finally:
+        hub.queue_size = default_queue_size
+    assert slow.close_code == TRY_AGAIN_LATER
+    assert hub.dropped == dropped + 1
+    # The other subscriber kept up and got every update
+    assert len(fast.sent) == 1 + QUEUE_SIZE + 2
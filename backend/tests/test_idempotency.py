@@ -0,0 +1,90 @@
+import asyncio
+import random
+from typing import Awaitable
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.services.database import DatabaseService
+from app.services.idempotency import IdempotencyStore
+from app.utils.errors import IdempotencyKeyReusedError
+from tests.utils import random_move
+
+
+def test_retried_move_is_replayed_not_played_again(client: TestClient, game_id: str):
+    state = client.get("/api/v1/games/pieces", params={"game_id": game_id}).json()
+    move = random_move(game_id=game_id, state=state, rng=random.Random(0))
+    headers = {"Idempotency-Key": "move-1"}
+
+    first = client.post("/api/v1/games/pieces/move", json=move, headers=headers)
+    retry = client.post("/api/v1/games/pieces/move", json=move, headers=headers)
+    assert first.json()["turn"] == 1
+    assert retry.content == first.content
+
+    repository = client.portal.call(DatabaseService().get_repository)
+    assert len(client.portal.call(repository.get_events, game_id)) == 1
+    current = client.get("/api/v1/games/pieces", params={"game_id": game_id}).json()
+    assert current["turn"] == 1
+
+
+def test_key_reused_for_another_move_is_rejected(client: TestClient, game_id: str):
+    state = client.get("/api/v1/games/pieces", params={"game_id": game_id}).json()
+    rng = random.Random(0)
+    headers = {"Idempotency-Key": "move-1"}
+    client.post(
+        "/api/v1/games/pieces/move",
+        json=random_move(game_id=game_id, state=state, rng=rng),
+        headers=headers,
+    )
+
+    state = client.get("/api/v1/games/pieces", params={"game_id": game_id}).json()
+    response = client.post(
+        "/api/v1/games/pieces/move",
+        json=random_move(game_id=game_id, state=state, rng=rng),
+        headers=headers,
+    )
+    assert response.json()["status_code"] == 422
+    current = client.get("/api/v1/games/pieces", params={"game_id": game_id}).json()
+    assert current["turn"] == state["turn"] == 1
+
+
+class Request(BaseModel):
+    value: int
+
+
+def test_key_sent_while_its_first_request_runs():
+    store = IdempotencyStore()
+    calls = []
+
+    async def scenario() -> None:
+        release = asyncio.Event()
+
+        async def write() -> int:
+            calls.append(None)
+            await release.wait()
+            return len(calls)
+
+        def run(value: int) -> Awaitable[tuple[int, bool]]:
+            return store.run(
+                operation="write",
+                game_id="in-flight",
+                key="key-1",
+                request=Request(value=value),
+                function=write,
+            )
+
+        first = asyncio.ensure_future(run(value=1))
+        await asyncio.sleep(0)
+        with pytest.raises(IdempotencyKeyReusedError):
+            # Would otherwise wait for the first request
+            await asyncio.wait_for(run(value=2), timeout=1)
+        joined = asyncio.ensure_future(run(value=1))
+        await asyncio.sleep(0)
+        release.set()
+        assert await first == (1, False)
+        assert await joined == (1, True)
+        assert await run(value=1) == (1, True)
+
+    asyncio.run(scenario())
+    assert len(calls) == 1
@@ -0,0 +1,43 @@
+import logging
+import logging.config
+
+import pytest
+from uvicorn.config import LOGGING_CONFIG
+
+from app.utils.logs import LogPipeline
+
+
+@pytest.fixture
+def queued(monkeypatch: pytest.MonkeyPatch) -> list[logging.LogRecord]:
+    """Records that reach the queue handler, captured instead of queued."""
+    records: list[logging.LogRecord] = []
+    monkeypatch.setattr(LogPipeline().handler, "emit", records.append)
+    return records
+
+
+def test_uvicorn_records_go_through_the_queue(queued: list[logging.LogRecord]):
+    # As Uvicorn configures logging when it starts, before it imports the app
+    logging.config.dictConfig(LOGGING_CONFIG)
+    LogPipeline().start()
+
+    logging.getLogger("uvicorn.error").info("Started server process")
+    logging.getLogger("uvicorn.error").error("Exception in ASGI application")
+    assert [record.getMessage() for record in queued] == [
+        "Started server process",
+        "Exception in ASGI application",
+    ]
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        assert logging.getLogger(name).handlers == []
+
+
+def test_uvicorn_access_log_is_left_to_app_access(queued: list[logging.LogRecord]):
+    logging.config.dictConfig(LOGGING_CONFIG)
+    LogPipeline().start()
+
+    uvicorn_access = logging.getLogger("uvicorn.access")
+    uvicorn_access.info('127.0.0.1 - "GET / HTTP/1.1" 200')
+    logging.getLogger("app.access").info("GET / 200")
+    assert [record.name for record in queued] == ["app.access"]
+    # Nothing writes it on the request's thread either
+    assert uvicorn_access.handlers == []
+    assert not uvicorn_access.isEnabledFor(logging.INFO)
@@ -0,0 +1,79 @@
+from fastapi.testclient import TestClient
+
+from app.utils.metrics import UNMATCHED_ROUTE, HistogramFamily, Metrics
+
+
+def test_histogram_buckets_are_cumulative():
+    family = HistogramFamily(
+        name="test_seconds",
+        documentation="Test durations.",
+        label_names=("operation",),
+        buckets=(0.1, 1.0),
+    )
+    for seconds in (0.05, 0.1, 0.5, 2.0, 3.0):
+        family.observe(seconds, "read")
+
+    assert list(family.render()) == [
+        "# HELP test_seconds Test durations.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{operation="read",le="0.1"} 2',
+        'test_seconds_bucket{operation="read",le="1.0"} 3',
+        'test_seconds_bucket{operation="read",le="+Inf"} 5',
+        'test_seconds_sum{operation="read"} 5.65',
+        'test_seconds_count{operation="read"} 5',
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = Metrics().counter("test_escaped", "Label values with quotes.", ("name",))
+    counter.inc('say "hi"\\\nbye')
+
+    assert 'test_escaped_total{name="say \\"hi\\"\\\\\\nbye"} 1' in (
+        Metrics().render().splitlines()
+    )
+
+
+def test_stats_are_rendered_as_gauges():
+    lines = (
+        Metrics()
+        .render(
+            stats={
+                "test": {
+                    "hits": 3,
+                    "enabled": True,
+                    "backend": "memory",
+                    "calls": {"load_game": 2, "get_room": 1},
+                }
+            }
+        )
+        .splitlines()
+    )
+
+    assert "# TYPE sashay_test_hits gauge" in lines
+    assert "sashay_test_hits 3" in lines
+    assert "sashay_test_enabled 1" in lines
+    assert not any(line.startswith("sashay_test_backend") for line in lines)
+    assert 'sashay_test_load_game{name="calls"} 2' in lines
+    assert 'sashay_test_get_room{name="calls"} 1' in lines
+
+
+def test_requests_are_labelled_by_route_template(client: TestClient, game_id: str):
+    client.get("/api/v1/games/pieces", params={"game_id": game_id})
+    client.get("/no/such/path")
+
+    lines = client.get("/api/v1/metrics").text.splitlines()
+    assert any(
+        line.startswith(
+            "sashay_http_request_duration_seconds_count"
+            '{method="GET",route="/api/v1/games/pieces",status="200"}'
+        )
+        for line in lines
+    )
+    assert any(
+        line.startswith(
+            "sashay_http_request_duration_seconds_count"
+            f'{{method="GET",route="{UNMATCHED_ROUTE}",status="404"}}'
+        )
+        for line in lines
+    )
+    assert not any("/no/such/path" in line for line in lines)
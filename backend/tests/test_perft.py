@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from app.models.game.base import Player
+from app.models.game.compact import CompactPiece
+from app.models.game.engine import VictoryType
+from app.utils.game import generate_random_setup
+from benchmarks.perft import (BitboardEngine, PerftCounts, ReferenceEngine,
+                              diff_trees, perft, perft_batched,
+                              random_position)
+
+
+def won_root() -> list[CompactPiece]:
+    """A full setup without player one's spy, which player two has already won."""
+    rng = random.Random(0)
+    pieces = [
+        CompactPiece.from_piece(piece)
+        for piece in generate_random_setup(player=Player.PLAYER_ONE, rng=rng)
+        + generate_random_setup(player=Player.PLAYER_TWO, rng=rng)
+    ]
+    return [
+        piece
+        for piece in pieces
+        if not (piece.player == Player.PLAYER_ONE and piece.is_spy)
+    ]
+
+
+def test_won_root_is_not_expanded_by_any_engine():
+    pieces = won_root()
+    for engine in (ReferenceEngine, BitboardEngine):
+        assert engine(pieces=pieces, turn=0).victory() == (
+            Player.PLAYER_TWO,
+            VictoryType.ENEMY_SPY_CAPTURED,
+        )
+        assert perft(engine=engine(pieces=pieces, turn=0), depth=2) == PerftCounts()
+
+
+def test_won_root_matches_batched_engine():
+    pytest.importorskip("numpy")
+    pieces = won_root()
+    assert perft_batched(pieces=pieces, turn=0, depth=2) == perft(
+        engine=BitboardEngine(pieces=pieces, turn=0), depth=2
+    )
+
+
+def test_won_root_has_no_disagreement():
+    pieces = won_root()
+    assert (
+        diff_trees(
+            reference=ReferenceEngine(pieces=pieces, turn=0),
+            candidate=BitboardEngine(pieces=pieces, turn=0),
+            depth=2,
+        )
+        is None
+    )
+
+
+def test_random_positions_are_not_won():
+    # Seed 3 used to draw a setup already won by the initialization capture
+    rng = random.Random(3)
+    for _ in range(10):
+        pieces, turn = random_position(rng=rng, random_plies=6)
+        assert ReferenceEngine(pieces=pieces, turn=turn).victory() is None
+        assert perft(engine=BitboardEngine(pieces=pieces, turn=turn), depth=1).nodes
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("depth", [1, 2])
+def test_engines_agree_on_random_positions(seed: int, depth: int):
+    pieces, turn = random_position(rng=random.Random(seed), random_plies=6)
+    assert (
+        diff_trees(
+            reference=ReferenceEngine(pieces=pieces, turn=turn),
+            candidate=BitboardEngine(pieces=pieces, turn=turn),
+            depth=depth,
+        )
+        is None
+    )
+    # Same moves, captures and positions everywhere, so the same counts
+    assert perft(engine=BitboardEngine(pieces=pieces, turn=turn), depth=depth).nodes
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_batched_engine_agrees_on_random_positions(seed: int):
+    pytest.importorskip("numpy")
+    pieces, turn = random_position(rng=random.Random(seed), random_plies=6)
+    assert perft_batched(pieces=pieces, turn=turn, depth=2) == perft(
+        engine=BitboardEngine(pieces=pieces, turn=turn), depth=2
+    )
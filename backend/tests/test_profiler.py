@@ -0,0 +1,76 @@
+import asyncio
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.profiler import PROFILE_HEADER, Profiler, ProfilingMiddleware
+
+TOKEN = "test-token"
+
+
+@pytest.fixture
+def profiler(tmp_path: Path) -> Iterator[Profiler]:
+    profiler = Profiler()
+    token, sample_rate, directory = (
+        profiler.token,
+        profiler.sample_rate,
+        profiler.directory,
+    )
+    profiler.token, profiler.sample_rate, profiler.directory = TOKEN, 0, tmp_path
+    try:
+        yield profiler
+    finally:
+        profiler.token, profiler.sample_rate, profiler.directory = (
+            token,
+            sample_rate,
+            directory,
+        )
+
+
+def test_unprofiled_request_is_passed_through(profiler: Profiler):
+    seen = []
+
+    async def app(scope, receive, send) -> None:
+        seen.append((receive, send))
+
+    async def receive() -> dict:
+        return {}
+
+    async def send(message: dict) -> None:
+        pass
+
+    middleware = ProfilingMiddleware(app)
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
+    asyncio.run(middleware(scope, receive, send))
+
+    # The app gets the original callables, with no wrapper in between
+    assert seen == [(receive, send)]
+    assert not any(profiler.directory.iterdir())
+
+
+def test_request_with_the_token_is_profiled(client: TestClient, profiler: Profiler):
+    response = client.get(
+        "/api/v1/rooms/player-number", headers={PROFILE_HEADER: "wrong"}
+    )
+    assert not any(profiler.directory.iterdir())
+
+    response = client.get(
+        "/api/v1/rooms/player-number", headers={PROFILE_HEADER: TOKEN}
+    )
+    assert response.status_code == 422
+    [summary] = profiler.list_profiles()
+    assert (summary.method, summary.path, summary.status, summary.reason) == (
+        "GET",
+        "/api/v1/rooms/player-number",
+        422,
+        "header",
+    )
+    assert profiler.get_path(name=summary.name).stat().st_size > 0
+    assert not profiler.active
+
+    listed = client.get(
+        "/api/v1/admin/profiles", headers={"Authorization": f"Bearer {TOKEN}"}
+    ).json()
+    assert [profile["name"] for profile in listed["profiles"]] == [summary.name]
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from app.utils.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def scenario() -> list[int]:
+        release = asyncio.Event()
+
+        async def load() -> int:
+            calls.append(None)
+            await release.wait()
+            return 42
+
+        waiters = [
+            asyncio.ensure_future(
+                single_flight.do(operation="share", key="game", function=load)
+            )
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*waiters)
+
+    coalesced = single_flight.coalesced["share"]
+    assert asyncio.run(scenario()) == [42, 42, 42]
+    assert len(calls) == 1
+    assert single_flight.coalesced["share"] == coalesced + 2
+
+
+def test_exception_reaches_every_waiter():
+    single_flight = SingleFlight()
+
+    async def scenario() -> list[BaseException]:
+        release = asyncio.Event()
+
+        async def load() -> int:
+            await release.wait()
+            raise LookupError("no such game")
+
+        waiters = [
+            asyncio.ensure_future(
+                single_flight.do(operation="fail", key="game", function=load)
+            )
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*waiters, return_exceptions=True)
+
+    errors = asyncio.run(scenario())
+    assert len(errors) == 2
+    assert all(isinstance(error, LookupError) for error in errors)
+
+
+def test_key_is_released_after_the_call():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def load() -> int:
+        calls.append(None)
+        if len(calls) == 1:
+            raise LookupError("no such game")
+        return len(calls)
+
+    async def scenario() -> int:
+        with pytest.raises(LookupError):
+            await single_flight.do(operation="release", key="game", function=load)
+        # Let the finished call land before asking again
+        await asyncio.sleep(0)
+        return await single_flight.do(operation="release", key="game", function=load)
+
+    assert asyncio.run(scenario()) == 2
+    assert ("release", "game") not in single_flight._in_flight
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    single_flight = SingleFlight()
+
+    async def scenario() -> int:
+        release = asyncio.Event()
+
+        async def load() -> int:
+            await release.wait()
+            return 7
+
+        first = asyncio.ensure_future(
+            single_flight.do(operation="cancel", key="game", function=load)
+        )
+        second = asyncio.ensure_future(
+            single_flight.do(operation="cancel", key="game", function=load)
+        )
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        return await second
+
+    assert asyncio.run(scenario()) == 7
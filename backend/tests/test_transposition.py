@@ -0,0 +1,58 @@
+import pytest
+
+from app.models.game.transposition import (ENTRY_BYTES, ReplacementPolicy,
+                                           TranspositionTable)
+
+
+def test_stored_value_is_found_by_its_key_only():
+    table = TranspositionTable(size=8)
+    assert table.store(key=0x1234, value="a", depth=2)
+    entry = table.get(key=0x1234)
+    assert entry is not None and (entry.value, entry.depth) == ("a", 2)
+    # Same slot, another position
+    assert table.get(key=0x1234 + table.size) is None
+    assert 0x1234 in table and 0x1234 + table.size not in table
+    assert (table.hits, table.misses) == (1, 1)
+
+
+def test_size_rounds_down_to_a_power_of_two():
+    assert TranspositionTable(size=100).size == 64
+    assert TranspositionTable(max_bytes=ENTRY_BYTES * 100).size == 64
+    with pytest.raises(ValueError):
+        TranspositionTable(max_bytes=ENTRY_BYTES - 1)
+
+
+@pytest.mark.parametrize(
+    "policy, shallower_replaces, same_generation_replaces",
+    [
+        (ReplacementPolicy.ALWAYS, True, True),
+        (ReplacementPolicy.DEPTH_PREFERRED, False, True),
+        (ReplacementPolicy.AGE_PREFERRED, False, False),
+    ],
+)
+def test_replacement(
+    policy: ReplacementPolicy,
+    shallower_replaces: bool,
+    same_generation_replaces: bool,
+):
+    table = TranspositionTable(size=4, policy=policy)
+    first, second, third = 1, 1 + table.size, 1 + 2 * table.size
+    table.store(key=first, value="first", depth=3)
+
+    assert table.store(key=second, value="second", depth=1) == shallower_replaces
+    table.clear()
+    table.store(key=first, value="first", depth=3)
+    assert table.store(key=second, value="second", depth=3) == (
+        same_generation_replaces
+    )
+    kept = second if same_generation_replaces else first
+
+    # Entries from an older search always make way
+    table.new_generation()
+    assert table.store(key=third, value="third", depth=0)
+    assert table.get(key=kept) is None
+    assert table.get(key=third).value == "third"
+    # The same position is always updated in place
+    assert table.store(key=third, value="updated", depth=0)
+    assert table.get(key=third).value == "updated"
+    assert len(table) == 1
@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from app.models.game.base import Marking, Player
+from app.models.game.bitboard import BitboardGameEngine
+from app.models.game.compact import CompactPiece
+from app.models.game.zobrist import hash_pieces
+from app.utils.game import generate_random_setup
+
+
+def player_for_turn(turn: int) -> Player:
+    return Player.PLAYER_ONE if turn % 2 == 0 else Player.PLAYER_TWO
+
+
+def random_position(
+    rng: random.Random, random_plies: int
+) -> tuple[list[CompactPiece], int]:
+    """Both setups after the initialization capture, then some random moves."""
+    while True:
+        game_engine = BitboardGameEngine(
+            pieces=[
+                CompactPiece.from_piece(piece)
+                for player in (Player.PLAYER_ONE, Player.PLAYER_TWO)
+                for piece in generate_random_setup(player=player, rng=rng)
+            ]
+        )
+        game_engine.process_initialization_capture()
+        if game_engine.find_victory() is None:
+            break
+    for _ in range(random_plies):
+        moves = game_engine.generate_moves(player=player_for_turn(game_engine.turn))
+        record = game_engine.make_move(*rng.choice(moves))
+        if game_engine.victory is not None:
+            game_engine.unmake_move(record=record)
+            break
+    return game_engine.game_board.get_pieces(), game_engine.turn
+
+
+def from_scratch(game_engine: BitboardGameEngine) -> int:
+    return hash_pieces(
+        pieces=game_engine.game_board.get_pieces(), turn=game_engine.turn
+    )
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_incremental_hash_matches_hash_from_scratch(seed: int):
+    pieces, turn = random_position(rng=random.Random(seed), random_plies=6)
+    game_engine = BitboardGameEngine(pieces=pieces, turn=turn)
+    root_hash = game_engine.zobrist_hash
+    assert root_hash == hash_pieces(pieces=pieces, turn=turn)
+
+    captures = 0
+    for move in game_engine.generate_moves(player=player_for_turn(turn)):
+        record = game_engine.make_move(*move)
+        captures += len(record.captured)
+        child_hash = game_engine.zobrist_hash
+        assert child_hash == from_scratch(game_engine=game_engine)
+        assert child_hash != root_hash
+        for reply in game_engine.generate_moves(player=player_for_turn(turn + 1)):
+            reply_record = game_engine.make_move(*reply)
+            captures += len(reply_record.captured)
+            assert game_engine.zobrist_hash == from_scratch(game_engine=game_engine)
+            game_engine.unmake_move(reply_record)
+            assert game_engine.zobrist_hash == child_hash
+        game_engine.unmake_move(record)
+        assert game_engine.zobrist_hash == root_hash
+    assert captures
+
+
+def test_marking_changes_the_hash_and_back():
+    pieces, turn = random_position(rng=random.Random(0), random_plies=6)
+    game_engine = BitboardGameEngine(pieces=pieces, turn=turn)
+    root_hash = game_engine.zobrist_hash
+    piece = next(p for p in pieces if p.player == Player.PLAYER_TWO)
+    game_engine.toggle_marking(piece=piece, marking=Marking.SPY)
+    assert game_engine.zobrist_hash != root_hash
+    assert game_engine.zobrist_hash == from_scratch(game_engine=game_engine)
+    game_engine.toggle_marking(piece=piece, marking=Marking.NONE)
+    assert game_engine.zobrist_hash == root_hash
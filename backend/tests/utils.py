@@ -0,0 +1,24 @@
+import random
+from typing import Any
+
+from app.models.game.base import POSITIONS
+from app.models.game.bitboard import BitboardGameEngine
+from app.models.game.compact import CompactPiece
+from app.models.game.ismcts import player_for_turn
+
+
+def random_move(
+    game_id: str, state: dict[str, Any], rng: random.Random
+) -> dict[str, Any]:
+    """A move request for a random legal move of the player to move in `state`."""
+    pieces = [CompactPiece.from_dict(piece) for piece in state["pieces"]]
+    game_engine = BitboardGameEngine(pieces=pieces, turn=state["turn"])
+    square, new_square = rng.choice(
+        game_engine.generate_moves(player=player_for_turn(state["turn"]))
+    )
+    piece = next(piece for piece in pieces if piece.square == square)
+    return {
+        "game_id": game_id,
+        "piece": piece.to_piece().model_dump(mode="json"),
+        "new_position": POSITIONS[new_square].model_dump(),
+    }